@@ -0,0 +1,204 @@
+"""
+Tiempo y memoria de cada análisis sobre bases sintéticas de distintos
+tamaños (ver ``benchmarks/sintetico.py``).
+
+Cada combinación análisis × tamaño corre en un proceso aparte, de modo que
+el pico de memoria (RSS máximo del proceso) corresponde solo a esa
+combinación. Los resultados se agregan a ``benchmarks/resultados.jsonl``
+junto con el commit y la máquina, y cada corrida se compara con la
+anterior de la misma máquina para marcar regresiones.
+
+Uso:
+    python benchmarks/bench_analisis.py [--filas 10000 1000000 ...]
+        [--analisis genero cruces percentiles dispersion] [--repeticiones 3]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_RESULTADOS = os.path.join(DIRECTORIO, 'resultados.jsonl')
+
+FILAS = [10_000, 1_000_000, 10_000_000, 100_000_000]
+FILAS_POR_DEFECTO = [10_000, 1_000_000]
+
+# Una corrida más lenta (o con más memoria) que la anterior en esta
+# proporción se marca como regresión; diferencias de tiempo menores que
+# MINIMO_SEGUNDOS se consideran ruido
+TOLERANCIA = 0.20
+MINIMO_SEGUNDOS = 0.05
+
+
+# --- Análisis medidos (cada uno recibe la base ya cargada) ---
+
+def _genero(df):
+    from matriculas.analisis.genero import analizar_genero_carreras
+    from matriculas.graficos import SinGraficos
+
+    analizar_genero_carreras(df, SinGraficos())
+
+
+def _cruces(df):
+    from matriculas.analisis.relaciones import analizar_cruces, cargar_filtrado
+    from matriculas.graficos import SinGraficos
+
+    analizar_cruces(cargar_filtrado(df), SinGraficos())
+
+
+def _percentiles(df):
+    """Lo que calcula distribucion_aranceles_acreditadas_noAcreditadas.ipynb"""
+    from matriculas.cuantiles import cuantiles_por_grupo
+    from matriculas.descriptivos import describir_por_grupo
+
+    arancel = df['VALOR ARANCEL (PESOS)']
+    acreditacion = df['ACREDITACION INSTITUCIONAL']
+    cuantiles_por_grupo(arancel, acreditacion, [0.1, 0.25, 0.5, 0.7, 0.75, 0.9])
+    describir_por_grupo(arancel, acreditacion)
+
+
+def _dispersion(df):
+    """Lo que calcula analisis_dispersion_arancel_carreras_largas_cortas.ipynb"""
+    import numpy as np
+
+    from matriculas.descriptivos import describir_por_grupo
+
+    validas = df[df['VALOR ARANCEL (PESOS)'] > 0]
+    grupo = np.where(validas['DURACION TOTAL CARRERA (SEMESTRES)'] <= 8, 'Cortas (≤8 sem)', 'Largas (>8 sem)')
+    describir_por_grupo(validas['VALOR ARANCEL (PESOS)'], grupo)
+
+
+ANALISIS = {
+    'genero': _genero,
+    'cruces': _cruces,
+    'percentiles': _percentiles,
+    'dispersion': _dispersion,
+}
+
+
+def _rss_maximo_mb():
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / 1024
+
+
+def medir(nombre, filas, repeticiones):
+    """Carga la base sintética y mide el análisis (se ejecuta en el proceso hijo)"""
+    import sintetico
+
+    inicio = time.perf_counter()
+    df = sintetico.cargar(filas)
+    carga = time.perf_counter() - inicio
+    rss_carga = _rss_maximo_mb()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ANALISIS[nombre](df)
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        'analisis': nombre,
+        'filas': filas,
+        'segundos': min(tiempos),
+        'segundos_carga': carga,
+        'rss_carga_mb': rss_carga,
+        'rss_maximo_mb': _rss_maximo_mb(),
+    }
+
+
+def _en_proceso_aparte(nombre, filas, repeticiones):
+    comando = [sys.executable, os.path.abspath(__file__), '--medir', nombre, str(filas),
+               '--repeticiones', str(repeticiones)]
+    proceso = subprocess.run(comando, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        ultima = proceso.stderr.strip().splitlines()[-1:] or ['sin detalle']
+        return {'analisis': nombre, 'filas': filas, 'error': ultima[0]}
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=DIRECTORIO, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def leer_resultados(ruta=RUTA_RESULTADOS):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding='utf-8') as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def anterior(historial, resultado):
+    """La medición previa de la misma combinación en la misma máquina"""
+    for previo in reversed(historial):
+        if (previo.get('maquina') == resultado['maquina'] and previo['analisis'] == resultado['analisis']
+                and previo['filas'] == resultado['filas'] and 'error' not in previo):
+            return previo
+    return None
+
+
+def _comparacion(previo, resultado):
+    if previo is None or 'error' in resultado:
+        return ''
+    cambio = resultado['segundos'] / previo['segundos'] - 1
+    cambio_rss = resultado['rss_maximo_mb'] / previo['rss_maximo_mb'] - 1
+    regresion = (cambio > TOLERANCIA and resultado['segundos'] - previo['segundos'] > MINIMO_SEGUNDOS
+                 or cambio_rss > TOLERANCIA)
+    marca = '  REGRESIÓN' if regresion else ''
+    return f"{cambio:+7.1%} tiempo {cambio_rss:+7.1%} RSS vs {previo.get('commit') or '?'}{marca}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--filas', nargs='+', type=lambda s: int(s.replace('_', '')), default=FILAS_POR_DEFECTO,
+                        help=f"tamaños de base (p. ej. {' '.join(str(f) for f in FILAS)})")
+    parser.add_argument('--analisis', nargs='+', choices=list(ANALISIS), default=list(ANALISIS))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--medir', nargs=2, metavar=('ANALISIS', 'FILAS'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.medir:
+        print(json.dumps(medir(args.medir[0], int(args.medir[1]), args.repeticiones)))
+        return 0
+
+    import sintetico
+
+    historial = leer_resultados()
+    base = {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'maquina': platform.node(),
+        'python': platform.python_version(),
+    }
+    print(f"{'análisis':12s} {'filas':>12s} {'segundos':>9s} {'carga':>7s} {'RSS MB':>8s}")
+    with open(RUTA_RESULTADOS, 'a', encoding='utf-8') as salida:
+        for filas in args.filas:
+            sintetico.generar(filas)
+            for nombre in args.analisis:
+                resultado = dict(base, **_en_proceso_aparte(nombre, filas, args.repeticiones))
+                if 'error' in resultado:
+                    print(f"{nombre:12s} {filas:12,d}  error: {resultado['error']}")
+                else:
+                    print(f"{nombre:12s} {filas:12,d} {resultado['segundos']:9.3f} {resultado['segundos_carga']:7.2f} "
+                          f"{resultado['rss_maximo_mb']:8.0f}  {_comparacion(anterior(historial, resultado), resultado)}")
+                salida.write(json.dumps(resultado) + '\n')
+                salida.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, DIRECTORIO)
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Compara matriculas.contingencia con lo que hace
+tipo_institucion_area_conocimiento.ipynb (``pivot_table(aggfunc='size')``,
+división por fila) más ``scipy.stats.chi2_contingency``, para las tablas
+del README y para una tabla de alta cardinalidad en formato disperso
+(carrera × institución contra jornada × género).
+
+Uso: python benchmarks/bench_contingencia.py [filas]
+    (sin ``filas`` se usa la base real; con ``filas``, la base sintética
+    de ese tamaño, ver benchmarks/sintetico.py)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.contingencia import contingencia  # noqa: E402
+
+TABLAS = [
+    ('TIPO DE INSTITUCION', 'AREA CONOCIMIENTO'),
+    ('VIA DE INGRESO', 'TIPO DE INSTITUCION'),
+    ('NIVEL CARRERA', 'JORNADA'),
+    (['NOMBRE CARRERA', 'NOMBRE DE INSTITUCION'], ['JORNADA', 'GENERO']),
+]
+
+
+def medir(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def cadena_pandas(df, filas, columnas):
+    tabla = df.pivot_table(index=filas, columns=columnas, aggfunc='size', fill_value=0)
+    por_fila = tabla.div(tabla.sum(axis=1), axis=0)
+    por_columna = tabla.div(tabla.sum(axis=0), axis=1)
+    chi2 = stats.chi2_contingency(tabla.to_numpy(), correction=False)
+    return tabla, por_fila, por_columna, chi2.statistic
+
+
+def main(filas=None):
+    if filas:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sintetico
+
+        df = sintetico.cargar(filas)
+    else:
+        from matriculas.datos import cargar_matriculas
+
+        df = cargar_matriculas()
+    print(f"{len(df):,d} filas")
+
+    for claves_filas, claves_columnas in TABLAS:
+        nombre = f"{' × '.join(np.atleast_1d(claves_filas))} / {' × '.join(np.atleast_1d(claves_columnas))}"
+        t_pandas, (tabla, _, _, chi2) = medir(lambda: cadena_pandas(df, claves_filas, claves_columnas))
+        t_motor, resultado = medir(lambda: contingencia(df, claves_filas, claves_columnas))
+        t_disperso, disperso = medir(lambda: contingencia(df, claves_filas, claves_columnas, dispersa=True))
+        iguales = (np.array_equal(resultado.absoluta.to_numpy(), tabla.to_numpy())
+                   and np.isclose(resultado.chi2, chi2) and np.isclose(disperso.chi2, chi2))
+        print(f"{nombre}  ({tabla.shape[0]} × {tabla.shape[1]}, {len(disperso.absoluta)} celdas con datos)")
+        print(f"    pandas+scipy: {t_pandas:7.3f} s   denso: {t_motor:7.3f} s ({t_pandas / t_motor:5.1f}x)   "
+              f"disperso: {t_disperso:7.3f} s ({t_pandas / t_disperso:5.1f}x)   iguales: {'sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1].replace('_', '')) if len(sys.argv) > 1 else None)
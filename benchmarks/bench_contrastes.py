@@ -0,0 +1,95 @@
+"""
+Compara matriculas.contrastes con llamar a scipy.stats par por par, para
+todos los pares de grupos tipo de institución × área × jornada.
+
+- Levene y Bartlett: todos los pares, ambos métodos (se verifica que den lo mismo).
+- Bootstrap de la diferencia de CV y de P70: ``scipy.stats.bootstrap`` en
+  los primeros ``pares_scipy`` pares (extrapolado al total) contra el
+  remuestreo por grupo de matriculas.contrastes en todos los pares.
+
+Uso: python benchmarks/bench_contrastes.py [remuestras] [pares_scipy] [procesos]
+"""
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas import contrastes  # noqa: E402
+from matriculas.datos import cargar_matriculas  # noqa: E402
+
+CLAVES = ['TIPO DE INSTITUCION', 'AREA CONOCIMIENTO', 'JORNADA']
+ARANCEL = 'VALOR ARANCEL (PESOS)'
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+def varianzas_scipy(grupos, pares):
+    filas = []
+    for a, b in pares:
+        levene = stats.levene(grupos[a], grupos[b])
+        bartlett = stats.bartlett(grupos[a], grupos[b])
+        filas.append((levene.statistic, levene.pvalue, bartlett.statistic, bartlett.pvalue))
+    return np.array(filas)
+
+
+def bootstrap_scipy(grupos, pares, estadistico, remuestras):
+    def diferencia(x, y, axis):
+        return estadistico(x, axis) - estadistico(y, axis)
+
+    limites = []
+    for a, b in pares:
+        resultado = stats.bootstrap((grupos[a], grupos[b]), diferencia, n_resamples=remuestras,
+                                    method='percentile', vectorized=True, random_state=0)
+        limites.append((resultado.confidence_interval.low, resultado.confidence_interval.high))
+    return np.array(limites)
+
+
+def _cv(x, axis):
+    return np.std(x, axis=axis, ddof=1) / np.mean(x, axis=axis) * 100
+
+
+def _p70(x, axis):
+    return np.quantile(x, 0.7, axis=axis)
+
+
+def main(remuestras=1000, pares_scipy=20, procesos=None):
+    warnings.filterwarnings('ignore', category=RuntimeWarning)
+    df = cargar_matriculas()
+    claves = df[CLAVES]
+    valores = df[ARANCEL]
+    grupos = {nombre: g.to_numpy(dtype=np.float64)
+              for nombre, g in valores.groupby([df[c] for c in CLAVES], observed=True)}
+
+    t_lote, tabla = medir(lambda: contrastes.comparar_varianzas(valores, claves))
+    pares = list(tabla.index)
+    t_scipy, esperado = medir(lambda: varianzas_scipy(grupos, pares))
+    obtenido = tabla[['Levene', 'p Levene', 'Bartlett', 'p Bartlett']].to_numpy()
+    iguales = np.allclose(obtenido, esperado, rtol=1e-7, atol=1e-12, equal_nan=True)
+    print(f"{len(grupos)} grupos, {len(pares)} pares")
+    print(f"Levene + Bartlett   scipy por par: {t_scipy:8.3f} s   en lote: {t_lote:8.3f} s   "
+          f"({t_scipy / t_lote:6.1f}x)   iguales: {'sí' if iguales else 'NO'}")
+
+    # Solo pares con al menos 2 datos por grupo (el CV necesita 2)
+    muestra = [(a, b) for a, b in pares if len(grupos[a]) > 1 and len(grupos[b]) > 1][:pares_scipy]
+    for nombre, funcion in (('cv', _cv), ('p70', _p70)):
+        t_scipy, _ = medir(lambda: bootstrap_scipy(grupos, muestra, funcion, remuestras))
+        por_par = t_scipy / max(len(muestra), 1)
+        t_lote, _ = medir(lambda: contrastes.bootstrap_diferencias(
+            valores, claves, nombre, remuestras, procesos=procesos))
+        print(f"Bootstrap {nombre:4s}      scipy por par: {por_par * len(pares):8.1f} s*  en lote: {t_lote:8.3f} s   "
+              f"({por_par * len(pares) / t_lote:6.1f}x)")
+    print(f"* estimado con {len(muestra)} pares de scipy.stats.bootstrap, {remuestras} remuestras")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:4]]
+    main(*argumentos)
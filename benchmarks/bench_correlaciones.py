@@ -0,0 +1,84 @@
+"""
+Compara matriculas.correlaciones con lo que hacía relacionEdadDuracion.py:
+``apply(pd.to_numeric)`` + ``.corr()`` sobre los campos numéricos, dos
+``Series.corr`` sobre copias con ``dropna`` y un doble ciclo que busca
+|r| > 0.5. También compara Spearman y la matriz por tipo de institución con
+``groupby(...).corr()``.
+
+Uso: python benchmarks/bench_correlaciones.py [filas]
+    (sin ``filas`` se usa la base real; con ``filas``, la base sintética
+    de ese tamaño, ver benchmarks/sintetico.py)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.analisis.relaciones import CAMPOS_NUMERICOS  # noqa: E402
+from matriculas.correlaciones import correlacion, correlacion_por_grupo, correlaciones_fuertes  # noqa: E402
+
+GRUPO = 'TIPO DE INSTITUCION'
+
+
+def medir(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def cadena_pandas(df, metodo):
+    filtrado = df.dropna(subset=['EDAD', CAMPOS_NUMERICOS[1]])
+    pd.to_numeric(filtrado['EDAD'], errors='coerce').corr(pd.to_numeric(filtrado[CAMPOS_NUMERICOS[1]], errors='coerce'))
+    filtrado = df.dropna(subset=['EDAD', 'VALOR ARANCEL (PESOS)'])
+    pd.to_numeric(filtrado['EDAD'], errors='coerce').corr(pd.to_numeric(filtrado['VALOR ARANCEL (PESOS)'], errors='coerce'))
+    matriz = df[CAMPOS_NUMERICOS].apply(pd.to_numeric, errors='coerce').corr(method=metodo)
+    fuertes = []
+    for i, col1 in enumerate(matriz.columns):
+        for j, col2 in enumerate(matriz.columns):
+            if j > i and abs(matriz.loc[col1, col2]) > 0.5:
+                fuertes.append((col1, col2))
+    return matriz
+
+
+def motor(df, metodo):
+    resultado = correlacion(df, CAMPOS_NUMERICOS, metodo)
+    correlaciones_fuertes(resultado.coeficientes)
+    return resultado.coeficientes
+
+
+def main(filas=None):
+    if filas:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sintetico
+
+        df = sintetico.cargar(filas)
+    else:
+        from matriculas.analisis.relaciones import cargar_filtrado
+
+        df = cargar_filtrado()
+    print(f"{len(df):,d} filas, {len(CAMPOS_NUMERICOS)} campos")
+
+    for metodo in ('pearson', 'spearman'):
+        t_pandas, esperado = medir(lambda: cadena_pandas(df, metodo))
+        t_motor, obtenido = medir(lambda: motor(df, metodo))
+        iguales = np.allclose(obtenido.to_numpy(), esperado.to_numpy(), atol=1e-10, equal_nan=True)
+        print(f"{metodo:9s}           pandas: {t_pandas:8.3f} s   motor: {t_motor:8.3f} s   "
+              f"({t_pandas / t_motor:5.1f}x)   iguales: {'sí' if iguales else 'NO'}")
+
+        t_pandas, esperado = medir(lambda: df[CAMPOS_NUMERICOS].apply(pd.to_numeric, errors='coerce')
+                                   .groupby(df[GRUPO], observed=True).corr(method=metodo))
+        t_motor, obtenido = medir(lambda: correlacion_por_grupo(df, CAMPOS_NUMERICOS, GRUPO, metodo).coeficientes)
+        iguales = np.allclose(obtenido.to_numpy(), esperado.to_numpy(), atol=1e-10, equal_nan=True)
+        print(f"{metodo:9s} por tipo  pandas: {t_pandas:8.3f} s   motor: {t_motor:8.3f} s   "
+              f"({t_pandas / t_motor:5.1f}x)   iguales: {'sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1].replace('_', '')) if len(sys.argv) > 1 else None)
@@ -0,0 +1,113 @@
+"""
+Compara las consultas al cubo (matriculas.cubo) con los ``groupby`` de
+pandas equivalentes (``size``, ``mean``, ``var``, ``std`` y CV) para varios
+subconjuntos de dimensiones, tanto con el cubo construido de una vez como
+con el combinado a partir de dos mitades de la base. Además comprueba que un
+grupo de valores constantes lejos de la media global tiene varianza 0.
+
+Uso: python benchmarks/bench_cubo.py [filas]
+    (sin ``filas`` se usa la base real; con ``filas``, la base sintética
+    de ese tamaño, ver benchmarks/sintetico.py)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.cubo import Cubo  # noqa: E402
+
+DIMENSIONES = ['GENERO', 'TIPO DE INSTITUCION', 'AREA CONOCIMIENTO', 'JORNADA']
+MEDIDAS = ['EDAD', 'VALOR ARANCEL (PESOS)']
+CONSULTAS = [
+    (['GENERO'], 'EDAD'),
+    (['TIPO DE INSTITUCION'], 'VALOR ARANCEL (PESOS)'),
+    (['AREA CONOCIMIENTO', 'GENERO'], 'VALOR ARANCEL (PESOS)'),
+    (['TIPO DE INSTITUCION', 'JORNADA'], 'EDAD'),
+]
+COLUMNAS = ['N', 'Media', 'Varianza', 'Desv. Estándar', 'Coef. Variación (%)']
+
+
+def medir(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def con_pandas(df):
+    tablas = []
+    for dimensiones, medida in CONSULTAS:
+        agrupado = df.groupby(dimensiones, observed=True)[medida]
+        tabla = pd.DataFrame({
+            'N': agrupado.count(),
+            'Media': agrupado.mean(),
+            'Varianza': agrupado.var(),
+            'Desv. Estándar': agrupado.std(),
+        })
+        tabla['Coef. Variación (%)'] = tabla['Desv. Estándar'] / tabla['Media'] * 100
+        tablas.append(tabla)
+    return tablas
+
+
+def con_cubo(cubo):
+    return [cubo.estadisticas(dimensiones, medida) for dimensiones, medida in CONSULTAS]
+
+
+def iguales(obtenido, esperado):
+    for a, b in zip(obtenido, esperado):
+        a = a[COLUMNAS].sort_index()
+        b = b.reindex(a.index)[COLUMNAS]
+        if not np.allclose(a.to_numpy(float), b.to_numpy(float), rtol=1e-9, equal_nan=True):
+            return False
+    return True
+
+
+def varianza_grupo_constante():
+    """Varianza de un grupo constante junto a otro de valores muy distintos"""
+    df = pd.DataFrame({
+        'GRUPO': ['constante'] * 1000 + ['variable'] * 1000,
+        'VALOR': np.r_[np.full(1000, 2_500_000.0), np.linspace(0, 1e8, 1000)],
+    })
+    mitades = [Cubo.construir(parte, ['GRUPO'], ['VALOR']) for parte in (df.iloc[::2], df.iloc[1::2])]
+    return [cubo.estadisticas(['GRUPO'], 'VALOR').loc['constante', 'Varianza']
+            for cubo in (Cubo.construir(df, ['GRUPO'], ['VALOR']), mitades[0].combinar(mitades[1]))]
+
+
+def main(filas=None):
+    if filas:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sintetico
+
+        df = sintetico.cargar(filas)
+    else:
+        from matriculas.datos import cargar_matriculas
+
+        df = cargar_matriculas()
+    print(f"{len(df):,d} filas, {len(CONSULTAS)} consultas")
+
+    t_pandas, esperado = medir(lambda: con_pandas(df))
+    t_construir, cubo = medir(lambda: Cubo.construir(df, DIMENSIONES, MEDIDAS))
+    t_consultas, obtenido = medir(lambda: con_cubo(cubo))
+    mitad = len(df) // 2
+    combinado = Cubo.construir(df.iloc[:mitad], DIMENSIONES, MEDIDAS).combinar(
+        Cubo.construir(df.iloc[mitad:], DIMENSIONES, MEDIDAS))
+
+    print(f"groupby:             {t_pandas * 1000:8.1f} ms")
+    print(f"Cubo.construir:      {t_construir * 1000:8.1f} ms   {len(cubo):,d} celdas")
+    print(f"consultas al cubo:   {t_consultas * 1000:8.1f} ms   ({t_pandas / t_consultas:5.1f}x)   "
+          f"iguales: {'sí' if iguales(obtenido, esperado) else 'NO'}")
+    print(f"cubo combinado:      iguales: {'sí' if iguales(con_cubo(combinado), esperado) else 'NO'}")
+
+    varianzas = varianza_grupo_constante()
+    print(f"grupo constante:     varianza {' / '.join(f'{v:.3g}' for v in varianzas)}   "
+          f"iguales: {'sí' if all(v == 0 for v in varianzas) else 'NO'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1].replace('_', '')) if len(sys.argv) > 1 else None)
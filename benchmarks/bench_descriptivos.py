@@ -0,0 +1,77 @@
+"""
+Compara el kernel de estadísticas por grupo (matriculas.descriptivos) con
+la cadena de llamadas de pandas que usan los notebooks
+(``.mean()``, ``.median()``, ``.std()``, ``.var()``, ``.quantile()``...).
+
+Uso: python benchmarks/bench_descriptivos.py [filas] [grupos]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.descriptivos import describir_por_grupo, estadisticas_por_grupo  # noqa: E402
+
+MOMENTOS = ['N', 'Media', 'Desv. Estándar', 'Varianza', 'Coef. Variación (%)', 'Rango', 'Mínimo', 'Máximo']
+CUARTILES = ['Mediana', 'Q1', 'Q3']
+
+
+def cadena_pandas(valores, grupos):
+    """Lo que hace calcular_estadisticas_dispersion, una vez por grupo"""
+    filas = []
+    for nombre, datos in valores.groupby(grupos):
+        filas.append({
+            'Grupo': nombre,
+            'N': len(datos),
+            'Media': datos.mean(),
+            'Mediana': datos.median(),
+            'Desv. Estándar': datos.std(),
+            'Varianza': datos.var(),
+            'Coef. Variación (%)': (datos.std() / datos.mean()) * 100,
+            'Rango': datos.max() - datos.min(),
+            'Mínimo': datos.min(),
+            'Máximo': datos.max(),
+            'Q1': datos.quantile(0.25),
+            'Q3': datos.quantile(0.75),
+            'RIC': datos.quantile(0.75) - datos.quantile(0.25),
+        })
+    return pd.DataFrame(filas).set_index('Grupo')
+
+
+def medir(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main(filas=1_000_000, n_grupos=20):
+    rng = np.random.default_rng(0)
+    valores = pd.Series(rng.lognormal(14.5, 0.4, filas).round())
+    grupos = pd.Series(rng.integers(0, n_grupos, filas)).map(lambda g: f'grupo {g:02d}')
+
+    t_pandas, esperado = medir(lambda: cadena_pandas(valores, grupos))
+    t_momentos, momentos = medir(lambda: estadisticas_por_grupo(valores, grupos))
+    t_kernel, obtenido = medir(lambda: describir_por_grupo(valores, grupos))
+
+    # Momentos exactos; los cuartiles son aproximados en grupos sobre LIMITE_EXACTO
+    iguales = np.allclose(esperado[MOMENTOS].to_numpy(float), momentos[MOMENTOS].to_numpy(float), rtol=1e-9)
+    error_cuartiles = np.max(np.abs(obtenido[CUARTILES].to_numpy(float) / esperado[CUARTILES].to_numpy(float) - 1))
+
+    print(f"Filas: {filas:,}  Grupos: {n_grupos}")
+    print(f"  Cadena pandas:          {t_pandas * 1000:8.1f} ms")
+    print(f"  estadisticas_por_grupo: {t_momentos * 1000:8.1f} ms  ({t_pandas / t_momentos:.1f}x)")
+    print(f"  describir_por_grupo:    {t_kernel * 1000:8.1f} ms  ({t_pandas / t_kernel:.1f}x)")
+    print(f"  Momentos iguales: {'sí' if iguales else 'NO'}")
+    print(f"  Error relativo máximo en cuartiles: {error_cuartiles:.2e}")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    main(*argumentos)
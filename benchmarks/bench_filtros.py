@@ -0,0 +1,72 @@
+"""
+Compara matriculas.filtros con la cadena que usaba el análisis de género:
+recorte por año (una copia), ``groupby(['AÑO INGRESO', carrera]).size()``
+y ``merge`` interno con las carreras de al menos 15 matrículas (otra
+copia). Mide tiempo y memoria máxima asignada (tracemalloc, que cuenta
+también los arreglos de numpy).
+
+Uso: python benchmarks/bench_filtros.py [filas]
+    (sin ``filas`` se usa la base real; con ``filas``, la base sintética
+    de ese tamaño, ver benchmarks/sintetico.py)
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.filtros import MINIMO_MATRICULAS_CARRERA, carreras_con_minimo, desde_anio  # noqa: E402
+
+CLAVES = ['AÑO INGRESO', 'NOMBRE CARRERA']
+
+
+def medir(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(tiempos), pico, resultado
+
+
+def cadena_pandas(df):
+    df = df[df['AÑO INGRESO'].astype(int) >= 2010]
+    conteo = df.groupby(CLAVES, observed=True).size().reset_index(name='matriculas')
+    validas = conteo[conteo['matriculas'] >= MINIMO_MATRICULAS_CARRERA][CLAVES]
+    return df.merge(validas, on=CLAVES, how='inner')
+
+
+def main(filas=None):
+    if filas:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sintetico
+
+        df = sintetico.cargar(filas)
+    else:
+        from matriculas.datos import cargar_matriculas
+
+        df = cargar_matriculas()
+    print(f"{len(df):,d} filas")
+
+    filtro = desde_anio() & carreras_con_minimo()
+    t_pandas, m_pandas, esperado = medir(lambda: cadena_pandas(df))
+    t_mascara, m_mascara, mascara = medir(lambda: filtro.mascara(df))
+    t_aplicar, m_aplicar, obtenido = medir(lambda: filtro.aplicar(df))
+    iguales = (int(mascara.sum()) == len(esperado)
+               and np.array_equal(obtenido['ID'].to_numpy(), esperado['ID'].to_numpy()))
+    mb = 1 << 20
+    print(f"groupby+merge: {t_pandas:7.3f} s  {m_pandas / mb:8.1f} MB")
+    print(f"máscara:       {t_mascara:7.3f} s  {m_mascara / mb:8.1f} MB   ({t_pandas / t_mascara:5.1f}x)")
+    print(f"máscara+corte: {t_aplicar:7.3f} s  {m_aplicar / mb:8.1f} MB   ({t_pandas / t_aplicar:5.1f}x)")
+    print(f"{len(esperado):,d} filas conservadas   iguales: {'sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1].replace('_', '')) if len(sys.argv) > 1 else None)
@@ -0,0 +1,36 @@
+"""
+Memoria de la base de matrículas con los tipos que infiere pandas y con el
+esquema compacto de matriculas.esquema, columna por columna.
+
+Uso: python benchmarks/bench_memoria.py [ruta]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.datos import RUTA_EXCEL, cargar_matriculas  # noqa: E402
+from matriculas.esquema import aplicar_esquema, reporte_memoria  # noqa: E402
+
+
+def main(ruta=RUTA_EXCEL):
+    original = cargar_matriculas(ruta, compacto=False)
+    inicio = time.perf_counter()
+    compacta, no_convertidas = aplicar_esquema(original)
+    duracion = time.perf_counter() - inicio
+
+    reporte = reporte_memoria(original, compacta)
+    with pd.option_context('display.width', 160, 'display.max_columns', 10, 'display.max_rows', 40):
+        print(reporte)
+    antes, despues = reporte.loc['TOTAL', ['bytes antes', 'bytes después']]
+    print(f"\nMemoria: {antes / 1e6:.2f} MB -> {despues / 1e6:.2f} MB ({antes / despues:.1f}x)")
+    print(f"Conversión: {duracion * 1000:.1f} ms")
+    if no_convertidas:
+        print("Columnas que no cumplen el esquema:", no_convertidas)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,76 @@
+"""
+Compara la ejecución de los análisis uno tras otro con
+matriculas.paralelo para distintos números de procesos, y el costo de
+pasar la base a los procesos: copiarla a memoria compartida y armarla en
+cada proceso contra serializarla con pickle (lo que haría un pool que
+recibe el DataFrame).
+
+Uso: python benchmarks/bench_paralelo.py [filas] [procesos ...]
+    (sin ``filas`` o con 0 se usa la base real; con ``filas``, la base
+    sintética de ese tamaño, ver benchmarks/sintetico.py)
+"""
+import contextlib
+import io
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.analisis import ANALISIS, ejecutar, partes  # noqa: E402
+from matriculas.graficos import SinGraficos  # noqa: E402
+from matriculas.paralelo import BaseCompartida  # noqa: E402
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as salida:
+        funcion()
+    return time.perf_counter() - inicio, salida.getvalue()
+
+
+def main(filas=None, procesos=None):
+    if filas:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sintetico
+
+        df = sintetico.cargar(filas)
+    else:
+        from matriculas.datos import cargar_matriculas
+
+        df = cargar_matriculas()
+    nombres = list(ANALISIS)
+    tareas = sum(len(partes(nombre)) for nombre in nombres)
+    print(f"{len(df):,d} filas, {len(nombres)} análisis en {tareas} tareas, {os.cpu_count()} núcleos")
+
+    inicio = time.perf_counter()
+    with BaseCompartida(df) as base:
+        t_copia = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        bloque, _ = BaseCompartida.abrir(base.descriptor)
+        t_abrir = time.perf_counter() - inicio
+        bloque.close()
+        t_descriptor = len(pickle.dumps(base.descriptor))
+    inicio = time.perf_counter()
+    serializada = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    pickle.loads(serializada)
+    t_pickle = time.perf_counter() - inicio
+    mb = 1 << 20
+    print(f"memoria compartida: copia {t_copia:6.3f} s, armado por proceso {t_abrir * 1000:6.2f} ms, "
+          f"descriptor {t_descriptor / 1024:6.1f} KB")
+    print(f"pickle por proceso: {t_pickle:6.3f} s, {len(serializada) / mb:8.1f} MB")
+
+    # La primera corrida paga las importaciones; los procesos del pool las heredan
+    medir(lambda: ejecutar(nombres, df, SinGraficos()))
+    t_secuencial, esperada = medir(lambda: ejecutar(nombres, df, SinGraficos()))
+    print(f"secuencial:        {t_secuencial:7.3f} s")
+    for n in procesos or sorted({1, 2, 4, os.cpu_count() or 1}):
+        t_paralelo, salida = medir(lambda: ejecutar(nombres, df, SinGraficos(), procesos=n))
+        print(f"{n:3d} procesos:       {t_paralelo:7.3f} s   ({t_secuencial / t_paralelo:5.2f}x)   "
+              f"misma salida: {'sí' if salida == esperada else 'NO'}")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a.replace('_', '')) for a in sys.argv[1:]]
+    main(argumentos[0] if argumentos else None, argumentos[1:])
@@ -0,0 +1,76 @@
+"""
+Compara cargar la base completa y filtrar después (lo que hacen los
+scripts) con matriculas.particiones, que lee solo las particiones de
+región y año que pueden cumplir el filtro. Para cada filtro muestra el
+tiempo, las particiones y los bytes leídos.
+
+Uso: python benchmarks/bench_particiones.py [filas]
+    (sin ``filas`` se usa la base real; con ``filas``, la base sintética
+    de ese tamaño, ver benchmarks/sintetico.py). La base particionada se
+    escribe en un directorio temporal.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.datos import guardar_cache, leer_cache  # noqa: E402
+from matriculas.filtros import EnConjunto, Rango, desde_anio  # noqa: E402
+from matriculas.particiones import CAMPOS, agregar_base, cargar_particiones, particiones  # noqa: E402
+
+FILTROS = {
+    'desde 2010': desde_anio(),
+    'pandemia (2020-2021)': EnConjunto('AÑO INGRESO', [2020, 2021]),
+    'prepandemia (< 2020)': Rango('AÑO INGRESO', maximo=2019),
+    'Ñuble 2021': EnConjunto('REGION SEDE', ['Nuble']) & EnConjunto('AÑO INGRESO', [2021]),
+}
+
+
+def medir(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main(filas=None):
+    if filas:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sintetico
+
+        df = sintetico.cargar(filas)
+    else:
+        from matriculas.datos import cargar_matriculas
+
+        df = cargar_matriculas()
+    print(f"{len(df):,d} filas")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # La base completa en un solo archivo, como la caché de matriculas.datos
+        completa = os.path.join(directorio, 'completa.parquet')
+        guardar_cache(df, completa)
+        particionada = os.path.join(directorio, 'particiones')
+        inicio = time.perf_counter()
+        agregar_base(df, 'base', particionada)
+        tabla = particiones(particionada)
+        print(f"particionar: {time.perf_counter() - inicio:.3f} s, {len(tabla)} particiones, "
+              f"{tabla['bytes'].sum() / (1 << 20):.1f} MB (archivo único: {os.path.getsize(completa) / (1 << 20):.1f} MB)")
+
+        for nombre, filtro in FILTROS.items():
+            t_completa, esperado = medir(lambda: filtro.aplicar(leer_cache(completa)))
+            t_particiones, obtenido = medir(lambda: cargar_particiones(filtro, rutas=None, directorio=particionada))
+            elegidas = filtro.particiones(tabla.drop(columns=CAMPOS))[0]
+            iguales = (len(obtenido) == len(esperado)
+                       and obtenido['ID'].sort_values().to_numpy().tolist() == esperado['ID'].sort_values().to_numpy().tolist())
+            print(f"{nombre:22s} completa: {t_completa:7.3f} s   particiones: {t_particiones:7.3f} s "
+                  f"({t_completa / t_particiones:5.1f}x)   {elegidas.sum():3d}/{len(tabla)} particiones, "
+                  f"{tabla['bytes'][elegidas].sum() / tabla['bytes'].sum():6.1%} de los bytes   "
+                  f"iguales: {'sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1].replace('_', '')) if len(sys.argv) > 1 else None)
@@ -0,0 +1,105 @@
+"""
+Compara los rankings del análisis de género hechos con pandas (el subconjunto
+de mujeres copiado, ``value_counts().head(k)`` para el top 10 de consola y
+los top 8 y top 6 de los gráficos, ``nlargest``/``nsmallest``) con
+matriculas.ranking: un conteo por clave con selección parcial y caché, de
+modo que la segunda y la tercera consulta sobre la misma clave son aciertos.
+Además corre ``analizar_genero_carreras`` y comprueba que el informe de
+consola y los gráficos usan un solo ``Rankings`` y que los top 8 y top 6
+de los gráficos salen de la caché.
+
+Uso: python benchmarks/bench_ranking.py [filas]
+    (sin ``filas`` se usa la base real; con ``filas``, la base sintética
+    de ese tamaño, ver benchmarks/sintetico.py)
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.analisis import genero  # noqa: E402
+from matriculas.genero import SoloMujeres, agregar_mascara_genero, mascara_mujeres, participacion_femenina  # noqa: E402
+from matriculas.graficos import SinGraficos  # noqa: E402
+from matriculas.ranking import Rankings, filas_mayores  # noqa: E402
+
+CONSULTAS = [(10, 'NOMBRE CARRERA'), (8, 'NOMBRE CARRERA'), (6, 'AREA CONOCIMIENTO')]
+
+
+def medir(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def con_pandas(df):
+    mujeres = df[mascara_mujeres(df)]
+    return [mujeres[clave].value_counts().head(k) for k, clave in CONSULTAS]
+
+
+def con_rankings(df):
+    rankings = Rankings(df)
+    return [rankings.mayores(k, clave, filtro=SoloMujeres()) for k, clave in CONSULTAS], rankings
+
+
+def rankings_del_informe(df):
+    """Los ``Rankings`` que crea el análisis de género (informe y gráficos)"""
+    creados = []
+
+    class Registrado(Rankings):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            creados.append(self)
+
+    with mock.patch.object(genero, 'Rankings', Registrado), contextlib.redirect_stdout(io.StringIO()):
+        genero.analizar_genero_carreras(df, SinGraficos())
+    return creados
+
+
+def main(filas=None):
+    if filas:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sintetico
+
+        df = sintetico.cargar(filas)
+    else:
+        from matriculas.datos import cargar_matriculas
+
+        df = cargar_matriculas()
+    agregar_mascara_genero(df)
+    print(f"{len(df):,d} filas, {len(CONSULTAS)} consultas")
+
+    t_pandas, esperado = medir(lambda: con_pandas(df))
+    t_rankings, (obtenido, rankings) = medir(lambda: con_rankings(df))
+    iguales = all(a.equals(b) for a, b in zip(obtenido, esperado))
+    print(f"value_counts().head: {t_pandas:7.3f} s")
+    print(f"Rankings:            {t_rankings:7.3f} s   ({t_pandas / t_rankings:5.1f}x)   "
+          f"{rankings.calculos} cálculos, {rankings.aciertos} aciertos   iguales: {'sí' if iguales else 'NO'}")
+
+    tabla = participacion_femenina(df, 'NOMBRE CARRERA').reset_index()
+    t_pandas, esperado = medir(lambda: (tabla.nlargest(5, 'Porcentaje_Mujeres'),
+                                        tabla.nsmallest(5, 'Porcentaje_Mujeres')))
+    t_parcial, obtenido = medir(lambda: (filas_mayores(tabla, 5, 'Porcentaje_Mujeres'),
+                                         filas_mayores(tabla, 5, 'Porcentaje_Mujeres', ascendente=True)))
+    iguales = all(a.equals(b) for a, b in zip(obtenido, esperado))
+    print(f"nlargest/nsmallest:  {t_pandas * 1000:7.3f} ms")
+    print(f"filas_mayores:       {t_parcial * 1000:7.3f} ms   ({t_pandas / t_parcial:5.1f}x)   "
+          f"{len(tabla):,d} carreras   iguales: {'sí' if iguales else 'NO'}")
+
+    creados = rankings_del_informe(df)
+    # Informe: top 10 de mujeres y totales por carrera y por área (4 cálculos);
+    # gráficos: top 8 por carrera y top 6 por área (2 aciertos)
+    compartido = len(creados) == 1 and creados[0].calculos == 4 and creados[0].aciertos == 2
+    print(f"informe y gráficos:  {len(creados)} Rankings, "
+          f"{sum(r.calculos for r in creados)} cálculos, {sum(r.aciertos for r in creados)} aciertos   "
+          f"gráficos desde la caché: {'sí' if compartido else 'NO'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1].replace('_', '')) if len(sys.argv) > 1 else None)
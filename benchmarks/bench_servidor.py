@@ -0,0 +1,90 @@
+"""
+Mide matriculas.servidor por HTTP en localhost: la primera consulta de
+cada ruta (cálculo en el pool), una ráfaga de consultas iguales y
+simultáneas (un solo cálculo compartido) y la misma consulta ya en caché,
+contra el cálculo directo sobre el DataFrame.
+
+Uso: python benchmarks/bench_servidor.py [filas] [procesos]
+    (sin ``filas`` o con 0 se usa la base real; con ``filas``, la base
+    sintética de ese tamaño, ver benchmarks/sintetico.py; ``procesos`` 0
+    calcula en hilos del proceso del servidor)
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.servidor import RUTAS, Servidor, leer_parametros  # noqa: E402
+
+CONSULTAS = [
+    ('genero/anio', ''),
+    ('aranceles/percentiles', ''),
+    ('aranceles/dispersion', ''),
+    ('contingencia', 'filas=TIPO%20DE%20INSTITUCION&columnas=AREA%20CONOCIMIENTO'),
+]
+RAFAGA = 32
+
+
+async def pedir(puerto, ruta):
+    lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+    escritor.write(f'GET /{ruta} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await escritor.drain()
+    respuesta = await lector.read()
+    escritor.close()
+    return respuesta.split(b'\r\n\r\n', 1)[1]
+
+
+async def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = await funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+async def bench(df, procesos):
+    from urllib.parse import parse_qs
+
+    servidor = Servidor(df, procesos)
+    t_inicio, http = await medir(lambda: servidor.iniciar(puerto=0))
+    puerto = http.sockets[0].getsockname()[1]
+    print(f"{len(df):,d} filas, arranque (pool y base compartida): {t_inicio:.3f} s")
+    print(f"{'ruta':24s} {'directo':>9s} {'primera':>9s} {f'ráfaga x{RAFAGA}':>11s} {'caché':>9s}   iguales")
+    for nombre, query in CONSULTAS:
+        ruta = f'{nombre}?{query}' if query else nombre
+        parametros = dict(leer_parametros(RUTAS[nombre], parse_qs(query)))
+        inicio = time.perf_counter()
+        directo = RUTAS[nombre].funcion(df, **parametros)
+        t_directo = time.perf_counter() - inicio
+
+        t_primera, primera = await medir(lambda: pedir(puerto, ruta))
+        # Sin la respuesta en caché, la ráfaga espera un solo cálculo
+        servidor._cache.clear()
+        t_rafaga, rafaga = await medir(lambda: asyncio.gather(*[pedir(puerto, ruta) for _ in range(RAFAGA)]))
+        t_cache, cache = await medir(lambda: pedir(puerto, ruta))
+        iguales = json.loads(primera) == directo and all(r == primera for r in rafaga) and cache == primera
+        print(f"{nombre:24s} {t_directo * 1000:7.1f}ms {t_primera * 1000:7.1f}ms {t_rafaga * 1000:9.1f}ms "
+              f"{t_cache * 1000:7.1f}ms   {'sí' if iguales else 'NO'}")
+    print(f"cálculos: {servidor.calculos}, agrupadas: {servidor.agrupadas}, aciertos: {servidor.aciertos}")
+    http.close()
+    await http.wait_closed()
+    await servidor.cerrar()
+
+
+def main(filas=None, procesos=None):
+    if filas:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sintetico
+
+        df = sintetico.cargar(filas)
+    else:
+        from matriculas.datos import cargar_matriculas
+
+        df = cargar_matriculas()
+    asyncio.run(bench(df, procesos))
+
+
+if __name__ == "__main__":
+    argumentos = [int(a.replace('_', '')) for a in sys.argv[1:]]
+    main(argumentos[0] if argumentos else None, argumentos[1] if len(argumentos) > 1 else None)
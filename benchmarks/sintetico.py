@@ -0,0 +1,88 @@
+"""
+Bases de matrículas sintéticas de cualquier tamaño a partir de
+``data/matriculas.csv``, ``carreras.csv`` e ``instituciones.csv``.
+
+Cada fila sintética es una fila de la tabla de hechos elegida al azar (con
+reposición) y resuelta con el esquema estrella, con un ``ID`` nuevo. Así se
+conservan las cardinalidades (las mismas carreras, instituciones, comunas,
+...) y las distribuciones conjuntas (edad por carrera, arancel por
+institución, años de ingreso). La base se escribe en partes Parquet de
+``FILAS_POR_PARTE`` filas dentro de ``data/.cache/sintetico/<filas>`` y se
+reutiliza en las siguientes corridas.
+
+Uso: python benchmarks/sintetico.py filas [filas ...]
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matriculas.datos import DIRECTORIO_CACHE, agregar_derivadas  # noqa: E402
+from matriculas.esquema import aplicar_esquema  # noqa: E402
+from matriculas.estrella import EsquemaEstrella  # noqa: E402
+
+DIRECTORIO_SINTETICO = os.path.join(DIRECTORIO_CACHE, 'sintetico')
+FILAS_POR_PARTE = 1_000_000
+SEMILLA = 2021
+
+
+def base_original():
+    """La base plana reconstruida desde las tablas normalizadas, con tipos compactos"""
+    df, _ = aplicar_esquema(EsquemaEstrella.cargar().vista())
+    # Las columnas de texto que no son catálogo se guardan como categorías
+    # para que el muestreo copie códigos y no textos
+    for columna in df.columns:
+        if df[columna].dtype == object or pd.api.types.is_string_dtype(df[columna]):
+            df[columna] = df[columna].astype('category')
+    return df
+
+
+def generar_parte(original, filas, inicio_id, rng):
+    """``filas`` filas muestreadas de ``original`` con IDs desde ``inicio_id``"""
+    parte = original.take(rng.integers(0, len(original), filas)).reset_index(drop=True)
+    parte['ID'] = np.arange(inicio_id, inicio_id + filas, dtype=np.int32)
+    return parte
+
+
+def directorio_base(filas):
+    return os.path.join(DIRECTORIO_SINTETICO, str(filas))
+
+
+def generar(filas, directorio=None, semilla=SEMILLA):
+    """Escribe (si no existe) la base sintética de ``filas`` filas y devuelve su directorio"""
+    directorio = directorio or directorio_base(filas)
+    # pyarrow ignora los archivos que empiezan con '_' al leer el directorio
+    marca = os.path.join(directorio, '_COMPLETA')
+    if os.path.exists(marca):
+        return directorio
+    os.makedirs(directorio, exist_ok=True)
+
+    original = base_original()
+    generadas = 0
+    for numero, tamano in enumerate(_tamanos_partes(filas)):
+        # Una semilla por parte: el resultado no depende del tamaño de las partes previas
+        rng = np.random.default_rng([semilla, numero])
+        parte = generar_parte(original, tamano, generadas + 1, rng)
+        parte.to_parquet(os.path.join(directorio, f'parte-{numero:05d}.parquet'), index=False)
+        generadas += tamano
+    with open(marca, 'w') as f:
+        f.write(str(generadas))
+    return directorio
+
+
+def _tamanos_partes(filas):
+    completas, resto = divmod(filas, FILAS_POR_PARTE)
+    return [FILAS_POR_PARTE] * completas + ([resto] if resto else [])
+
+
+def cargar(filas):
+    """La base sintética en memoria, como la entrega ``cargar_matriculas``"""
+    return agregar_derivadas(pd.read_parquet(generar(filas)))
+
+
+if __name__ == "__main__":
+    for argumento in sys.argv[1:] or ['10000']:
+        print(generar(int(argumento.replace('_', ''))))
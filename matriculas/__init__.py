@@ -0,0 +1,4 @@
+"""
+Herramientas compartidas para el análisis de matrículas de educación superior
+"""
+from matriculas.datos import cargar_matriculas, RUTA_EXCEL, RUTA_DATOS
@@ -0,0 +1,88 @@
+"""
+Línea de comandos: ``python -m matriculas [análisis ...]``.
+
+Ejemplos::
+
+    python -m matriculas genero salud campo
+    python -m matriculas correlaciones cruces --sin-graficos
+    python -m matriculas --graficos reportes/ --formatos png,svg
+    python -m matriculas salud campo cruces --incremental
+    python -m matriculas genero --traza traza.json
+    python -m matriculas --paralelo 8 --graficos reportes/
+"""
+import argparse
+import sys
+
+from matriculas.analisis import ANALISIS
+
+
+def _argumentos(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m matriculas',
+        description='Análisis de matrículas de educación superior.',
+    )
+    parser.add_argument('analisis', nargs='*', metavar='ANALISIS',
+                        help=f"análisis a ejecutar, en orden ({', '.join(ANALISIS)}); por defecto todos")
+    parser.add_argument('--datos', help='archivo de matrículas (Excel o CSV) o directorio de una base particionada; '
+                                        'por defecto el de data/')
+    parser.add_argument('--lista', action='store_true', help='muestra los análisis disponibles y termina')
+    parser.add_argument('--incremental', action='store_true',
+                        help='reutiliza los resultados intermedios guardados y recalcula solo lo que cambió')
+    parser.add_argument('--paralelo', nargs='?', type=int, const=0, default=None, metavar='PROCESOS',
+                        help='reparte los análisis en PROCESOS procesos con la base en memoria compartida '
+                             '(sin número: uno por núcleo)')
+    parser.add_argument('--traza', metavar='ARCHIVO',
+                        help='escribe el tiempo de cada etapa (Chrome/Perfetto .json, o pilas .folded)')
+    graficos = parser.add_mutually_exclusive_group()
+    graficos.add_argument('--graficos', metavar='DIRECTORIO',
+                          help='escribe los gráficos en DIRECTORIO sin abrir ventanas (en paralelo)')
+    graficos.add_argument('--sin-graficos', action='store_true', help='solo resultados en consola')
+    parser.add_argument('--formatos', default=None, help='formatos de archivo con --graficos, p. ej. png,svg')
+    parser.add_argument('--procesos', type=int, default=None, help='procesos para dibujar con --graficos')
+    args = parser.parse_args(argv)
+
+    if args.paralelo is not None and args.incremental:
+        parser.error("--paralelo no se puede combinar con --incremental")
+    desconocidos = [a for a in args.analisis if a not in ANALISIS]
+    if desconocidos:
+        parser.error(f"análisis desconocido: {', '.join(desconocidos)} (disponibles: {', '.join(ANALISIS)})")
+    return args
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    if args.lista:
+        for nombre, (_, _, descripcion) in ANALISIS.items():
+            print(f"{nombre:15s} {descripcion}")
+        return 0
+
+    from matriculas.analisis import ejecutar
+    from matriculas.graficos import SinGraficos, sesion_graficos
+
+    if args.sin_graficos:
+        graficos = SinGraficos()
+    else:
+        formatos = args.formatos.split(',') if args.formatos else None
+        graficos = sesion_graficos(args.graficos, formatos, args.procesos)
+    try:
+        ejecutar(args.analisis or list(ANALISIS), args.datos, graficos, args.incremental, args.paralelo)
+    finally:
+        graficos.cerrar()
+    if args.incremental:
+        from matriculas.analisis import tuberia
+
+        if tuberia.ultimo_grafo() is not None:
+            tuberia.resumen(tuberia.ultimo_grafo())
+    if args.traza:
+        import pandas as pd
+
+        from matriculas import instrumentacion
+
+        instrumentacion.exportar(args.traza)
+        with pd.option_context('display.width', 160, 'display.max_columns', 10):
+            print(instrumentacion.resumen().round(3), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Análisis disponibles por nombre.
+
+Cada análisis es una función ``ejecutar_*(datos=None, graficos=None)`` que
+recibe la base (ruta o DataFrame) y una sesión de gráficos (ver
+``matriculas.graficos``). Los módulos se importan recién al ejecutar el
+análisis, para que pedir uno no cargue las dependencias de los demás.
+
+``FILTROS`` declara las filas que usa cada análisis que no necesita la base
+completa; de una base particionada, ``ejecutar`` lee solo las particiones
+que pueden tener filas de alguno de los análisis pedidos.
+
+``PARTES`` divide los análisis largos en partes independientes, que con
+``procesos`` corren como tareas separadas del pool.
+"""
+import importlib
+import os
+
+# nombre -> (módulo, función, descripción)
+ANALISIS = {
+    'genero': ('matriculas.analisis.genero', 'ejecutar',
+               'Presencia femenina por carrera, área, año y tipo de institución'),
+    'salud': ('matriculas.analisis.areas', 'ejecutar_salud',
+              'Matrículas por año y en carreras de salud (género, pandemia)'),
+    'campo': ('matriculas.analisis.areas', 'ejecutar_campo',
+              'Matrículas en carreras de campo/animales/plantaciones por año'),
+    'correlaciones': ('matriculas.analisis.relaciones', 'ejecutar_correlaciones',
+                      'Correlaciones entre edad, duración, arancel y acreditación'),
+    'correlaciones_tipo': ('matriculas.analisis.relaciones', 'ejecutar_correlaciones_tipo',
+                           'Correlaciones entre campos numéricos por tipo de institución'),
+    'cruces': ('matriculas.analisis.relaciones', 'ejecutar_cruces',
+               'Promedios y conteos por combinaciones de 2 o más campos'),
+    'contingencia': ('matriculas.analisis.frecuencias', 'ejecutar',
+                     'Tablas de contingencia con chi-cuadrado y V de Cramér'),
+}
+
+# nombre -> función de matriculas.filtros con las filas que usa el análisis
+# (cada análisis vuelve a aplicar su filtro; los que no están usan todas)
+FILTROS = {
+    'correlaciones': 'desde_anio',
+    'correlaciones_tipo': 'desde_anio',
+    'cruces': 'desde_anio',
+}
+
+# nombre -> (módulo, función) que devuelve las partes del análisis: funciones
+# ``(datos, graficos)`` independientes cuyas salidas, en orden, son la del
+# análisis completo. Los que no están corren como una sola parte
+PARTES = {
+    'genero': ('matriculas.analisis.genero', 'partes'),
+    'cruces': ('matriculas.analisis.relaciones', 'partes_cruces'),
+}
+
+# Versiones que reutilizan los resultados intermedios guardados en disco y
+# solo recalculan lo que cambió (ver matriculas/analisis/tuberia.py)
+INCREMENTALES = {
+    'salud': ('matriculas.analisis.tuberia', 'ejecutar_salud'),
+    'campo': ('matriculas.analisis.tuberia', 'ejecutar_campo'),
+    'cruces': ('matriculas.analisis.tuberia', 'ejecutar_cruces'),
+}
+
+
+def obtener(nombre, incremental=False):
+    """
+    Función que ejecuta el análisis ``nombre``; con ``incremental``, su
+    versión incremental si la tiene.
+    """
+    if nombre not in ANALISIS:
+        raise KeyError(f"Análisis desconocido: {nombre} (disponibles: {', '.join(ANALISIS)})")
+    if incremental and nombre in INCREMENTALES:
+        modulo, funcion = INCREMENTALES[nombre]
+    else:
+        modulo, funcion, _ = ANALISIS[nombre]
+    return getattr(importlib.import_module(modulo), funcion)
+
+
+def partes(nombre):
+    """Partes independientes del análisis ``nombre`` (ver ``PARTES``)"""
+    if nombre in PARTES:
+        modulo, funcion = PARTES[nombre]
+        return getattr(importlib.import_module(modulo), funcion)()
+    return [obtener(nombre)]
+
+
+def filtro_comun(nombres):
+    """
+    Filtro con las filas que usan los análisis ``nombres`` (la unión de sus
+    filtros), o None si alguno necesita la base completa.
+    """
+    if not nombres or any(nombre not in FILTROS for nombre in nombres):
+        return None
+    from matriculas import filtros
+
+    distintos = {}
+    for nombre in nombres:
+        filtro = getattr(filtros, FILTROS[nombre])()
+        distintos.setdefault(repr(filtro), filtro)
+    distintos = list(distintos.values())
+    return distintos[0] if len(distintos) == 1 else filtros.O(*distintos)
+
+
+def ejecutar(nombres, datos=None, graficos=None, incremental=False, procesos=None):
+    """
+    Ejecuta los análisis ``nombres`` en orden, cargando la base una sola vez.
+    Con ``procesos`` (0: uno por núcleo) reparte sus partes (ver ``PARTES``)
+    en un pool de procesos que comparten la base (ver
+    ``matriculas/paralelo.py``); la salida queda en el mismo orden. Si ``datos`` es el directorio de una base
+    particionada, se leen solo las particiones de ``filtro_comun(nombres)``.
+    """
+    if procesos is not None and incremental:
+        raise ValueError("Las versiones incrementales no se pueden ejecutar en paralelo")
+    funciones = [obtener(nombre, incremental) for nombre in nombres]
+    if datos is None or not hasattr(datos, 'columns'):
+        if datos is not None and os.path.isdir(datos):
+            from matriculas.particiones import cargar_particiones
+
+            datos = cargar_particiones(filtro_comun(nombres), rutas=None, directorio=datos)
+        else:
+            from matriculas.datos import cargar_matriculas
+
+            datos = cargar_matriculas() if datos is None else cargar_matriculas(datos)
+    if procesos is not None:
+        from matriculas.paralelo import ejecutar_en_paralelo
+
+        ejecutar_en_paralelo(nombres, datos, graficos, procesos or None)
+        return
+    for funcion in funciones:
+        funcion(datos, graficos)
@@ -0,0 +1,203 @@
+"""
+Tendencias de matrícula por año: total, carreras de salud (incluye género y
+pandemia) y carreras de campo (antes en ``estad_1.py``).
+"""
+import pandas as pd
+
+from matriculas.clasificador import CLASIFICADOR_CARRERAS
+from matriculas.datos import cargar_matriculas
+from matriculas.esquema import es_entero
+from matriculas.graficos import Grafico, SinGraficos
+from matriculas.instrumentacion import instrumentar
+from matriculas.texto import normalizar_columna
+
+
+def _cargar(datos):
+    if isinstance(datos, pd.DataFrame):
+        return datos
+    return cargar_matriculas() if datos is None else cargar_matriculas(datos)
+
+
+def areas_carrera(df):
+    """
+    Máscaras por área (salud, campo, ...) según las palabras clave de
+    ``matriculas/clasificador.py``, calculadas en una sola pasada.
+    """
+    if 'NOMBRE CARRERA NORMALIZADO' in df.columns:
+        nombres = df['NOMBRE CARRERA NORMALIZADO']
+    else:
+        nombres = normalizar_columna(df['NOMBRE CARRERA'])
+    return CLASIFICADOR_CARRERAS.mascaras(nombres)
+
+
+def conteo_anual(df):
+    """Registros por año de ingreso"""
+    return df.groupby('AÑO INGRESO').size()
+
+
+def solo_anios_enteros(serie):
+    """Los valores de ``serie`` cuyo año (índice) es entero, con el año como int"""
+    serie = serie[es_entero(serie.index.to_series()).to_numpy()]
+    serie.index = serie.index.astype(int)
+    return serie
+
+
+def conteos_salud(df_salud):
+    """
+    Matrículas por año en carreras de salud: total, mujeres y hombres. Los
+    conteos de partes con años distintos se juntan con ``pd.concat``.
+    """
+    genero = df_salud['GENERO'].str.lower()
+    return {
+        'salud': conteo_anual(df_salud),
+        'mujeres': conteo_anual(df_salud[genero.str.contains('femenino|mujer|f', na=False)]),
+        'hombres': conteo_anual(df_salud[genero.str.contains('masculino|hombre|m', na=False)]),
+    }
+
+
+def tablas_salud(total_anual, conteos):
+    """Tendencia, porcentaje sobre el total y años prepandemia/pandemia"""
+    tendencia_salud = conteos['salud']
+    porcentaje_salud = (tendencia_salud / total_anual * 100).fillna(0)
+    # Usar solo años enteros
+    salud_anos = solo_anios_enteros(tendencia_salud)
+    return {
+        'tendencia': tendencia_salud,
+        'porcentaje': porcentaje_salud,
+        'mujeres': conteos['mujeres'],
+        'hombres': conteos['hombres'],
+        'prepandemia': salud_anos[salud_anos.index < 2020],
+        'pandemia': salud_anos[salud_anos.index.isin([2020, 2021])],
+    }
+
+
+def tablas_campo(total_anual, tendencia):
+    """Tendencia de carreras de campo y porcentaje sobre el total"""
+    return {
+        'tendencia': tendencia,
+        'porcentaje': (tendencia / total_anual * 100).fillna(0),
+    }
+
+
+def mostrar_matriculas_por_anio(matriculas_totales, graficos=None):
+    graficos = graficos or SinGraficos()
+    print("\nCantidad total de personas matriculadas por año (solo años enteros):")
+    print(matriculas_totales)
+
+    # Gráfico de la cantidad total de personas matriculadas por año (solo años enteros)
+    graficos.dibujar(Grafico('matriculas_totales_por_anio', 'linea', matriculas_totales, dict(
+        tamano=(10, 5), color='tab:blue', marcas_x=True, grilla=True,
+        titulo='Cantidad total de personas matriculadas por año (solo años enteros)',
+        xlabel='Año de ingreso', ylabel='Cantidad de personas matriculadas',
+    )))
+
+
+def mostrar_salud(tablas, graficos=None):
+    graficos = graficos or SinGraficos()
+
+    # Gráfico combinado: cantidad y porcentaje de matrículas en salud por año
+    graficos.dibujar(Grafico('salud_por_anio', 'doble_eje', (tablas['tendencia'], tablas['porcentaje']), dict(
+        tamano=(10, 5),
+        colores=('tab:red', 'tab:purple'),
+        etiquetas=('Cantidad de matrículas (salud)', 'Porcentaje (%)'),
+        ylabels=('Cantidad de matrículas (salud)', 'Porcentaje (%)'),
+        xlabel='Año de ingreso',
+        titulo_figura='Matrículas en carreras del área de la salud por año',
+        leyenda_figura=dict(loc='upper left', bbox_to_anchor=(0.15, 0.85)),
+    )))
+
+    # Gráfico de mujeres en carreras de salud
+    graficos.dibujar(Grafico('salud_mujeres_por_anio', 'linea', tablas['mujeres'], dict(
+        tamano=(10, 5), color='deeppink', label='Mujeres', grilla=True, leyenda=True,
+        titulo='Cantidad de mujeres matriculadas en carreras de salud por año',
+        xlabel='Año de ingreso', ylabel='Cantidad de mujeres',
+    )))
+
+    # Gráfico de hombres en carreras de salud
+    graficos.dibujar(Grafico('salud_hombres_por_anio', 'linea', tablas['hombres'], dict(
+        tamano=(10, 5), color='navy', label='Hombres', grilla=True, leyenda=True,
+        titulo='Cantidad de hombres matriculados en carreras de salud por año',
+        xlabel='Año de ingreso', ylabel='Cantidad de hombres',
+    )))
+
+    # --- Comparación de matrículas en carreras de salud: prepandemia vs pandemia (2020-2021) ---
+    print("\nMatrículas en carreras de salud - Años prepandemia:")
+    print(tablas['prepandemia'])
+    print("\nMatrículas en carreras de salud - Años pandemia (2020-2021):")
+    print(tablas['pandemia'])
+
+    # Gráfico comparativo
+    graficos.dibujar(Grafico('salud_prepandemia_pandemia', 'columnas', [
+        (tablas['prepandemia'], dict(color='skyblue', label='Pre-pandemia')),
+        (tablas['pandemia'], dict(color='salmon', label='Pandemia (2020-2021)')),
+    ], dict(
+        tamano=(8, 5), leyenda=True,
+        titulo='Matrículas en carreras de salud: Pre-pandemia vs Pandemia (2020-2021)',
+        xlabel='Año de ingreso', ylabel='Cantidad de matrículas',
+    )))
+
+
+def mostrar_campo(tablas, graficos=None):
+    graficos = graficos or SinGraficos()
+    print("Tendencia de matrículas en carreras de campo/animales/plantaciones por año:")
+    print(tablas['tendencia'])
+
+    print("\nPorcentaje de matrículas en carreras de campo respecto al total por año:")
+    print(tablas['porcentaje'])
+
+    # Gráfico combinado: cantidad y porcentaje de matrículas por año
+    graficos.dibujar(Grafico('campo_por_anio', 'doble_eje', (tablas['tendencia'], tablas['porcentaje']), dict(
+        tamano=(10, 5),
+        colores=('tab:blue', 'tab:green'),
+        etiquetas=('Cantidad de matrículas', 'Porcentaje (%)'),
+        ylabels=('Cantidad de matrículas', 'Porcentaje (%)'),
+        xlabel='Año de ingreso',
+        titulo_figura='Matrículas en carreras de campo/animales/plantaciones por año',
+        leyenda_figura=dict(loc='upper left', bbox_to_anchor=(0.15, 0.85)),
+    )))
+
+
+@instrumentar
+def matriculas_por_anio(df, graficos=None):
+    """Cantidad total de personas matriculadas por año"""
+    # Filtrar solo años completos (enteros); con el esquema compacto la columna
+    # ya es int16 y la validación no descarta nada
+    matriculas_totales = solo_anios_enteros(conteo_anual(df))
+    mostrar_matriculas_por_anio(matriculas_totales, graficos)
+    return matriculas_totales
+
+
+@instrumentar
+def analizar_salud(df, graficos=None, areas=None):
+    """Matrículas en carreras de salud por año, por género y antes/durante la pandemia"""
+    areas = areas_carrera(df) if areas is None else areas
+
+    # Filtrar carreras de salud
+    df_salud = df[areas['salud']]
+    mostrar_salud(tablas_salud(conteo_anual(df), conteos_salud(df_salud)), graficos)
+    return df_salud
+
+
+@instrumentar
+def analizar_campo(df, graficos=None, areas=None):
+    """Matrículas en carreras de campo/animales/plantaciones por año"""
+    areas = areas_carrera(df) if areas is None else areas
+
+    # Filtrar carreras relacionadas
+    df_campo = df[areas['campo']]
+    mostrar_campo(tablas_campo(conteo_anual(df), conteo_anual(df_campo)), graficos)
+    return df_campo
+
+
+def ejecutar_salud(datos=None, graficos=None):
+    """Total por año y análisis de salud (la primera parte de ``estad_1.py``)"""
+    df = _cargar(datos)
+    areas = areas_carrera(df)
+    matriculas_por_anio(df, graficos)
+    analizar_salud(df, graficos, areas)
+
+
+def ejecutar_campo(datos=None, graficos=None):
+    """Análisis de carreras de campo (la última parte de ``estad_1.py``)"""
+    df = _cargar(datos)
+    analizar_campo(df, graficos)
@@ -0,0 +1,75 @@
+"""
+Tablas de contingencia de la sección "Frecuencia" del README: tipo de
+institución × área de conocimiento, vía de ingreso × tipo de institución y
+nivel de carrera × jornada, con χ² y V de Cramér (ver
+``matriculas/contingencia.py``).
+"""
+import pandas as pd
+
+from matriculas.contingencia import (TablaContingencia, agrupar_menores, calcular_contingencias, resumen_asociacion,
+                                     tabla_disponible)
+from matriculas.datos import cargar_matriculas
+from matriculas.graficos import Grafico, SinGraficos, graficos_por_fila
+from matriculas.instrumentacion import instrumentar
+
+TABLAS = [
+    TablaContingencia("tipo_area", "TIPO DE INSTITUCION", "AREA CONOCIMIENTO"),
+    TablaContingencia("via_tipo", "VIA DE INGRESO", "TIPO DE INSTITUCION"),
+    TablaContingencia("nivel_jornada", "NIVEL CARRERA", "JORNADA"),
+]
+
+# Título de cada tabla y si se lee por fila (distribución de las columnas
+# dentro de cada fila) o por columna
+TITULOS = {
+    "tipo_area": ("Áreas de conocimiento por tipo de institución", "por_fila"),
+    "via_tipo": ("Vías de ingreso por tipo de institución", "por_columna"),
+    "nivel_jornada": ("Jornadas por nivel de carrera", "por_fila"),
+}
+
+# En las tortas, las categorías con menos de esta proporción van a 'Otros'
+UMBRAL_OTROS = 0.01
+
+
+@instrumentar
+def analizar_contingencias(df, graficos=None, tablas=None):
+    """Frecuencias absolutas y relativas y asociación (χ², V de Cramér) de cada tabla"""
+    graficos = graficos or SinGraficos()
+    tablas = [t for t in (tablas or TABLAS) if tabla_disponible(df, t)]
+    resultados = calcular_contingencias(df, tablas)
+
+    print("\n--- Tablas de contingencia ---")
+    for nombre, resultado in resultados.items():
+        titulo, lectura = TITULOS.get(nombre, (nombre, "por_fila"))
+        relativa = getattr(resultado, lectura)
+        print(f"\n{titulo} (frecuencias absolutas):")
+        print(resultado.absoluta)
+        print(f"\nFrecuencia relativa ({lectura.replace('_', ' ')}):")
+        print(relativa.round(3))
+        print(f"χ² = {resultado.chi2:.1f} (gl = {resultado.gl}, p = {resultado.p:.3g}), "
+              f"V de Cramér = {resultado.v_cramer:.3f}")
+        # Barras apiladas: cada barra suma 1
+        datos = relativa if lectura == "por_fila" else relativa.T
+        graficos.dibujar(Grafico(nombre, "barras", datos, dict(
+            apilado=True, tamano=(12, 7),
+            titulo=f"Frecuencia relativa: {titulo.lower()}",
+            xlabel=datos.index.name,
+            ylabel="Frecuencia relativa",
+        )))
+
+    # Una torta por tipo de institución (áreas de menos de 1% en 'Otros')
+    if "tipo_area" in resultados:
+        areas = agrupar_menores(resultados["tipo_area"].por_fila, umbral=UMBRAL_OTROS)
+        graficos.dibujar_todos(graficos_por_fila(areas, "areas_{}", "torta", dict(
+            tamano=(8, 8), autopct="%1.2f%%", startangle=140, pctdistance=0.8, labeldistance=1.05,
+            titulo="Distribución de áreas de conocimiento en {}",
+        )))
+
+    print("\nAsociación entre variables:")
+    print(resumen_asociacion(resultados).round(4))
+    return resultados
+
+
+def ejecutar(datos=None, graficos=None):
+    if not isinstance(datos, pd.DataFrame):
+        datos = cargar_matriculas() if datos is None else cargar_matriculas(datos)
+    analizar_contingencias(datos, graficos)
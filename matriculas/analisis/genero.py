@@ -0,0 +1,316 @@
+"""
+Análisis de género por carrera, área de conocimiento, año de ingreso y tipo
+de institución (antes en ``estadistica.py``).
+"""
+import functools
+import os
+
+import pandas as pd
+
+from matriculas.datos import cargar_matriculas
+from matriculas.filtros import carreras_con_minimo, desde_anio
+from matriculas.genero import SoloMujeres, agregar_mascara_genero, mascara_mujeres, participacion_femenina
+from matriculas.graficos import Grafico, sesion_graficos
+from matriculas.instrumentacion import instrumentar
+from matriculas.ranking import Rankings, filas_mayores
+
+
+def _cargar(datos):
+    """La base desde una ruta (o la ruta por defecto) o una copia del DataFrame"""
+    if isinstance(datos, pd.DataFrame):
+        return datos.copy()
+    if datos is None:
+        return cargar_matriculas()
+    return cargar_matriculas(os.fspath(datos))
+
+
+@instrumentar
+def analizar_genero_carreras(datos=None, graficos=None, pasos=None):
+    """
+    Analiza la relación entre el género y las carreras/áreas de conocimiento.
+    ``datos`` puede ser la ruta del archivo o un DataFrame ya cargado (no se
+    modifica). ``pasos``: los de ``PASOS`` que se muestran (por defecto
+    todos, en orden).
+    """
+    pasos = PASOS if pasos is None else pasos
+    try:
+        # Cargar el archivo Excel (o su caché columnar)
+        df = _cargar(datos)
+        
+        if _resumen in pasos:
+            print("✅ Archivo cargado exitosamente")
+            print(f"📊 Total de registros: {len(df)}")
+            print("\n📋 Columnas disponibles:")
+            print(df.columns.tolist())
+        
+        # Verificar que exista la columna GENERO
+        if 'GENERO' not in df.columns:
+            if _resumen in pasos:
+                print("❌ No se encuentra la columna 'GENERO'")
+                print("Columnas disponibles:", df.columns.tolist())
+            return
+        
+        # Limpiar y estandarizar los datos de género
+        df['GENERO'] = df['GENERO'].str.upper().str.strip()
+        # Resolver el género una sola vez (columna booleana 'ES MUJER')
+        agregar_mascara_genero(df)
+        # FILTROS: Excluir años previos a 2010 y, entre los años restantes,
+        # carreras con menos de 15 matrículas por año (un solo recorte)
+        nombre_carrera_col = 'NOMBRE CARRERA' if 'NOMBRE CARRERA' in df.columns else 'CARRERA'
+        df = (desde_anio() & carreras_con_minimo(carrera=nombre_carrera_col)).aplicar(df)
+        # Conteos por categoría compartidos por el informe y los gráficos
+        rankings = Rankings(df)
+        for paso in pasos:
+            paso(df, graficos, rankings)
+        
+    except Exception as e:
+        print(f"❌ Error al procesar el archivo: {e}")
+
+
+def _resumen(df, graficos, rankings):
+    # Contar distribución por género
+    distribucion_genero = df['GENERO'].value_counts()
+    print(f"\n👥 Distribución por género:")
+    for genero, cantidad in distribucion_genero.items():
+        porcentaje = (cantidad / len(df)) * 100
+        print(f"   {genero}: {cantidad} ({porcentaje:.1f}%)")
+
+
+def _carreras(df, graficos, rankings):
+    # Análisis 1: Carreras con mayor presencia femenina
+    print("\n" + "="*60)
+    print("🎓 CARRERAS CON MAYOR PRESENCIA FEMENINA")
+    print("="*60)
+    
+    if 'NOMBRE CARRERA' in df.columns:
+        analizar_por_categoria(df, 'NOMBRE CARRERA', 'Carrera', rankings)
+
+
+def _areas(df, graficos, rankings):
+    # Análisis 2: Áreas de conocimiento con mayor presencia femenina
+    print("\n" + "="*60)
+    print("📚 ÁREAS DE CONOCIMIENTO CON MAYOR PRESENCIA FEMENINA")
+    print("="*60)
+    
+    if 'AREA CONOCIMIENTO' in df.columns:
+        analizar_por_categoria(df, 'AREA CONOCIMIENTO', 'Área de conocimiento', rankings)
+
+
+def _evolucion(df, graficos, rankings):
+    # Análisis 3: Evolución temporal por año de ingreso
+    if 'AÑO INGRESO' in df.columns:
+        analizar_evolucion_temporal(df)
+
+
+def _tipo_institucion(df, graficos, rankings):
+    # Análisis 4: Por tipo de institución
+    if 'TIPO DE INSTITUCION' in df.columns:
+        analizar_por_tipo_institucion(df)
+
+
+def _graficos(df, graficos, rankings):
+    # Generar gráficos (los top 8 y top 6 salen de los conteos del informe)
+    generar_graficos(df, graficos, rankings)
+
+
+# Pasos de ``analizar_genero_carreras`` en el orden del informe; cada uno
+# recibe la base filtrada, la sesión de gráficos y los ``Rankings`` compartidos
+PASOS = (_resumen, _carreras, _areas, _evolucion, _tipo_institucion, _graficos)
+
+
+@instrumentar
+def analizar_por_categoria(df, columna_categoria, nombre_categoria, rankings=None):
+    """
+    Analiza la distribución de género por categoría específica
+    """
+    if rankings is None:
+        rankings = Rankings(df)
+    # Contar mujeres por categoría
+    conteo_categorias = rankings.mayores(10, columna_categoria, filtro=SoloMujeres())
+    # Total de registros por categoría (un solo conteo para todas)
+    totales = rankings.agregado(columna_categoria)
+    
+    print(f"\nTop 10 {nombre_categoria.lower()}s con más mujeres:")
+    for i, (categoria, cantidad) in enumerate(conteo_categorias.items(), 1):
+        total_categoria = totales.get(categoria, 0)
+        porcentaje_mujeres = (cantidad / total_categoria * 100) if total_categoria > 0 else 0
+        print(f"{i:2d}. {categoria}: {cantidad} mujeres ({porcentaje_mujeres:.1f}% del total)")
+    
+    return conteo_categorias
+
+
+@instrumentar
+def analizar_evolucion_temporal(df):
+    """
+    Analiza la evolución de la matrícula femenina por año
+    """
+    print("\n" + "="*60)
+    print("📈 EVOLUCIÓN TEMPORAL DE MATRÍCULA FEMENINA")
+    print("="*60)
+    
+    # Agrupar por año de ingreso
+    evolucion = (mascara_mujeres(df).groupby(df['AÑO INGRESO']).mean() * 100).reset_index()
+    
+    evolucion.columns = ['Año', 'Porcentaje_Mujeres']
+    evolucion = evolucion.sort_values('Año')
+    
+    print("Evolución del porcentaje de mujeres por año:")
+    for _, row in evolucion.iterrows():
+        print(f"  {int(row['Año'])}: {row['Porcentaje_Mujeres']:.1f}%")
+
+
+@instrumentar
+def analizar_por_tipo_institucion(df):
+    """
+    Analiza la distribución por tipo de institución
+    """
+    print("\n" + "="*60)
+    print("🏫 DISTRIBUCIÓN POR TIPO DE INSTITUCIÓN")
+    print("="*60)
+    
+    if 'TIPO DE INSTITUCION' in df.columns:
+        distribucion_instituciones = participacion_femenina(df, 'TIPO DE INSTITUCION')
+
+        for stats in distribucion_instituciones.itertuples():
+            print(f"\n{stats.Index}:")
+            print(f"  Total estudiantes: {stats.Total}")
+            print(f"  Mujeres: {stats.Mujeres}")
+            print(f"  Porcentaje mujeres: {stats.Porcentaje_Mujeres:.1f}%")
+
+
+@instrumentar
+def generar_graficos(df, graficos=None, rankings=None):
+    """
+    Genera gráficos para visualizar los resultados
+    """
+    propia = graficos is None
+    if propia:
+        graficos = sesion_graficos()
+    if rankings is None:
+        rankings = Rankings(df)
+    try:
+        paneles = []
+        
+        # Gráfico 1: Distribución por género
+        distribucion_genero = df['GENERO'].value_counts()
+        paneles.append(Grafico('distribucion_genero', 'torta', distribucion_genero,
+                               dict(titulo='Distribución por Género')))
+        
+        # Registros de mujeres (la máscara se calcula una sola vez en rankings)
+        mujeres = SoloMujeres()
+        
+        # Gráfico 2: Top carreras con más mujeres
+        if 'NOMBRE CARRERA' in df.columns:
+            top_carreras = rankings.mayores(8, 'NOMBRE CARRERA', filtro=mujeres)
+            paneles.append(Grafico('top_carreras_mujeres', 'barras_horizontales', top_carreras, dict(
+                titulo='Top 8 Carreras con más Mujeres', xlabel='Cantidad de Mujeres')))
+        
+        # Gráfico 3: Distribución por áreas de conocimiento
+        if 'AREA CONOCIMIENTO' in df.columns:
+            areas_dist = rankings.mayores(6, 'AREA CONOCIMIENTO', filtro=mujeres)
+            paneles.append(Grafico('areas_mujeres', 'barras_simples', areas_dist, dict(
+                rotacion_x=(45, 'right'), titulo='Mujeres por Área de Conocimiento (Top 6)',
+                ylabel='Cantidad de Mujeres')))
+        
+        # Gráfico 4: Evolución temporal
+        if 'AÑO INGRESO' in df.columns:
+            evolucion = mascara_mujeres(df).groupby(df['AÑO INGRESO']).mean() * 100
+            # Años enteros para el eje x
+            evolucion.index = evolucion.index.astype(int)
+            paneles.append(Grafico('evolucion_mujeres', 'linea', evolucion, dict(
+                marcas_x=True, ylim=(0, 100), grilla=True,
+                titulo='Evolución del % de Mujeres por Año',
+                xlabel='Año de Ingreso', ylabel='Porcentaje de Mujeres (%)')))
+        
+        # Los cuatro gráficos en una grilla de 2x2, guardada a 300 dpi
+        panel = Grafico('analisis_genero_carreras', 'panel', paneles,
+                        dict(tamano=(15, 10), filas=2, columnas=2, paleta='husl'))
+        ruta = graficos.guardar(panel, 'analisis_genero_carreras.png', dpi=300)
+        if ruta:
+            print(f"\n📊 Gráficos guardados como '{ruta}'")
+        
+    except Exception as e:
+        print(f"⚠️ Error al generar gráficos: {e}")
+    finally:
+        if propia:
+            graficos.cerrar()
+
+
+@instrumentar
+def analisis_detallado_carreras(df, top_n=5):
+    """
+    Análisis detallado de las carreras con mayor y menor presencia femenina
+    """
+    print("\n" + "="*60)
+    print("🔍 ANÁLISIS DETALLADO POR CARRERA")
+    print("="*60)
+    
+    if 'NOMBRE CARRERA' in df.columns:
+        # Calcular porcentaje de mujeres por carrera
+        stats_carreras = participacion_femenina(df, 'NOMBRE CARRERA').reset_index()
+        stats_carreras = stats_carreras.rename(columns={'NOMBRE CARRERA': 'Carrera'})
+        
+        # Carreras con mayor porcentaje de mujeres
+        top_femeninas = filas_mayores(stats_carreras, top_n, 'Porcentaje_Mujeres')
+        print(f"\n🏆 Top {top_n} carreras con MAYOR porcentaje de mujeres:")
+        for i, (_, row) in enumerate(top_femeninas.iterrows(), 1):
+            print(f"{i}. {row['Carrera']}: {row['Porcentaje_Mujeres']:.1f}% ({row['Mujeres']}/{row['Total']})")
+        
+        # Carreras con menor porcentaje de mujeres
+        top_masculinas = filas_mayores(stats_carreras, top_n, 'Porcentaje_Mujeres', ascendente=True)
+        print(f"\n🔧 Top {top_n} carreras con MENOR porcentaje de mujeres:")
+        for i, (_, row) in enumerate(top_masculinas.iterrows(), 1):
+            print(f"{i}. {row['Carrera']}: {row['Porcentaje_Mujeres']:.1f}% ({row['Mujeres']}/{row['Total']})")
+
+
+def ejecutar(datos=None, graficos=None):
+    """Análisis completo de género (lo que corre ``estadistica.py``)"""
+    _encabezado()
+    
+    # Ejecutar análisis principal
+    analizar_genero_carreras(datos, graficos)
+    _analisis_adicional(datos)
+
+
+def _encabezado():
+    print("🔍 INICIANDO ANÁLISIS DE GÉNERO Y CARRERAS")
+    print("="*60)
+
+
+def _analisis_adicional(datos):
+    # Cargar datos para análisis adicional
+    try:
+        df = _cargar(datos)
+        df['GENERO'] = df['GENERO'].str.upper().str.strip()
+        agregar_mascara_genero(df)
+        
+        # Ejecutar análisis detallado
+        analisis_detallado_carreras(df)
+        
+        print("\n✅ Análisis completado exitosamente!")
+        print("\n📁 Resultados disponibles en:")
+        print("   - Consola: Resumen estadístico")
+        print("   - Archivo: analisis_genero_carreras.png (gráficos)")
+        
+    except Exception as e:
+        print(f"❌ Error en análisis adicional: {e}")
+
+
+def _parte(datos, graficos, paso):
+    """El paso ``paso`` de ``ejecutar``: uno de ``PASOS`` o, el último, el análisis adicional"""
+    if paso == 0:
+        _encabezado()
+    if paso < len(PASOS):
+        analizar_genero_carreras(datos, graficos, pasos=PASOS[paso:paso + 1])
+    else:
+        _analisis_adicional(datos)
+
+
+def partes():
+    """
+    ``ejecutar`` dividido en partes independientes (ver
+    ``matriculas.analisis.PARTES``): cada paso de ``analizar_genero_carreras``
+    y el análisis detallado por carrera. Cada parte carga y filtra la base
+    por su cuenta; sus salidas, en orden, son la de ``ejecutar``.
+    """
+    return [functools.partial(_parte, paso=paso) for paso in range(len(PASOS) + 1)]
@@ -0,0 +1,381 @@
+"""
+Relaciones entre campos: edad, duración y arancel (correlaciones y mapa de
+calor) y cruces de promedios/conteos entre 2 o más campos (antes en
+``relacionEdadDuracion.py``).
+"""
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from matriculas.correlaciones import correlacion, correlacion_por_grupo, correlaciones_fuertes, matriz_numerica
+from matriculas.cruces import Cruce, calcular_cruces, cruce_disponible
+from matriculas.datos import cargar_matriculas
+from matriculas.filtros import desde_anio
+from matriculas.graficos import Grafico, SinGraficos
+from matriculas.instrumentacion import instrumentar
+from matriculas.particiones import cargar_particiones
+from matriculas.ranking import mayores
+from matriculas.texto import normalizar
+
+DURACION_PLAN = "DURACION PLAN DE ESTUDIO (SEMESTRES)"
+DURACION_TOTAL = "DURACION TOTAL CARRERA (SEMESTRES)"
+ARANCEL = "VALOR ARANCEL (PESOS)"
+
+# Campos de la matriz de correlación (los que falten en la base quedan en NaN)
+CAMPOS_NUMERICOS = [
+    "EDAD",
+    DURACION_PLAN,
+    "DURACION PROCESO TITULACION (SEMESTRES)",
+    DURACION_TOTAL,
+    "VALOR MATRICULA (PESOS)",
+    ARANCEL,
+    "AÑOS DE ACREDITACION",
+]
+UMBRAL_FUERTE = 0.5
+
+# Cruces de campos: se declaran todos y se calculan juntos. Cada columna
+# clave se codifica una sola vez y todos los promedios/conteos salen de esos
+# mismos códigos (ver matriculas/cruces.py)
+CRUCES = [
+    # Cruces de 2 campos
+    Cruce("duracion_tipo", ("TIPO DE INSTITUCION",), DURACION_PLAN),
+    Cruce("arancel_area", ("AREA CONOCIMIENTO",), ARANCEL),
+    Cruce("edad_modalidad", ("MODALIDAD",), "EDAD"),
+    Cruce("duracion_comuna", ("COMUNA SEDE",), DURACION_TOTAL),
+    Cruce("genero_area", ("AREA CONOCIMIENTO", "GENERO"), agregacion="size"),
+    Cruce("arancel_anio", ("AÑO INGRESO",), ARANCEL),
+    Cruce("duracion_nivel", ("NIVEL DE ESTUDIO CARRERA",), DURACION_PLAN),
+    Cruce("edad_requisito", ("REQUISITO INGRESO",), "EDAD"),
+    Cruce("duracion_jornada", ("JORNADA",), DURACION_PLAN),
+    # Cruces de 3 o más campos
+    Cruce("duracion_genero_tipo", ("GENERO", "TIPO DE INSTITUCION"), DURACION_PLAN),
+    Cruce("arancel_area_modalidad", ("AREA CONOCIMIENTO", "MODALIDAD"), ARANCEL),
+    Cruce("edad_jornada_requisito", ("JORNADA", "REQUISITO INGRESO"), "EDAD"),
+    Cruce("duracion_comuna_tipo_area", ("COMUNA SEDE", "TIPO DE INSTITUCION", "AREA CONOCIMIENTO"), DURACION_TOTAL),
+    Cruce("cantidad_anio_genero_area", ("AÑO INGRESO", "GENERO", "AREA CONOCIMIENTO"), agregacion="size"),
+]
+
+# Secciones del informe de cruces, en orden: cada una muestra el cruce del
+# mismo nombre, salvo "duracion_acreditacion" (una correlación)
+SECCIONES_CRUCES = [
+    "duracion_tipo", "arancel_area", "edad_modalidad", "duracion_comuna", "genero_area",
+    "arancel_anio", "duracion_nivel", "duracion_acreditacion", "edad_requisito", "duracion_jornada",
+    "duracion_genero_tipo", "arancel_area_modalidad", "edad_jornada_requisito",
+    "duracion_comuna_tipo_area", "cantidad_anio_genero_area",
+]
+
+
+@instrumentar
+def cargar_filtrado(datos=None):
+    """
+    La base (ruta, directorio de una base particionada o DataFrame) sin los
+    años de ingreso previos a 2010. De una base particionada se leen solo
+    las particiones desde 2010.
+    """
+    if isinstance(datos, (str, os.PathLike)) and os.path.isdir(datos):
+        return cargar_particiones(desde_anio(), rutas=None, directorio=datos)
+    if isinstance(datos, pd.DataFrame):
+        df = datos
+    else:
+        df = cargar_matriculas() if datos is None else cargar_matriculas(datos)
+    # FILTRO: Excluir años previos a 2010 (si existe la columna 'AÑO INGRESO')
+    return desde_anio().aplicar(df)
+
+
+@instrumentar
+def analizar_correlaciones(df, graficos=None, metodo='pearson'):
+    """
+    Edad vs. duración y arancel, matriz de correlación y correlaciones
+    fuertes. ``metodo``: 'pearson' o 'spearman' (rangos).
+    """
+    graficos = graficos or SinGraficos()
+
+    # Los campos numéricos se convierten una sola vez; cada par usa las
+    # filas donde ambos campos tienen dato (ver matriculas/correlaciones.py)
+    valores = matriz_numerica(df, CAMPOS_NUMERICOS)
+    resultado = correlacion(valores, CAMPOS_NUMERICOS, metodo)
+    matriz_corr = resultado.coeficientes
+
+    # Gráfico de dispersión (filas con edad y duración)
+    edades, duracion = valores[:, 0], valores[:, 1]
+    validas = ~(np.isnan(edades) | np.isnan(duracion))
+    graficos.dibujar(Grafico("edad_duracion", "dispersion", (edades[validas], duracion[validas]), dict(
+        tamano=(8, 5), alpha=0.5, grilla=True,
+        titulo="Relación entre edad y duración de la carrera",
+        xlabel="Edad de la persona",
+        ylabel="Duración de la carrera (semestres)",
+    )))
+
+    # Correlación
+    print("*" * 70)
+    print(f"Correlación entre edad y duración de la carrera: {matriz_corr.loc['EDAD', DURACION_PLAN]:.2f}")
+
+    # Correlación entre edad y valor arancel
+    if ARANCEL in df.columns:
+        print(f"Correlación entre edad y valor del arancel: {matriz_corr.loc['EDAD', ARANCEL]:.2f}")
+    else:
+        print("No existe la columna 'VALOR ARANCEL (PESOS)' en el archivo.")
+
+    # --- Matriz de correlación entre todos los campos numéricos ---
+    # (las columnas que no existan en el archivo quedan con NaN)
+    print("\nMatriz de correlación entre campos numéricos:")
+    print(matriz_corr)
+
+    # --- Gráfico de correlaciones (heatmap) ---
+    # Crear máscara para eliminar la mitad superior
+    mask = np.triu(np.ones_like(matriz_corr, dtype=bool), k=1)
+    graficos.dibujar(Grafico("matriz_correlacion", "calor", matriz_corr, dict(
+        tamano=(10, 8), mascara=mask, annot=True, fmt=".2f", cmap="coolwarm", vmin=-1, vmax=1,
+        titulo="Mapa de calor de correlaciones entre campos numéricos (solo mitad inferior)",
+    )))
+
+    # Mostrar las correlaciones más fuertes (mayor a 0.5 o menor a -0.5, excluyendo la diagonal)
+    print("\nCorrelaciones fuertes (>|0.5|):")
+    for col1, col2, corr_val in correlaciones_fuertes(matriz_corr, UMBRAL_FUERTE).itertuples(index=False):
+        print(f"{col1} vs {col2}: {corr_val:.2f}")
+    return matriz_corr
+
+
+@instrumentar
+def analizar_correlaciones_por_grupo(df, graficos=None, grupo="TIPO DE INSTITUCION", metodo='pearson'):
+    """Matriz de correlación y correlaciones fuertes para cada valor de ``grupo``"""
+    graficos = graficos or SinGraficos()
+    resultado = correlacion_por_grupo(df, CAMPOS_NUMERICOS, grupo, metodo)
+
+    print(f"\n--- Correlaciones entre campos numéricos por {grupo.lower()} ---")
+    for valor, matriz in resultado.coeficientes.groupby(level=0, sort=False):
+        matriz = matriz.droplevel(0)
+        observaciones = resultado.observaciones.loc[valor]
+        print(f"\n{valor} (N = {observaciones.to_numpy().diagonal().max()}):")
+        fuertes = correlaciones_fuertes(matriz, UMBRAL_FUERTE, observaciones)
+        if fuertes.empty:
+            print("Sin correlaciones fuertes (>|0.5|)")
+        for col1, col2, corr_val, n in fuertes.itertuples(index=False):
+            print(f"{col1} vs {col2}: {corr_val:.2f} (N = {n})")
+        mask = np.triu(np.ones_like(matriz, dtype=bool), k=1)
+        graficos.dibujar(Grafico(f"matriz_correlacion_{normalizar(valor).replace(' ', '_')}", "calor", matriz, dict(
+            tamano=(10, 8), mascara=mask, annot=True, fmt=".2f", cmap="coolwarm", vmin=-1, vmax=1,
+            titulo=f"Correlaciones entre campos numéricos: {valor}",
+        )))
+    return resultado
+
+
+@instrumentar
+def analizar_cruces(df, graficos=None, resultados=None, secciones=None):
+    """
+    Promedios y conteos por combinación de campos (ver ``CRUCES``).
+    ``resultados`` permite pasar los cruces ya calculados. ``secciones``:
+    las de ``SECCIONES_CRUCES`` que se muestran (por defecto todas); solo se
+    calculan sus cruces.
+    """
+    graficos = graficos or SinGraficos()
+    secciones = SECCIONES_CRUCES if secciones is None else secciones
+
+    if resultados is None:
+        resultados = calcular_cruces(df, [c for c in CRUCES if c.nombre in secciones and cruce_disponible(df, c)])
+    resultados = {nombre: resultado for nombre, resultado in resultados.items() if nombre in secciones}
+
+    # Cada encabezado va con la primera sección de su grupo
+    if "duracion_tipo" in secciones:
+        print("\n--- Análisis de cruces de campos interesantes ---")
+
+    # 1. Duración de la carrera vs. Tipo de institución
+    if "duracion_tipo" in resultados:
+        print("\nDuración promedio de la carrera por tipo de institución:")
+        promedios = resultados["duracion_tipo"].round(1)
+        print(promedios)
+        # Gráfico de barras
+        graficos.dibujar(Grafico('duracion_tipo', 'barras', promedios, dict(
+            color='skyblue',
+            titulo='Duración promedio de la carrera por tipo de institución',
+            xlabel='Tipo de institución',
+            ylabel='Duración (semestres)',
+            grilla=True,
+        )))
+
+    # 2. Valor arancel vs. Área de conocimiento
+    if "arancel_area" in resultados:
+        print("\nValor arancel promedio por área de conocimiento:")
+        promedios = resultados["arancel_area"].round(1)
+        print(promedios)
+        # Gráfico de barras
+        graficos.dibujar(Grafico('arancel_area', 'barras', promedios, dict(
+            color='orange',
+            titulo='Valor arancel promedio por área de conocimiento',
+            xlabel='Área de conocimiento',
+            ylabel='Valor arancel (pesos)',
+            grilla=True,
+        )))
+
+    # 3. Edad vs. Modalidad
+    if "edad_modalidad" in resultados:
+        print("\nEdad promedio por modalidad:")
+        promedios = resultados["edad_modalidad"].round(1)
+        print(promedios)
+        # Gráfico de barras
+        graficos.dibujar(Grafico('edad_modalidad', 'barras', promedios, dict(
+            color='green',
+            titulo='Edad promedio por modalidad',
+            xlabel='Modalidad',
+            ylabel='Edad promedio',
+            grilla=True,
+        )))
+
+    # 4. Duración total carrera vs. Región/Comuna de sede
+    if "duracion_comuna" in resultados:
+        print("\nDuración total de carrera promedio por comuna de sede (top 10):")
+        promedios = mayores(resultados["duracion_comuna"].round(1), 10)
+        print(promedios)
+        # Gráfico de barras
+        graficos.dibujar(Grafico('duracion_comuna', 'barras', promedios, dict(
+            color='purple',
+            titulo='Duración total de carrera promedio por comuna de sede (top 10)',
+            xlabel='Comuna de sede',
+            ylabel='Duración total (semestres)',
+            grilla=True,
+        )))
+
+    # 5. Género vs. Área de conocimiento
+    if "genero_area" in resultados:
+        print("\nDistribución de género por área de conocimiento:")
+        tabla = resultados["genero_area"].unstack(fill_value=0)
+        print(tabla)
+        # Gráfico de barras apiladas
+        if tabla.shape[0] == 0 or tabla.shape[1] == 0:
+            print("⚠️ No hay datos suficientes para mostrar el gráfico de distribución de género por área de conocimiento.")
+        else:
+            graficos.dibujar(Grafico('genero_area', 'barras', tabla, dict(
+                apilado=True,
+                titulo='Distribución de género por área de conocimiento',
+                xlabel='Área de conocimiento',
+                ylabel='Cantidad de estudiantes',
+                grilla=True,
+            )))
+
+    # 6. Año de ingreso vs. Valor matrícula/arancel
+    if "arancel_anio" in resultados:
+        print("\nValor arancel promedio por año de ingreso:")
+        promedios = resultados["arancel_anio"].round(1)
+        print(promedios)
+        # Gráfico de línea
+        graficos.dibujar(Grafico('arancel_anio', 'linea', promedios, dict(
+            marker='o',
+            color='red',
+            titulo='Valor arancel promedio por año de ingreso',
+            xlabel='Año de ingreso',
+            ylabel='Valor arancel (pesos)',
+            grilla=True,
+        )))
+
+    # 7. Duración plan de estudio vs. Nivel de estudio carrera
+    if "duracion_nivel" in resultados:
+        print("\nDuración promedio del plan de estudio por nivel de estudio de la carrera:")
+        promedios = resultados["duracion_nivel"].round(1)
+        print(promedios)
+        # Gráfico de barras
+        graficos.dibujar(Grafico('duracion_nivel', 'barras', promedios, dict(
+            color='teal',
+            titulo='Duración promedio del plan de estudio por nivel de estudio',
+            xlabel='Nivel de estudio',
+            ylabel='Duración (semestres)',
+            grilla=True,
+        )))
+
+    # 8. Duración total carrera vs. Años de acreditación
+    if "duracion_acreditacion" in secciones and DURACION_TOTAL in df.columns and "AÑOS DE ACREDITACION" in df.columns:
+        print("\nCorrelación entre duración total de la carrera y años de acreditación:")
+        print(correlacion(df, [DURACION_TOTAL, "AÑOS DE ACREDITACION"]).coeficientes.iloc[0, 1])
+
+    # 9. Edad vs. Requisito de ingreso
+    if "edad_requisito" in resultados:
+        print("\nEdad promedio por requisito de ingreso:")
+        promedios = resultados["edad_requisito"].round(1)
+        print(promedios)
+        # Gráfico de barras
+        graficos.dibujar(Grafico('edad_requisito', 'barras', promedios, dict(
+            color='brown',
+            titulo='Edad promedio por requisito de ingreso',
+            xlabel='Requisito de ingreso',
+            ylabel='Edad promedio',
+            grilla=True,
+        )))
+
+    # 10. Duración plan de estudio vs. Jornada
+    if "duracion_jornada" in resultados:
+        print("\nDuración promedio del plan de estudio por jornada:")
+        promedios = resultados["duracion_jornada"].round(1)
+        print(promedios)
+        # Gráfico de barras
+        graficos.dibujar(Grafico('duracion_jornada', 'barras', promedios, dict(
+            color='gray',
+            titulo='Duración promedio del plan de estudio por jornada',
+            xlabel='Jornada',
+            ylabel='Duración (semestres)',
+            grilla=True,
+        )))
+
+    if "duracion_genero_tipo" in secciones:
+        print("\n--- Cruces de información entre 3 o más campos ---")
+
+    # 1. Promedio de duración de carrera por género y tipo de institución
+    if "duracion_genero_tipo" in resultados:
+        print("\nDuración promedio de la carrera por género y tipo de institución:")
+        print(resultados["duracion_genero_tipo"].round(1))
+
+    # 2. Valor arancel promedio por área de conocimiento y modalidad
+    if "arancel_area_modalidad" in resultados:
+        print("\nValor arancel promedio por área de conocimiento y modalidad:")
+        print(resultados["arancel_area_modalidad"].round(1))
+
+    # 3. Edad promedio por jornada y requisito de ingreso
+    if "edad_jornada_requisito" in resultados:
+        print("\nEdad promedio por jornada y requisito de ingreso:")
+        print(resultados["edad_jornada_requisito"].round(1))
+
+    # 4. Duración total carrera promedio por comuna, tipo de institución y área de conocimiento (top 10)
+    if "duracion_comuna_tipo_area" in resultados:
+        print("\nDuración total de carrera promedio por comuna, tipo de institución y área de conocimiento (top 10):")
+        promedios = mayores(resultados["duracion_comuna_tipo_area"].round(1), 10)
+        print(promedios)
+
+    # 5. Cantidad de estudiantes por año de ingreso, género y área de conocimiento
+    if "cantidad_anio_genero_area" in resultados:
+        print("\nCantidad de estudiantes por año de ingreso, género y área de conocimiento (top 10):")
+        top10 = mayores(resultados["cantidad_anio_genero_area"], 10)
+        print(top10)
+        # Gráfico de barras
+        if not top10.empty:
+            graficos.dibujar(Grafico('cantidad_anio_genero_area', 'barras', top10, dict(
+                color='navy',
+                titulo='Cantidad de estudiantes por año, género y área de conocimiento (top 10)',
+                xlabel='Año, Género, Área de conocimiento',
+                ylabel='Cantidad de estudiantes',
+                grilla=True,
+            )))
+    return resultados
+
+
+def ejecutar_correlaciones(datos=None, graficos=None):
+    analizar_correlaciones(cargar_filtrado(datos), graficos)
+
+
+def ejecutar_correlaciones_tipo(datos=None, graficos=None):
+    analizar_correlaciones_por_grupo(cargar_filtrado(datos), graficos)
+
+
+def ejecutar_cruces(datos=None, graficos=None):
+    analizar_cruces(cargar_filtrado(datos), graficos)
+
+
+def _parte_cruces(datos, graficos, seccion):
+    analizar_cruces(cargar_filtrado(datos), graficos, secciones=[seccion])
+
+
+def partes_cruces():
+    """
+    ``ejecutar_cruces`` dividido en una parte por sección (ver
+    ``matriculas.analisis.PARTES``): cada una calcula solo su cruce.
+    """
+    return [functools.partial(_parte_cruces, seccion=seccion) for seccion in SECCIONES_CRUCES]
@@ -0,0 +1,133 @@
+"""
+Análisis de tendencias (salud, campo) y cruces como grafo de cálculo
+incremental (ver ``matriculas/grafo.py``):
+
+    fuente → particion/<año> → total|salud|campo/<año> → tablas → mostrar
+    fuente → filtrado → cruce/<nombre> → cruces → mostrar
+
+La base se parte por año de ingreso y los conteos se calculan por año: al
+agregar un año nuevo solo se calculan los nodos de ese año y las tablas que
+los juntan. Las palabras clave de cada área son parámetros de sus nodos, así
+que cambiar la lista de salud no recalcula los nodos de campo. Cada cruce es
+un nodo propio que depende de la base filtrada y de su definición.
+"""
+import sys
+
+import pandas as pd
+
+from matriculas import clasificador, cruces
+from matriculas.analisis import areas
+from matriculas.analisis.relaciones import CRUCES, analizar_cruces, cargar_filtrado
+from matriculas.datos import cargar_matriculas
+from matriculas.grafo import DIRECTORIO_GRAFO, GrafoCalculo
+
+COLUMNAS_PARTICION = ['AÑO INGRESO', 'GENERO', 'NOMBRE CARRERA NORMALIZADO']
+
+
+def _particion(df, anio):
+    """Filas de un año de ingreso, solo con las columnas de los conteos"""
+    return df.loc[df['AÑO INGRESO'] == anio, COLUMNAS_PARTICION].reset_index(drop=True)
+
+
+def _filas_area(particion, palabras):
+    mascaras = clasificador.ClasificadorPalabras({'area': palabras}).mascaras(particion['NOMBRE CARRERA NORMALIZADO'])
+    return particion[mascaras['area']]
+
+
+def _conteos_salud(particion, palabras):
+    return areas.conteos_salud(_filas_area(particion, palabras))
+
+
+def _conteo_campo(particion, palabras):
+    return areas.conteo_anual(_filas_area(particion, palabras))
+
+
+def _concatenar(*partes):
+    """Junta los conteos de varios años (Series o diccionarios de Series)"""
+    if isinstance(partes[0], dict):
+        return {clave: _concatenar(*(p[clave] for p in partes)) for clave in partes[0]}
+    return pd.concat(partes).sort_index()
+
+
+def _cruce(df, cruce):
+    if not cruces.cruce_disponible(df, cruce):
+        return None
+    return cruces.calcular_cruces(df, [cruce])[cruce.nombre]
+
+
+def _juntar_cruces(*resultados):
+    return {c.nombre: r for c, r in zip(CRUCES, resultados) if r is not None}
+
+
+def construir_grafo(datos=None, directorio=DIRECTORIO_GRAFO):
+    """
+    Grafo de los análisis de ``estad_1.py`` y de los cruces para ``datos``
+    (ruta o DataFrame). Los nodos por año se crean según los años presentes.
+    """
+    grafo = GrafoCalculo(directorio)
+    if isinstance(datos, pd.DataFrame):
+        grafo.agregar('fuente', lambda: datos, persistir=False)
+    else:
+        grafo.agregar('fuente', cargar_matriculas, parametros={} if datos is None else {'ruta': datos},
+                      persistir=False)
+
+    codigo_areas = (areas, clasificador)
+    palabras = clasificador.CATEGORIAS_CARRERA
+    anios = sorted(grafo.valor('fuente')['AÑO INGRESO'].dropna().unique().tolist())
+    for anio in anios:
+        particion = f'particion/{anio}'
+        grafo.agregar(particion, _particion, ['fuente'], {'anio': anio}, persistir=False)
+        grafo.agregar(f'total/{anio}', areas.conteo_anual, [particion], codigo=codigo_areas)
+        grafo.agregar(f'salud/{anio}', _conteos_salud, [particion], {'palabras': palabras['salud']},
+                      codigo=codigo_areas)
+        grafo.agregar(f'campo/{anio}', _conteo_campo, [particion], {'palabras': palabras['campo']},
+                      codigo=codigo_areas)
+
+    for nombre in ('total', 'salud', 'campo'):
+        grafo.agregar(f'conteos_{nombre}', _concatenar, [f'{nombre}/{anio}' for anio in anios])
+    grafo.agregar('matriculas_totales', areas.solo_anios_enteros, ['conteos_total'], codigo=codigo_areas)
+    grafo.agregar('tablas_salud', areas.tablas_salud, ['conteos_total', 'conteos_salud'], codigo=codigo_areas)
+    grafo.agregar('tablas_campo', areas.tablas_campo, ['conteos_total', 'conteos_campo'], codigo=codigo_areas)
+
+    grafo.agregar('filtrado', cargar_filtrado, ['fuente'], persistir=False)
+    for cruce in CRUCES:
+        grafo.agregar(f'cruce/{cruce.nombre}', _cruce, ['filtrado'], {'cruce': cruce}, codigo=(cruces,))
+    grafo.agregar('cruces', _juntar_cruces, [f'cruce/{c.nombre}' for c in CRUCES])
+    return grafo
+
+
+# El último grafo construido, para compartirlo entre análisis de una misma ejecución
+_ultimo = (None, None)
+
+
+def grafo_para(datos=None):
+    """El grafo de ``datos``, reutilizando el último si es para los mismos datos"""
+    global _ultimo
+    if _ultimo[1] is None or _ultimo[0] is not datos:
+        _ultimo = (datos, construir_grafo(datos))
+    return _ultimo[1]
+
+
+def ultimo_grafo():
+    return _ultimo[1]
+
+
+def ejecutar_salud(datos=None, graficos=None):
+    grafo = grafo_para(datos)
+    areas.mostrar_matriculas_por_anio(grafo.valor('matriculas_totales'), graficos)
+    areas.mostrar_salud(grafo.valor('tablas_salud'), graficos)
+
+
+def ejecutar_campo(datos=None, graficos=None):
+    areas.mostrar_campo(grafo_para(datos).valor('tablas_campo'), graficos)
+
+
+def ejecutar_cruces(datos=None, graficos=None):
+    grafo = grafo_para(datos)
+    analizar_cruces(grafo.valor('filtrado'), graficos, grafo.valor('cruces'))
+
+
+def resumen(grafo, archivo=sys.stderr):
+    """Una línea con los nodos calculados y reutilizados"""
+    calculados, reutilizados = grafo.registro['calculados'], grafo.registro['reutilizados']
+    print(f"Grafo de cálculo: {len(calculados)} nodos calculados, {len(reutilizados)} reutilizados", file=archivo)
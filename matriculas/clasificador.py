@@ -0,0 +1,138 @@
+"""
+Clasificación de carreras por palabras clave.
+
+Todas las listas de palabras se compilan en un único autómata Aho-Corasick,
+de modo que cada nombre de carrera distinto se recorre una sola vez sin
+importar cuántas categorías existan. El resultado se propaga a todas las
+filas mediante los códigos de la columna.
+"""
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from matriculas.instrumentacion import instrumentar
+from matriculas.texto import normalizar
+
+# Palabras clave asociadas a salud
+PALABRAS_SALUD = [
+    "salud", "enfermeria", "medicina", "kinesiologia", "nutricion", "odontologia", "tecnologia medica",
+    "fisioterapia", "terapia", "quimica y farmacia", "bioquimica", "obstetricia", "matroneria", "fonoaudiologia",
+    "psicologia", "laboratorio clinico", "paramedico", "tecnico en enfermeria", "tecnico en salud"
+]
+
+# Palabras clave asociadas a temas de campo, animales, plantaciones, etc.
+PALABRAS_CAMPO = [
+    "agro", "veterinaria", "agricultura", "forestal", "pecuaria", "zootecnia",
+    "alimentos", "plantas", "bosque", "rural", "lecheria", "fruticultura", "horticultura"
+]
+
+CATEGORIAS_CARRERA = {
+    'salud': PALABRAS_SALUD,
+    'campo': PALABRAS_CAMPO,
+}
+
+
+class ClasificadorPalabras:
+    """
+    Autómata Aho-Corasick sobre varias listas de palabras con nombre.
+
+    Cada categoría ocupa un bit; ``bits(texto)`` devuelve la máscara de
+    todas las categorías cuyas palabras aparecen como subcadena del texto
+    (la misma semántica que ``str.contains`` sin distinguir mayúsculas).
+    """
+
+    def __init__(self, categorias):
+        self.nombres = list(categorias)
+        if len(self.nombres) > 63:
+            raise ValueError('Se admiten hasta 63 categorías')
+
+        self._transiciones = [{}]
+        self._fallo = [0]
+        self._salida = [0]
+        for i, nombre in enumerate(self.nombres):
+            for palabra in categorias[nombre]:
+                self._agregar(normalizar(palabra), 1 << i)
+        self._construir_fallos()
+
+    def _agregar(self, palabra, bit):
+        estado = 0
+        for c in palabra:
+            siguiente = self._transiciones[estado].get(c)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones[estado][c] = siguiente
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salida.append(0)
+            estado = siguiente
+        self._salida[estado] |= bit
+
+    def _construir_fallos(self):
+        cola = deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for c, siguiente in self._transiciones[estado].items():
+                cola.append(siguiente)
+                fallo = self._fallo[estado]
+                while fallo and c not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                destino = self._transiciones[fallo].get(c, 0)
+                self._fallo[siguiente] = destino if destino != siguiente else 0
+                # Un estado hereda las salidas de su enlace de fallo
+                self._salida[siguiente] |= self._salida[self._fallo[siguiente]]
+
+    def bits(self, texto):
+        """Máscara de categorías presentes en ``texto``"""
+        if pd.isnull(texto):
+            return 0
+        transiciones, fallo, salida = self._transiciones, self._fallo, self._salida
+        estado = 0
+        resultado = 0
+        for c in normalizar(texto):
+            while estado and c not in transiciones[estado]:
+                estado = fallo[estado]
+            estado = transiciones[estado].get(c, 0)
+            resultado |= salida[estado]
+        return resultado
+
+    def _bits_columna(self, serie):
+        """Máscara por fila, evaluando el autómata una vez por valor distinto"""
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy()
+            unicos = serie.cat.categories
+        else:
+            codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+        # Se agrega un 0 al final para los nulos (código -1)
+        por_valor = np.array([self.bits(u) for u in unicos] + [0], dtype=np.int64)
+        return por_valor.take(codigos)
+
+    @instrumentar
+    def mascaras(self, serie):
+        """DataFrame booleano con una columna por categoría"""
+        bits = self._bits_columna(serie)
+        return pd.DataFrame(
+            {nombre: (bits & (1 << i)) != 0 for i, nombre in enumerate(self.nombres)},
+            index=serie.index,
+        )
+
+    @instrumentar
+    def etiquetar(self, serie, separador='|'):
+        """
+        Columna categórica multi-etiqueta, p. ej. ``'salud'``,
+        ``'salud|campo'`` o ``''`` si no coincide ninguna categoría.
+        """
+        bits = self._bits_columna(serie)
+        combinaciones, codigos = np.unique(bits, return_inverse=True)
+        etiquetas = [
+            separador.join(n for i, n in enumerate(self.nombres) if combinacion & (1 << i))
+            for combinacion in combinaciones
+        ]
+        return pd.Series(
+            pd.Categorical.from_codes(codigos.ravel(), categories=etiquetas),
+            index=serie.index,
+            name=serie.name,
+        )
+
+
+CLASIFICADOR_CARRERAS = ClasificadorPalabras(CATEGORIAS_CARRERA)
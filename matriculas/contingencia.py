@@ -0,0 +1,195 @@
+"""
+Tablas de contingencia (frecuencias absolutas y relativas) con chi-cuadrado
+y V de Cramér.
+
+Las claves de filas y de columnas pueden ser una o varias columnas cada una
+(tablas de N vías: las combinaciones de las claves de filas contra las de
+columnas). Cada columna se codifica una sola vez como entero (ver
+``matriculas.cruces``); las combinaciones observadas de filas y de columnas
+se numeran de forma compacta y las frecuencias salen de un solo
+``np.bincount`` sobre el índice combinado ``fila × columnas + columna``.
+
+Si la tabla tendría más de ``MAX_CELDAS_DENSAS`` celdas (p. ej. carrera ×
+institución × jornada) se guarda en formato disperso: una ``Series`` con
+solo las celdas observadas. El chi-cuadrado se calcula igual en ambos
+formatos, solo con las celdas no vacías:
+
+    χ² = N · (Σ O² / (fila · columna) − 1)
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from matriculas.cruces import MAX_COMBINACIONES_DENSAS, Codificador, indice_combinaciones
+from matriculas.instrumentacion import instrumentar
+
+# Declaración de una tabla: filas y columnas son una columna o una tupla de columnas
+TablaContingencia = namedtuple('TablaContingencia', ['nombre', 'filas', 'columnas'])
+
+# absoluta, por_fila, por_columna: DataFrame (filas × columnas) o, si la
+# tabla es dispersa, Series con las celdas observadas; gl: grados de libertad
+Contingencia = namedtuple('Contingencia', ['absoluta', 'por_fila', 'por_columna', 'chi2', 'gl', 'p',
+                                           'v_cramer', 'n'])
+
+# Por sobre este número de celdas la tabla se entrega dispersa
+MAX_CELDAS_DENSAS = 1 << 20
+
+
+def _como_tupla(claves):
+    return (claves,) if isinstance(claves, str) else tuple(claves)
+
+
+def tabla_disponible(df, tabla):
+    """Indica si ``df`` tiene todas las columnas que usa la tabla"""
+    return all(c in df.columns for c in _como_tupla(tabla.filas) + _como_tupla(tabla.columnas))
+
+
+def _combinaciones(codificador, claves, validas):
+    """
+    Código compacto (0..k-1) de la combinación de ``claves`` de cada fila
+    válida, los códigos por clave de cada combinación observada y sus
+    etiquetas (Index o MultiIndex).
+    """
+    codigos, categorias = [], []
+    for columna in claves:
+        c, u = codificador.clave(columna)
+        codigos.append(c[validas])
+        categorias.append(u)
+    dims = tuple(max(len(u), 1) for u in categorias)
+    combinado = np.ravel_multi_index(codigos, dims) if len(codigos[0]) else np.zeros(0, dtype=np.intp)
+    total = int(np.prod(dims))
+    if total <= MAX_COMBINACIONES_DENSAS:
+        # Pocas combinaciones posibles: se numeran las observadas con un bincount
+        observadas = np.flatnonzero(np.bincount(combinado, minlength=total))
+        numero = np.zeros(total, dtype=np.intp)
+        numero[observadas] = np.arange(len(observadas))
+        compacto = numero[combinado]
+    else:
+        # factorize agrupa por hash y ordena solo las combinaciones distintas
+        compacto, observadas = pd.factorize(combinado, sort=True)
+    indice = indice_combinaciones(claves, categorias, dims, observadas)
+    return compacto, np.unravel_index(observadas, dims), categorias, indice
+
+
+def _chi2(n_fila, n_columna, celdas_fila, celdas_columna, observadas):
+    """χ², grados de libertad, p y V de Cramér a partir de las celdas no vacías"""
+    n = n_fila.sum()
+    r, c = len(n_fila), len(n_columna)
+    gl = max(r - 1, 0) * max(c - 1, 0)
+    if n == 0 or gl == 0:
+        return 0.0, gl, np.nan, np.nan
+    suma = np.sum(observadas * (observadas / n_fila[celdas_fila]) / n_columna[celdas_columna])
+    chi2 = max(n * (suma - 1.0), 0.0)
+    v = np.sqrt(chi2 / (n * (min(r, c) - 1)))
+    return chi2, gl, stats.chi2.sf(chi2, gl), min(v, 1.0)
+
+
+def _contingencia(codificador, filas, columnas, dispersa=None):
+    validas = np.ones(len(codificador.df), dtype=bool)
+    for columna in filas + columnas:
+        validas &= codificador.clave(columna)[0] >= 0
+    if validas.all():
+        validas = slice(None)
+    codigo_fila, por_clave_fila, categorias_fila, indice_filas = _combinaciones(codificador, filas, validas)
+    codigo_columna, por_clave_columna, categorias_columna, indice_columnas = _combinaciones(
+        codificador, columnas, validas)
+    r, c = len(indice_filas), len(indice_columnas)
+
+    celda = codigo_fila.astype(np.int64) * c + codigo_columna
+    n_fila = np.bincount(codigo_fila, minlength=r).astype(np.float64)
+    n_columna = np.bincount(codigo_columna, minlength=c).astype(np.float64)
+    if dispersa is None:
+        dispersa = r * c > MAX_CELDAS_DENSAS
+
+    if not dispersa:
+        absoluta = np.bincount(celda, minlength=r * c).reshape(r, c)
+        i, j = np.nonzero(absoluta)
+        chi2, gl, p, v = _chi2(n_fila, n_columna, i, j, absoluta[i, j].astype(np.float64))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            por_fila = absoluta / n_fila[:, None]
+            por_columna = absoluta / n_columna[None, :]
+        indice_filas.name = filas[0] if len(filas) == 1 else None
+        indice_columnas.name = columnas[0] if len(columnas) == 1 else None
+        return Contingencia(*(pd.DataFrame(t, index=indice_filas, columns=indice_columnas)
+                              for t in (absoluta, por_fila, por_columna)),
+                            chi2, gl, p, v, int(n_fila.sum()))
+
+    # Disperso: solo las celdas observadas
+    if r * c <= MAX_COMBINACIONES_DENSAS:
+        conteos = np.bincount(celda, minlength=r * c)
+        observadas = np.flatnonzero(conteos)
+        conteos = conteos[observadas].astype(np.float64)
+    else:
+        codigo_celda, observadas = pd.factorize(celda, sort=True)
+        conteos = np.bincount(codigo_celda).astype(np.float64)
+    i, j = np.divmod(observadas, c)
+    chi2, gl, p, v = _chi2(n_fila, n_columna, i, j, conteos)
+    niveles = ([u.take(codigos[i]) for u, codigos in zip(categorias_fila, por_clave_fila)]
+               + [u.take(codigos[j]) for u, codigos in zip(categorias_columna, por_clave_columna)])
+    indice = pd.MultiIndex.from_arrays(niveles, names=list(filas + columnas))
+    return Contingencia(pd.Series(conteos.astype(np.int64), index=indice, name='N'),
+                        pd.Series(conteos / n_fila[i], index=indice, name='por_fila'),
+                        pd.Series(conteos / n_columna[j], index=indice, name='por_columna'),
+                        chi2, gl, p, v, int(n_fila.sum()))
+
+
+@instrumentar
+def contingencia(df, filas, columnas, dispersa=None):
+    """
+    Tabla de contingencia de ``filas`` × ``columnas`` (una columna o una
+    lista de columnas cada una): frecuencias absolutas, relativas por fila y
+    por columna, χ² de independencia (sin corrección de Yates), grados de
+    libertad, p y V de Cramér. ``dispersa``: True/False fuerza el formato;
+    por defecto se decide por el número de celdas.
+    """
+    return _contingencia(Codificador(df), _como_tupla(filas), _como_tupla(columnas), dispersa)
+
+
+@instrumentar
+def calcular_contingencias(df, tablas, dispersa=None):
+    """
+    Calcula todas las ``tablas`` (``TablaContingencia``) codificando cada
+    columna una sola vez. Devuelve ``nombre -> Contingencia``.
+    """
+    codificador = Codificador(df)
+    return {t.nombre: _contingencia(codificador, _como_tupla(t.filas), _como_tupla(t.columnas), dispersa)
+            for t in tablas}
+
+
+def resumen_asociacion(resultados):
+    """Una fila por tabla con N, χ², gl, p y V de Cramér"""
+    return pd.DataFrame(
+        [(nombre, r.n, r.chi2, r.gl, r.p, r.v_cramer) for nombre, r in resultados.items()],
+        columns=['Tabla', 'N', 'Chi2', 'gl', 'p', 'V de Cramér'],
+    ).set_index('Tabla')
+
+
+def agrupar_menores(tabla, umbral=None, k=None, etiqueta='Otros'):
+    """
+    Junta en la columna ``etiqueta`` las categorías (columnas) menores de
+    cada fila de ``tabla``: las que pesan menos que ``umbral`` del total de
+    su fila y/o las que quedan fuera de las ``k`` mayores. Todas las filas
+    se procesan a la vez sobre la matriz; las celdas agrupadas quedan en 0 y
+    la columna ``etiqueta`` se agrega solo si alguna fila la usa.
+    """
+    valores = np.nan_to_num(tabla.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64))
+    presentes = valores > 0
+    menores = np.zeros_like(presentes)
+    if umbral is not None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            proporcion = valores / valores.sum(axis=1, keepdims=True)
+        menores |= presentes & (proporcion < umbral)
+    if k is not None:
+        # Posición de cada celda en el orden descendente de su fila
+        orden = np.argsort(-valores, axis=1, kind='stable')
+        posicion = np.empty_like(orden)
+        np.put_along_axis(posicion, orden, np.arange(valores.shape[1])[None, :], axis=1)
+        menores |= presentes & (posicion >= k)
+
+    resultado = pd.DataFrame(np.where(menores, 0.0, valores), index=tabla.index, columns=tabla.columns)
+    otros = np.where(menores, valores, 0.0).sum(axis=1)
+    if (otros > 0).any():
+        resultado[etiqueta] = otros
+    return resultado
@@ -0,0 +1,290 @@
+"""
+Contrastes entre todos los pares de grupos a la vez.
+
+Levene y Bartlett para dos grupos dependen solo de unas pocas sumas por
+grupo (N, media y suma de cuadrados de las desviaciones absolutas respecto
+de la mediana, o N y varianza), así que se calculan una vez por grupo con
+``np.bincount`` y se combinan para todos los pares con operaciones sobre
+arreglos, en lugar de llamar a ``scipy.stats.levene``/``bartlett`` por par.
+
+Los intervalos bootstrap (CV, percentiles, media, ...) se obtienen
+remuestreando cada grupo una sola vez con matrices de índices
+(``remuestras × n``) y restando las distribuciones de cada par; los grupos
+se reparten entre procesos. Las semillas se derivan por grupo, así que el
+resultado no depende del número de procesos.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Máximo de elementos de una matriz de remuestreo (se procesa por bloques)
+MAX_ELEMENTOS = 4_000_000
+
+REMUESTRAS = 2000
+
+
+# --- Preparación ---
+
+def _codificar(valores, grupos):
+    """
+    Valores (float) y código de grupo de cada fila válida, y las etiquetas.
+    ``grupos`` puede ser una columna o un DataFrame con varias (cada grupo
+    es entonces la tupla de sus valores).
+    """
+    valores = pd.to_numeric(pd.Series(np.asarray(valores)), errors='coerce').to_numpy(dtype=np.float64)
+    if isinstance(grupos, pd.DataFrame):
+        indice = pd.MultiIndex.from_frame(grupos.reset_index(drop=True))
+        codigos, unicos = indice.factorize()
+        codigos = np.where(grupos.isna().any(axis=1).to_numpy(), -1, codigos)
+    else:
+        codigos, unicos = pd.factorize(pd.Series(grupos).reset_index(drop=True), use_na_sentinel=True)
+    etiquetas = np.empty(len(unicos), dtype=object)
+    etiquetas[:] = list(unicos)
+    validos = (codigos >= 0) & ~np.isnan(valores)
+    return valores[validos], codigos[validos], etiquetas
+
+
+def _ordenados(valores, codigos, k):
+    """Valores ordenados por grupo y luego por valor, con el inicio de cada grupo"""
+    orden = np.lexsort((valores, codigos))
+    n = np.bincount(codigos, minlength=k)
+    inicios = np.r_[0, np.cumsum(n)[:-1]]
+    return valores[orden], n, inicios
+
+
+def _pares(k, etiquetas, pares):
+    """Índices (i, j) de los pares pedidos (por defecto todos con i < j)"""
+    if pares is None:
+        return np.triu_indices(k, 1)
+    posicion = {etiqueta: i for i, etiqueta in enumerate(etiquetas)}
+    i, j = zip(*((posicion[a], posicion[b]) for a, b in pares)) if pares else ((), ())
+    return np.array(i, dtype=np.intp), np.array(j, dtype=np.intp)
+
+
+def _indice_pares(etiquetas, i, j):
+    return pd.MultiIndex.from_arrays([etiquetas.take(i), etiquetas.take(j)], names=['Grupo A', 'Grupo B'])
+
+
+# --- Levene y Bartlett ---
+
+def _medianas(ordenados, n, inicios):
+    con_datos = n > 0
+    bajo = inicios + np.maximum(n - 1, 0) // 2
+    alto = inicios + n // 2
+    medianas = np.full(len(n), np.nan)
+    medianas[con_datos] = (ordenados[bajo[con_datos]] + ordenados[alto[con_datos]]) / 2
+    return medianas
+
+
+def levene_por_pares(valores, grupos, centro='median', pares=None):
+    """
+    Prueba de Levene (Brown-Forsythe con ``centro='median'``, el valor por
+    defecto de scipy) para cada par de grupos.
+    """
+    valores, codigos, etiquetas = _codificar(valores, grupos)
+    k = len(etiquetas)
+    n = np.bincount(codigos, minlength=k).astype(np.float64)
+    if centro == 'median':
+        ordenados, _, inicios = _ordenados(valores, codigos, k)
+        centros = _medianas(ordenados, n.astype(np.int64), inicios)
+    elif centro == 'mean':
+        with np.errstate(invalid='ignore', divide='ignore'):
+            centros = np.bincount(codigos, weights=valores, minlength=k) / n
+    else:
+        raise ValueError(f"Centro no soportado: {centro}")
+
+    # Desviaciones absolutas Z respecto del centro de su grupo
+    z = np.abs(valores - centros[codigos])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_media = np.bincount(codigos, weights=z, minlength=k) / n
+    dz = z - z_media[codigos]
+    suma_dentro = np.bincount(codigos, weights=dz * dz, minlength=k)
+
+    i, j = _pares(k, etiquetas, pares)
+    n_a, n_b = n[i], n[j]
+    total = n_a + n_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_total = (n_a * z_media[i] + n_b * z_media[j]) / total
+        entre = n_a * (z_media[i] - z_total) ** 2 + n_b * (z_media[j] - z_total) ** 2
+        estadistico = (total - 2) * entre / (suma_dentro[i] + suma_dentro[j])
+    p_valor = stats.f.sf(estadistico, 1, total - 2)
+    return pd.DataFrame({
+        'N A': n_a.astype(np.int64), 'N B': n_b.astype(np.int64),
+        'Estadístico': estadistico, 'p-valor': p_valor,
+    }, index=_indice_pares(etiquetas, i, j))
+
+
+def bartlett_por_pares(valores, grupos, pares=None):
+    """Prueba de Bartlett para cada par de grupos"""
+    valores, codigos, etiquetas = _codificar(valores, grupos)
+    k = len(etiquetas)
+    n = np.bincount(codigos, minlength=k).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.bincount(codigos, weights=valores, minlength=k) / n
+        desvio = valores - media[codigos]
+        varianza = np.bincount(codigos, weights=desvio * desvio, minlength=k) / (n - 1)
+
+    i, j = _pares(k, etiquetas, pares)
+    gl_a, gl_b = n[i] - 1, n[j] - 1
+    gl = gl_a + gl_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        combinada = (gl_a * varianza[i] + gl_b * varianza[j]) / gl
+        numerador = gl * np.log(combinada) - gl_a * np.log(varianza[i]) - gl_b * np.log(varianza[j])
+        correccion = 1 + (1 / gl_a + 1 / gl_b - 1 / gl) / 3
+        estadistico = numerador / correccion
+    p_valor = stats.chi2.sf(estadistico, 1)
+    return pd.DataFrame({
+        'N A': n[i].astype(np.int64), 'N B': n[j].astype(np.int64),
+        'Estadístico': estadistico, 'p-valor': p_valor,
+    }, index=_indice_pares(etiquetas, i, j))
+
+
+def comparar_varianzas(valores, grupos, pares=None):
+    """Levene y Bartlett para cada par de grupos, en una sola tabla"""
+    levene = levene_por_pares(valores, grupos, pares=pares)
+    bartlett = bartlett_por_pares(valores, grupos, pares=pares)
+    return pd.DataFrame({
+        'N A': levene['N A'], 'N B': levene['N B'],
+        'Levene': levene['Estadístico'], 'p Levene': levene['p-valor'],
+        'Bartlett': bartlett['Estadístico'], 'p Bartlett': bartlett['p-valor'],
+    })
+
+
+# --- Bootstrap y permutaciones ---
+
+def _cv(matriz):
+    return matriz.std(axis=1, ddof=1) / matriz.mean(axis=1) * 100
+
+
+def _funcion_estadistico(nombre):
+    """Función fila a fila de una matriz: 'cv', 'media', 'mediana' o 'p<NN>' (p. ej. 'p70')"""
+    if nombre == 'cv':
+        return _cv
+    if nombre == 'media':
+        return lambda m: m.mean(axis=1)
+    if nombre == 'mediana':
+        return lambda m: np.median(m, axis=1)
+    percentil = re.fullmatch(r'p(\d{1,2}(?:\.\d+)?)', nombre)
+    if percentil:
+        q = float(percentil.group(1)) / 100
+        return lambda m: np.quantile(m, q, axis=1)
+    raise ValueError(f"Estadístico no soportado: {nombre}")
+
+
+def _remuestrear(argumentos):
+    """Distribución bootstrap del estadístico para un grupo (corre en un proceso del pool)"""
+    valores, nombre, remuestras, semilla = argumentos
+    funcion = _funcion_estadistico(nombre)
+    n = len(valores)
+    distribucion = np.full(remuestras, np.nan)
+    if n < 2:
+        return distribucion
+    rng = np.random.default_rng(semilla)
+    filas_bloque = max(1, MAX_ELEMENTOS // n)
+    for inicio in range(0, remuestras, filas_bloque):
+        filas = min(filas_bloque, remuestras - inicio)
+        indices = rng.integers(0, n, size=(filas, n))
+        distribucion[inicio:inicio + filas] = funcion(valores[indices])
+    return distribucion
+
+
+def _mapear(funcion, tareas, procesos):
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    if procesos <= 1 or len(tareas) <= 1:
+        return [funcion(t) for t in tareas]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(funcion, tareas))
+
+
+def distribuciones_bootstrap(valores, grupos, estadistico='cv', remuestras=REMUESTRAS, semilla=0, procesos=None):
+    """
+    Estadístico observado y distribución bootstrap (``remuestras`` valores)
+    de cada grupo. Devuelve (etiquetas, observados, matriz grupos × remuestras).
+    """
+    valores, codigos, etiquetas = _codificar(valores, grupos)
+    k = len(etiquetas)
+    ordenados, n, inicios = _ordenados(valores, codigos, k)
+    por_grupo = [ordenados[inicio:inicio + m] for inicio, m in zip(inicios, n)]
+
+    funcion = _funcion_estadistico(estadistico)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        observados = np.array([funcion(v[np.newaxis, :])[0] if len(v) > 1 else np.nan for v in por_grupo])
+
+    semillas = np.random.SeedSequence(semilla).spawn(k)
+    tareas = [(v, estadistico, remuestras, s) for v, s in zip(por_grupo, semillas)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        matriz = np.vstack(_mapear(_remuestrear, tareas, procesos)) if tareas else np.zeros((0, remuestras))
+    return etiquetas, observados, matriz
+
+
+def bootstrap_diferencias(valores, grupos, estadistico='cv', remuestras=REMUESTRAS, nivel=0.95, pares=None,
+                          semilla=0, procesos=None):
+    """
+    Diferencia del estadístico (A - B) para cada par de grupos con su
+    intervalo de confianza bootstrap por percentiles. Los grupos se
+    remuestrean de forma independiente, una sola vez cada uno.
+    """
+    etiquetas, observados, matriz = distribuciones_bootstrap(
+        valores, grupos, estadistico, remuestras, semilla, procesos)
+    i, j = _pares(len(etiquetas), etiquetas, pares)
+    alfa = (1 - nivel) / 2
+    limites = np.full((len(i), 2), np.nan)
+    pares_bloque = max(1, MAX_ELEMENTOS // max(remuestras, 1))
+    for inicio in range(0, len(i), pares_bloque):
+        fin = inicio + pares_bloque
+        diferencias = matriz[i[inicio:fin]] - matriz[j[inicio:fin]]
+        limites[inicio:fin] = np.nanquantile(diferencias, [alfa, 1 - alfa], axis=1).T
+    nombre = estadistico.upper() if estadistico.startswith('p') or estadistico == 'cv' else estadistico.capitalize()
+    return pd.DataFrame({
+        f'{nombre} A': observados[i],
+        f'{nombre} B': observados[j],
+        'Diferencia': observados[i] - observados[j],
+        'IC inferior': limites[:, 0],
+        'IC superior': limites[:, 1],
+    }, index=_indice_pares(etiquetas, i, j))
+
+
+def _permutar(argumentos):
+    a, b, permutaciones, semilla = argumentos
+    if len(a) == 0 or len(b) == 0:
+        return np.nan
+    rng = np.random.default_rng(semilla)
+    juntos = np.concatenate([a, b])
+    n, n_a = len(juntos), len(a)
+    observada = abs(a.mean() - b.mean())
+    total = juntos.sum()
+    extremos = 0
+    filas_bloque = max(1, MAX_ELEMENTOS // n)
+    for inicio in range(0, permutaciones, filas_bloque):
+        filas = min(filas_bloque, permutaciones - inicio)
+        permutados = rng.permuted(np.broadcast_to(juntos, (filas, n)), axis=1)
+        suma_a = permutados[:, :n_a].sum(axis=1)
+        diferencia = np.abs(suma_a / n_a - (total - suma_a) / (n - n_a))
+        extremos += int(np.count_nonzero(diferencia >= observada - 1e-12 * abs(observada)))
+    return (extremos + 1) / (permutaciones + 1)
+
+
+def permutacion_medias(valores, grupos, permutaciones=REMUESTRAS, pares=None, semilla=0, procesos=None):
+    """
+    Prueba de permutaciones (bilateral) de la diferencia de medias para
+    cada par de grupos. Cada par es una tarea del pool.
+    """
+    valores, codigos, etiquetas = _codificar(valores, grupos)
+    k = len(etiquetas)
+    ordenados, n, inicios = _ordenados(valores, codigos, k)
+    por_grupo = [ordenados[inicio:inicio + m] for inicio, m in zip(inicios, n)]
+    i, j = _pares(k, etiquetas, pares)
+    semillas = np.random.SeedSequence(semilla).spawn(len(i))
+    tareas = [(por_grupo[a], por_grupo[b], permutaciones, s) for a, b, s in zip(i, j, semillas)]
+    p_valores = _mapear(_permutar, tareas, procesos)
+    medias = np.array([v.mean() if len(v) else np.nan for v in por_grupo])
+    return pd.DataFrame({
+        'N A': n[i], 'N B': n[j],
+        'Diferencia de medias': medias[i] - medias[j],
+        'p-valor': np.array(p_valores, dtype=np.float64),
+    }, index=_indice_pares(etiquetas, i, j))
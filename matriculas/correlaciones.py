@@ -0,0 +1,219 @@
+"""
+Matrices de correlación (Pearson o Spearman) con observaciones completas
+por par.
+
+Las columnas se convierten a número una sola vez a una matriz ``filas ×
+campos``. Con la máscara de valores presentes ``M`` y los valores con ceros
+en lugar de nulos ``X``, los productos de matrices ``MᵀM``, ``XᵀM``,
+``(X²)ᵀM`` y ``XᵀX`` entregan para todos los pares a la vez el N, las sumas
+y las sumas de cuadrados y de productos sobre las filas donde ambos campos
+están presentes (lo mismo que ``DataFrame.corr``, pero con BLAS). Los
+productos se acumulan por bloques de filas, en una sola pasada sobre los
+datos.
+
+Spearman es Pearson sobre los rangos. Si dos campos tienen nulos en filas
+distintas, ese par se vuelve a rankear sobre sus filas completas, como lo
+hace pandas.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from matriculas.instrumentacion import instrumentar
+
+# coeficientes: matriz campos × campos; observaciones: N de filas
+# completas de cada par
+Correlacion = namedtuple('Correlacion', ['coeficientes', 'observaciones'])
+
+METODOS = ('pearson', 'spearman')
+
+# Las sumas se acumulan por bloques de filas que caben en caché
+FILAS_POR_BLOQUE = 8192
+
+# Error relativo por fila al acumular sumas de cuadrados
+_EPSILON = 4 * np.finfo(np.float64).eps
+
+
+def matriz_numerica(df, columnas):
+    """
+    Las ``columnas`` de ``df`` como matriz float64 (texto no numérico y
+    columnas inexistentes quedan como NaN). Se guarda por columnas (orden
+    Fortran): cada campo queda contiguo en memoria.
+    """
+    matriz = np.full((len(df), len(columnas)), np.nan, order='F')
+    for j, columna in enumerate(columnas):
+        if columna in df.columns:
+            valores = df[columna]
+            if not pd.api.types.is_numeric_dtype(valores):
+                valores = pd.to_numeric(valores, errors='coerce')
+            matriz[:, j] = valores.to_numpy(dtype=np.float64, na_value=np.nan)
+    return matriz
+
+
+def _rangos(valores):
+    """Rangos promedio (empates) de los valores no nulos; NaN se conserva"""
+    rangos = np.full(len(valores), np.nan)
+    presentes = ~np.isnan(valores)
+    # factorize agrupa por hash y ordena solo los valores distintos
+    codigos, _ = pd.factorize(valores[presentes], sort=True)
+    conteos = np.bincount(codigos)
+    # Rango promedio de cada valor distinto: su última posición menos la mitad de sus empates
+    promedio = np.cumsum(conteos) - (conteos - 1) / 2
+    rangos[presentes] = promedio[codigos]
+    return rangos
+
+
+def _sumas(x, codigos=None, grupos=1):
+    """
+    N, sumas, sumas de cuadrados y de productos por par (``grupos × campos ×
+    campos``) sobre las filas completas de cada par. Con ``codigos``, por
+    separado para cada grupo.
+    """
+    k = x.shape[1]
+    n, suma, cuadrados, productos = (np.zeros((grupos, k, k)) for _ in range(4))
+    # Restar un valor típico de cada campo (la media del primer bloque) no
+    # cambia la correlación y evita restar sumas enormes (aranceles en pesos)
+    primero = x[:FILAS_POR_BLOQUE]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centro = np.nansum(primero, axis=0) / (~np.isnan(primero)).sum(axis=0)
+    centro = np.where(np.isfinite(centro), centro, 0.0)
+    for inicio in range(0, len(x), FILAS_POR_BLOQUE):
+        bloque = x[inicio:inicio + FILAS_POR_BLOQUE] - centro
+        if codigos is None:
+            tramos = [(0, 0, len(bloque))]
+        else:
+            # Dentro del bloque (que cabe en caché) se ordenan las filas por grupo
+            codigos_bloque = codigos[inicio:inicio + FILAS_POR_BLOQUE]
+            orden = np.argsort(codigos_bloque, kind='stable')
+            bloque, codigos_bloque = bloque[orden], codigos_bloque[orden]
+            cortes = np.flatnonzero(np.diff(codigos_bloque)) + 1
+            inicios = np.r_[0, cortes]
+            tramos = zip(codigos_bloque[inicios], inicios, np.r_[cortes, len(bloque)])
+        presentes = ~np.isnan(bloque)
+        m = presentes.astype(np.float64)
+        bloque[~presentes] = 0.0
+        for g, desde, hasta in tramos:
+            if g < 0:
+                continue
+            b, mb = bloque[desde:hasta], m[desde:hasta]
+            n[g] += mb.T @ mb
+            suma[g] += b.T @ mb         # suma[i, j]: suma de x_i donde x_j también está
+            cuadrados[g] += (b * b).T @ mb
+            productos[g] += b.T @ b
+    return n, suma, cuadrados, productos
+
+
+def _coeficientes(n, suma, cuadrados, productos, minimo):
+    """Coeficientes de Pearson a partir de las sumas de ``_sumas`` (de un grupo)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covarianza = productos - suma * suma.T / n
+        varianza_i = cuadrados - suma * suma / n
+        # Un campo constante en las filas del par deja solo error de redondeo
+        varianza_i[varianza_i <= cuadrados * n * _EPSILON] = 0.0
+        varianza_j = varianza_i.T
+        r = np.clip(covarianza / np.sqrt(varianza_i * varianza_j), -1.0, 1.0)
+    r[(n < max(minimo, 2)) | (varianza_i == 0) | (varianza_j == 0)] = np.nan
+    # La diagonal es 1 si el campo tiene datos que varían
+    np.fill_diagonal(r, np.where(np.isnan(np.diag(r)), np.nan, 1.0))
+    return r, n.astype(np.int64)
+
+
+def _pearson(x, minimo):
+    """Coeficientes y N por par con observaciones completas"""
+    return _coeficientes(*(s[0] for s in _sumas(x)), minimo)
+
+
+def _spearman(x, minimo):
+    presentes = ~np.isnan(x)
+    rangos = np.column_stack([_rangos(x[:, j]) for j in range(x.shape[1])])
+    r, n = _pearson(rangos, minimo)
+    # Pares cuyos nulos no coinciden: se rankean de nuevo sobre sus filas
+    # completas (un campo sin nulos fuera de esas filas conserva sus rangos)
+    columnas = presentes.sum(axis=0)
+    distintos = (n < columnas[:, None]) | (n < columnas[None, :])
+    for i, j in zip(*np.nonzero(np.triu(distintos, k=1))):
+        filas = presentes[:, i] & presentes[:, j]
+        par = [rangos[filas, k] if n[i, j] == columnas[k] else _rangos(x[filas, k]) for k in (i, j)]
+        r[i, j] = r[j, i] = _pearson(np.column_stack(par), minimo)[0][0, 1]
+    return r, n
+
+
+@instrumentar
+def correlacion(datos, columnas=None, metodo='pearson', minimo=1):
+    """
+    Correlación de todos los pares de ``columnas`` (por defecto, las
+    numéricas de ``datos``). Devuelve ``Correlacion(coeficientes,
+    observaciones)``; los pares con menos de ``minimo`` filas completas
+    quedan en NaN.
+
+    ``datos`` puede ser también una matriz ya convertida con
+    ``matriz_numerica``; entonces ``columnas`` son los nombres de sus campos.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo} (disponibles: {', '.join(METODOS)})")
+    if isinstance(datos, np.ndarray):
+        if columnas is None or len(columnas) != datos.shape[1]:
+            raise ValueError("Con una matriz, ``columnas`` debe nombrar cada uno de sus campos")
+        x = datos
+    else:
+        if columnas is None:
+            columnas = list(datos.select_dtypes('number').columns)
+        x = matriz_numerica(datos, columnas)
+    columnas = list(columnas)
+    r, n = (_spearman if metodo == 'spearman' else _pearson)(x, minimo)
+    return Correlacion(pd.DataFrame(r, index=columnas, columns=columnas),
+                       pd.DataFrame(n, index=columnas, columns=columnas))
+
+
+@instrumentar
+def correlacion_por_grupo(datos, columnas, grupo, metodo='pearson', minimo=1):
+    """
+    Una matriz de correlación por cada valor de ``grupo`` (p. ej. ``'TIPO DE
+    INSTITUCION'``), apiladas como en ``df.groupby(grupo).corr()``: índice
+    (grupo, campo). Las columnas se convierten una sola vez.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo} (disponibles: {', '.join(METODOS)})")
+    columnas = list(columnas)
+    x = matriz_numerica(datos, columnas)
+    codigos, etiquetas = pd.factorize(datos[grupo], sort=True, use_na_sentinel=True)
+    # Con pocos grupos los códigos caben en int16 y numpy ordena por radix
+    if len(etiquetas) < np.iinfo(np.int16).max:
+        codigos = codigos.astype(np.int16)
+
+    if metodo == 'pearson':
+        # Una sola pasada por bloques acumula las sumas de todos los grupos
+        sumas = _sumas(x, codigos, len(etiquetas))
+        resultados = [_coeficientes(*(s[g] for s in sumas), minimo) for g in range(len(etiquetas))]
+    else:
+        # Los rangos se calculan dentro de cada grupo: se reordenan las filas
+        orden = np.argsort(codigos, kind='stable')
+        limites = np.searchsorted(codigos[orden], np.arange(len(etiquetas) + 1))
+        resultados = [_spearman(np.take(x, orden[limites[g]:limites[g + 1]], axis=0), minimo)
+                      for g in range(len(etiquetas))]
+    coeficientes = [r for r, _ in resultados]
+    observaciones = [n for _, n in resultados]
+    indice = pd.MultiIndex.from_product([list(etiquetas), columnas], names=[grupo, None])
+    forma = (len(etiquetas) * len(columnas), len(columnas))
+    return Correlacion(
+        pd.DataFrame(np.reshape(coeficientes, forma), index=indice, columns=columnas),
+        pd.DataFrame(np.reshape(observaciones, forma).astype(np.int64), index=indice, columns=columnas),
+    )
+
+
+def correlaciones_fuertes(coeficientes, umbral=0.5, observaciones=None):
+    """
+    Pares (sobre la diagonal) con ``|r| > umbral``, en el orden de la
+    matriz. Devuelve una tabla con 'Campo A', 'Campo B', 'r' (y 'N' si se
+    pasan las ``observaciones``).
+    """
+    r = coeficientes.to_numpy()
+    with np.errstate(invalid='ignore'):
+        fuertes = np.triu(np.abs(r) > umbral, k=1)
+    i, j = np.nonzero(fuertes)
+    columnas = coeficientes.columns
+    tabla = pd.DataFrame({'Campo A': columnas[i], 'Campo B': columnas[j], 'r': r[i, j]})
+    if observaciones is not None:
+        tabla['N'] = observaciones.to_numpy()[i, j]
+    return tabla
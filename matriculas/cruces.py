@@ -0,0 +1,138 @@
+"""
+Motor de cruces (tablas de promedios/conteos por combinación de campos).
+
+Cada columna clave se factoriza una sola vez y cada medida se convierte a
+número una sola vez; todos los cruces pedidos se calculan luego sobre esos
+códigos enteros con ``np.bincount``, en lugar de un ``groupby`` por cruce.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from matriculas.instrumentacion import instrumentar
+
+# claves: tupla de columnas; medida: columna numérica (None para 'size');
+# agregacion: 'mean', 'sum', 'count' o 'size'
+Cruce = namedtuple('Cruce', ['nombre', 'claves', 'medida', 'agregacion'], defaults=(None, 'mean'))
+
+AGREGACIONES = ('mean', 'sum', 'count', 'size')
+
+# Por sobre este número de combinaciones posibles se compactan los códigos
+MAX_COMBINACIONES_DENSAS = 1 << 22
+
+
+def columnas_cruce(cruce):
+    """Columnas que necesita un cruce"""
+    return list(cruce.claves) + ([cruce.medida] if cruce.medida is not None else [])
+
+
+def cruce_disponible(df, cruce):
+    """Indica si ``df`` tiene todas las columnas que usa el cruce"""
+    return all(col in df.columns for col in columnas_cruce(cruce))
+
+
+class Codificador:
+    """Guarda los códigos de cada columna clave y los valores de cada medida"""
+
+    def __init__(self, df):
+        self.df = df
+        self._claves = {}
+        self._medidas = {}
+
+    def clave(self, columna):
+        if columna not in self._claves:
+            serie = self.df[columna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                # Los códigos de la categoría ya sirven (las categorías sin
+                # filas no aparecen en los resultados)
+                self._claves[columna] = (serie.cat.codes.to_numpy(), serie.cat.categories)
+            else:
+                self._claves[columna] = pd.factorize(serie, sort=True, use_na_sentinel=True)
+        return self._claves[columna]
+
+    def medida(self, columna):
+        if columna not in self._medidas:
+            valores = pd.to_numeric(self.df[columna], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            self._medidas[columna] = valores
+        return self._medidas[columna]
+
+
+def _codigo_combinado(codificador, claves):
+    """
+    Combina los códigos de varias claves en un solo entero por fila.
+    Devuelve (código combinado, filas válidas, dimensiones, categorías).
+    """
+    codigos = []
+    categorias = []
+    for columna in claves:
+        c, u = codificador.clave(columna)
+        codigos.append(c)
+        categorias.append(u)
+    dims = tuple(max(len(u), 1) for u in categorias)
+
+    validas = np.ones(len(codificador.df), dtype=bool)
+    for c in codigos:
+        validas &= c >= 0
+    codigos = [c[validas] for c in codigos]
+    combinado = np.ravel_multi_index(codigos, dims) if codigos[0].size else np.zeros(0, dtype=np.intp)
+    return combinado, validas, dims, categorias
+
+
+def indice_combinaciones(claves, categorias, dims, presentes):
+    """Índice (simple o MultiIndex) de las combinaciones presentes"""
+    posiciones = np.unravel_index(presentes, dims)
+    niveles = [u.take(p) for u, p in zip(categorias, posiciones)]
+    if len(claves) == 1:
+        return pd.Index(niveles[0], name=claves[0])
+    return pd.MultiIndex.from_arrays(niveles, names=list(claves))
+
+
+@instrumentar
+def calcular_cruces(df, cruces):
+    """
+    Calcula todos los ``cruces`` sobre ``df`` y devuelve un diccionario
+    ``nombre -> Series`` con el mismo contenido que
+    ``df.groupby(claves)[medida].<agregacion>()``.
+    """
+    codificador = Codificador(df)
+    resultados = {}
+    for cruce in cruces:
+        if cruce.agregacion not in AGREGACIONES:
+            raise ValueError(f"Agregación no soportada: {cruce.agregacion}")
+        claves = tuple(cruce.claves)
+        combinado, validas, dims, categorias = _codigo_combinado(codificador, claves)
+
+        total = int(np.prod(dims))
+        if total > MAX_COMBINACIONES_DENSAS:
+            # Muchas combinaciones posibles: se trabaja solo con las observadas
+            observadas, combinado = np.unique(combinado, return_inverse=True)
+            total = len(observadas)
+        else:
+            observadas = None
+
+        tamanos = np.bincount(combinado, minlength=total)
+        presentes = np.flatnonzero(tamanos)
+
+        if cruce.agregacion == 'size':
+            valores = tamanos[presentes]
+            nombre_serie = None
+        else:
+            medida = codificador.medida(cruce.medida)[validas]
+            no_nulos = ~np.isnan(medida)
+            conteo = np.bincount(combinado[no_nulos], minlength=total)[presentes]
+            if cruce.agregacion == 'count':
+                valores = conteo
+            else:
+                suma = np.bincount(combinado[no_nulos], weights=medida[no_nulos], minlength=total)[presentes]
+                if cruce.agregacion == 'sum':
+                    valores = suma
+                else:
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        valores = np.where(conteo > 0, suma / np.maximum(conteo, 1), np.nan)
+            nombre_serie = cruce.medida
+
+        codigos_presentes = presentes if observadas is None else observadas[presentes]
+        indice = indice_combinaciones(claves, categorias, dims, codigos_presentes)
+        resultados[cruce.nombre] = pd.Series(valores, index=indice, name=nombre_serie)
+    return resultados
@@ -0,0 +1,198 @@
+"""
+Sketches de cuantiles con memoria acotada y combinables entre grupos y bloques.
+
+Mientras un grupo tiene a lo sumo ``limite_exacto`` valores se guardan tal
+cual y los percentiles son exactos (igual que ``np.percentile``). Al superar
+ese límite el sketch pasa a un resumen tipo t-digest: centroides (media,
+peso) cuyo tamaño depende solo de ``compresion``, más finos en las colas que
+en el centro de la distribución. Dos sketches se combinan sumando sus
+centroides y volviendo a comprimir, por lo que se pueden construir por
+bloques o por celda y juntarlos después.
+"""
+import numpy as np
+import pandas as pd
+
+COMPRESION = 300
+LIMITE_EXACTO = 20_000
+
+# Valores pendientes que se acumulan antes de volver a comprimir
+_TAMANO_BUFFER = 4096
+
+
+def _comprimir(medias, pesos, compresion):
+    """
+    Agrupa centroides ordenados según la función de escala k1 del t-digest:
+    cada centroide resultante abarca como máximo una unidad de
+    ``k(q) = compresion / (2π) · asin(2q - 1)``.
+    """
+    if medias.size == 0:
+        return medias, pesos
+    orden = np.argsort(medias, kind='mergesort')
+    medias = medias[orden]
+    pesos = pesos[orden]
+    total = pesos.sum()
+
+    centro = (np.cumsum(pesos) - pesos / 2) / total
+    k = compresion / (2 * np.pi) * np.arcsin(np.clip(2 * centro - 1, -1, 1))
+    bins = np.floor(k).astype(np.int64)
+
+    inicios = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    pesos_nuevos = np.add.reduceat(pesos, inicios)
+    medias_nuevas = np.add.reduceat(medias * pesos, inicios) / pesos_nuevos
+    return medias_nuevas, pesos_nuevos
+
+
+class SketchCuantiles:
+    """Resumen de una distribución que permite estimar cualquier cuantil"""
+
+    def __init__(self, compresion=COMPRESION, limite_exacto=LIMITE_EXACTO):
+        self.compresion = compresion
+        self.limite_exacto = limite_exacto
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self._valores = []          # modo exacto
+        self._medias = None          # modo aproximado (centroides)
+        self._pesos = None
+        self._pendientes = []        # (medias, pesos) aún sin comprimir
+        self._n_pendientes = 0
+
+    @property
+    def exacto(self):
+        return self._medias is None
+
+    def agregar(self, valores):
+        """Agrega un arreglo de valores (los nulos se ignoran)"""
+        v = np.asarray(valores, dtype=np.float64).ravel()
+        v = v[~np.isnan(v)]
+        if v.size == 0:
+            return self
+        self.n += v.size
+        self.minimo = min(self.minimo, v.min())
+        self.maximo = max(self.maximo, v.max())
+
+        if self.exacto:
+            self._valores.append(v)
+            if self.n > self.limite_exacto:
+                self._pasar_a_aproximado()
+        else:
+            self._pendientes.append((v, np.ones(v.size)))
+            self._n_pendientes += v.size
+            if self._n_pendientes >= _TAMANO_BUFFER:
+                self._vaciar_pendientes()
+        return self
+
+    def _pasar_a_aproximado(self):
+        valores = np.concatenate(self._valores) if self._valores else np.empty(0)
+        self._valores = []
+        self._medias, self._pesos = np.empty(0), np.empty(0)
+        self._pendientes.append((valores, np.ones(valores.size)))
+        self._vaciar_pendientes()
+
+    def _vaciar_pendientes(self):
+        if not self._pendientes:
+            return
+        medias = np.concatenate([self._medias] + [m for m, _ in self._pendientes])
+        pesos = np.concatenate([self._pesos] + [p for _, p in self._pendientes])
+        self._pendientes = []
+        self._n_pendientes = 0
+        self._medias, self._pesos = _comprimir(medias, pesos, self.compresion)
+
+    def combinar(self, otro):
+        """Incorpora el contenido de ``otro`` a este sketch"""
+        if otro.n == 0:
+            return self
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+
+        if self.exacto and otro.exacto and self.n + otro.n <= self.limite_exacto:
+            self._valores.extend(otro._valores)
+            self.n += otro.n
+            return self
+
+        if self.exacto:
+            self._pasar_a_aproximado()
+        if otro.exacto:
+            medias = np.concatenate(otro._valores) if otro._valores else np.empty(0)
+            pesos = np.ones(medias.size)
+        else:
+            otro._vaciar_pendientes()
+            medias, pesos = otro._medias, otro._pesos
+        self.n += otro.n
+        self._pendientes.append((medias, pesos))
+        self._vaciar_pendientes()
+        return self
+
+    def cuantiles(self, qs):
+        """Cuantiles ``qs`` (entre 0 y 1); NaN si el sketch está vacío"""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        if self.exacto:
+            valores = np.concatenate(self._valores)
+            self._valores = [valores]
+            return np.percentile(valores, qs * 100)
+
+        self._vaciar_pendientes()
+        centros = np.cumsum(self._pesos) - self._pesos / 2
+        rangos = np.r_[0.0, centros, float(self.n)]
+        medias = np.r_[self.minimo, self._medias, self.maximo]
+        return np.interp(qs * self.n, rangos, medias)
+
+    def cuantil(self, q):
+        return float(self.cuantiles([q])[0])
+
+    def __len__(self):
+        return self.n
+
+
+class CuantilesPorGrupo:
+    """
+    Un sketch por grupo, alimentado por bloques. ``actualizar`` recibe los
+    valores de un bloque y la etiqueta de grupo de cada uno.
+    """
+
+    def __init__(self, compresion=COMPRESION, limite_exacto=LIMITE_EXACTO):
+        self.compresion = compresion
+        self.limite_exacto = limite_exacto
+        self.sketches = {}
+
+    def _sketch(self, grupo):
+        sketch = self.sketches.get(grupo)
+        if sketch is None:
+            sketch = self.sketches[grupo] = SketchCuantiles(self.compresion, self.limite_exacto)
+        return sketch
+
+    def actualizar(self, valores, grupos):
+        """Reparte un bloque entre los sketches de cada grupo (un solo ordenamiento)"""
+        valores = np.asarray(valores, dtype=np.float64)
+        codigos, etiquetas = pd.factorize(pd.Series(grupos).reset_index(drop=True), use_na_sentinel=True)
+        validos = codigos >= 0
+        codigos, valores = codigos[validos], valores[validos]
+        orden = np.argsort(codigos, kind='stable')
+        limites = np.flatnonzero(np.diff(codigos[orden])) + 1
+        for segmento in np.split(orden, limites):
+            if segmento.size:
+                self._sketch(etiquetas[codigos[segmento[0]]]).agregar(valores[segmento])
+        return self
+
+    def combinar(self, otro):
+        for grupo, sketch in otro.sketches.items():
+            self._sketch(grupo).combinar(sketch)
+        return self
+
+    def cuantiles(self, qs):
+        """DataFrame con un grupo por fila y un cuantil por columna"""
+        grupos = sorted(self.sketches)
+        datos = [self.sketches[g].cuantiles(qs) for g in grupos]
+        return pd.DataFrame(datos, index=pd.Index(grupos), columns=list(qs))
+
+
+def cuantiles_por_grupo(valores, grupos, qs, compresion=COMPRESION, limite_exacto=LIMITE_EXACTO):
+    """
+    Calcula todos los cuantiles ``qs`` de todos los grupos en una pasada.
+    Los grupos con a lo sumo ``limite_exacto`` valores dan resultados exactos.
+    """
+    agregador = CuantilesPorGrupo(compresion, limite_exacto)
+    agregador.actualizar(valores, grupos)
+    return agregador.cuantiles(qs)
@@ -0,0 +1,283 @@
+"""
+Cubo de datos pre-agregado sobre las columnas categóricas de la base.
+
+El cubo guarda, para cada combinación observada de dimensiones, el número de
+filas y, por cada medida, la cantidad de valores no nulos, su media y la suma
+de cuadrados de las desviaciones respecto de esa media (M2). Cualquier
+consulta por un subconjunto de dimensiones (medias, varianzas, coeficientes
+de variación, tablas de contingencia) se obtiene combinando celdas del cubo,
+sin volver a recorrer las filas originales.
+
+Las celdas se combinan con la fórmula de Chan (como en
+``matriculas.descriptivos``)::
+
+    M2 = Σ M2_c + Σ n_c · (media_c − media)²
+
+que no resta sumas grandes entre sí, así que la varianza de un grupo
+homogéneo no pierde precisión aunque los valores sean grandes. Para las
+medidas indicadas en ``cuantiles`` cada celda guarda además un sketch de
+cuantiles (ver ``matriculas.cuantiles``) que se combina al consultar.
+"""
+import numpy as np
+import pandas as pd
+
+from matriculas.cuantiles import COMPRESION, LIMITE_EXACTO, CuantilesPorGrupo, SketchCuantiles
+
+DIMENSIONES = [
+    'GENERO', 'RANGO EDAD', 'AÑO INGRESO', 'SEMESTRE INGRESO',
+    'TIPO DE INSTITUCION', 'NOMBRE DE INSTITUCION', 'ACREDITACION INSTITUCIONAL',
+    'VIA DE INGRESO', 'REQUISITO INGRESO', 'MODALIDAD', 'JORNADA', 'TIPO PLAN CARRERA',
+    'NIVEL DE ESTUDIO CARRERA', 'NIVEL CARRERA', 'AREA CONOCIMIENTO',
+    'DURACION TOTAL CARRERA (SEMESTRES)', 'REGION SEDE', 'PROVINCIA SEDE', 'COMUNA SEDE',
+]
+
+MEDIDAS = [
+    'EDAD',
+    'DURACION PLAN DE ESTUDIO (SEMESTRES)',
+    'DURACION PROCESO TITULACION (SEMESTRES)',
+    'DURACION TOTAL CARRERA (SEMESTRES)',
+    'VALOR MATRICULA (PESOS)',
+    'VALOR ARANCEL (PESOS)',
+    'AÑOS DE ACREDITACION',
+]
+
+
+def _celdas(dimensiones, codigos_filas, categorias):
+    """
+    Combinaciones distintas de ``codigos_filas`` (una celda por combinación)
+    y la celda a la que pertenece cada fila.
+    """
+    dims = tuple(len(categorias[d]) for d in dimensiones)
+    if np.prod(dims, dtype=float) < np.iinfo(np.int64).max:
+        combinado = np.ravel_multi_index(codigos_filas, dims)
+        celdas, celda_fila = np.unique(combinado, return_inverse=True)
+        codigos = dict(zip(dimensiones, np.unravel_index(celdas, dims)))
+    else:
+        tabla = np.column_stack(codigos_filas)
+        celdas, celda_fila = np.unique(tabla, axis=0, return_inverse=True)
+        codigos = {d: celdas[:, i] for i, d in enumerate(dimensiones)}
+    codigos = {d: np.asarray(c, dtype=np.int32) for d, c in codigos.items()}
+    return codigos, celda_fila.ravel()
+
+
+def _combinar_momentos(grupo, total, n, media, m2):
+    """
+    (n, media, M2) de ``total`` grupos a partir de los de las celdas;
+    ``grupo`` es el grupo de cada celda (-1: se descarta).
+    """
+    validas = (grupo >= 0) & (n > 0)
+    g, n, media, m2 = grupo[validas], n[validas], media[validas], m2[validas]
+    n_grupo = np.bincount(g, weights=n, minlength=total)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media_grupo = np.bincount(g, weights=n * media, minlength=total) / n_grupo
+    delta = media - media_grupo[g]
+    m2_grupo = np.bincount(g, weights=m2 + n * delta * delta, minlength=total)
+    return n_grupo.astype(np.int64), media_grupo, m2_grupo
+
+
+class Cubo:
+    """
+    Celdas del cubo: un arreglo de códigos por dimensión y, por medida,
+    los arreglos ``n``, ``media`` y ``m2`` por celda.
+    """
+
+    def __init__(self, codigos, categorias, filas, estadisticos, sketches=None):
+        self.codigos = codigos
+        self.categorias = categorias
+        self.filas = filas
+        self.estadisticos = estadisticos
+        self.sketches = sketches or {}
+        self.dimensiones = list(codigos)
+        self.medidas = list(estadisticos)
+
+    @classmethod
+    def construir(cls, df, dimensiones=None, medidas=None, cuantiles=None,
+                  compresion=COMPRESION, limite_exacto=LIMITE_EXACTO):
+        """
+        Recorre ``df`` una vez y materializa el cubo. ``cuantiles`` es la
+        lista de medidas para las que se guardan sketches por celda, con los
+        parámetros ``compresion`` y ``limite_exacto`` de ``SketchCuantiles``.
+        """
+        dimensiones = [d for d in (dimensiones or DIMENSIONES) if d in df.columns]
+        medidas = [m for m in (medidas or MEDIDAS) if m in df.columns]
+        if not dimensiones:
+            raise ValueError('El cubo necesita al menos una dimensión')
+
+        codigos_filas = []
+        categorias = {}
+        for d in dimensiones:
+            # Los nulos se conservan como categoría propia y se descartan al consultar
+            c, u = pd.factorize(df[d], sort=True, use_na_sentinel=False)
+            codigos_filas.append(c)
+            categorias[d] = pd.Index(u)
+        codigos, celda_fila = _celdas(dimensiones, codigos_filas, categorias)
+        n_celdas = len(codigos[dimensiones[0]])
+
+        filas = np.bincount(celda_fila, minlength=n_celdas)
+        estadisticos = {}
+        sketches = {}
+        for m in medidas:
+            valores = pd.to_numeric(df[m], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            validos = ~np.isnan(valores)
+            x = valores[validos]
+            c = celda_fila[validos]
+            n = np.bincount(c, minlength=n_celdas)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                media = np.bincount(c, weights=x, minlength=n_celdas) / n
+            desvio = x - media[c]
+            estadisticos[m] = {
+                'n': n,
+                'media': media,
+                'm2': np.bincount(c, weights=desvio * desvio, minlength=n_celdas),
+            }
+            if cuantiles and m in cuantiles:
+                sketches[m] = CuantilesPorGrupo(compresion, limite_exacto).actualizar(valores[validos], c).sketches
+        return cls(codigos, categorias, filas, estadisticos, sketches)
+
+    def combinar(self, otro):
+        """
+        Nuevo cubo con las celdas de ambos (p. ej. construidos sobre bloques
+        distintos de la base). Las dimensiones y medidas deben coincidir.
+        """
+        if otro.dimensiones != self.dimensiones or otro.medidas != self.medidas:
+            raise ValueError('Solo se pueden combinar cubos con las mismas dimensiones y medidas')
+
+        # Categorías unidas y traducción de los códigos de cada cubo
+        categorias = {}
+        codigos_filas = []
+        for d in self.dimensiones:
+            propias, ajenas = self.categorias[d], otro.categorias[d]
+            traduccion, unidas = pd.factorize(propias.append(ajenas), sort=True, use_na_sentinel=False)
+            categorias[d] = pd.Index(unidas)
+            codigos_filas.append(np.concatenate([
+                traduccion[:len(propias)][self.codigos[d]],
+                traduccion[len(propias):][otro.codigos[d]],
+            ]))
+        codigos, celda_fila = _celdas(self.dimensiones, codigos_filas, categorias)
+        n_celdas = len(codigos[self.dimensiones[0]])
+        celdas_propias, celdas_ajenas = celda_fila[:len(self)], celda_fila[len(self):]
+
+        filas = np.bincount(celda_fila, weights=np.r_[self.filas, otro.filas], minlength=n_celdas).astype(np.int64)
+        estadisticos = {}
+        for m in self.medidas:
+            partes = (self.estadisticos[m], otro.estadisticos[m])
+            n, media, m2 = _combinar_momentos(celda_fila, n_celdas, *(
+                np.concatenate([e[campo] for e in partes]) for campo in ('n', 'media', 'm2')))
+            estadisticos[m] = {'n': n, 'media': media, 'm2': m2}
+
+        sketches = {}
+        for m in set(self.sketches) | set(otro.sketches):
+            combinados = {}
+            for celdas, por_celda in ((celdas_propias, self.sketches.get(m, {})),
+                                      (celdas_ajenas, otro.sketches.get(m, {}))):
+                for celda, sketch in por_celda.items():
+                    nueva = int(celdas[celda])
+                    if nueva in combinados:
+                        combinados[nueva].combinar(sketch)
+                    else:
+                        combinados[nueva] = SketchCuantiles(sketch.compresion, sketch.limite_exacto).combinar(sketch)
+            sketches[m] = combinados
+        return Cubo(codigos, categorias, filas, estadisticos, sketches)
+
+    def __len__(self):
+        return len(self.filas)
+
+    def _agrupar(self, dimensiones):
+        """
+        Código de grupo de cada celda para ``dimensiones`` (-1 si alguna
+        dimensión es nula) y el índice de los grupos resultantes.
+        """
+        dimensiones = list(dimensiones)
+        desconocidas = [d for d in dimensiones if d not in self.codigos]
+        if desconocidas:
+            raise KeyError(f"Dimensiones que no están en el cubo: {desconocidas}")
+
+        if not dimensiones:
+            return np.zeros(len(self), dtype=np.intp), 1, None
+
+        dims = tuple(len(self.categorias[d]) for d in dimensiones)
+        codigos = [self.codigos[d] for d in dimensiones]
+        grupo = np.ravel_multi_index(codigos, dims)
+        validas = np.ones(len(self), dtype=bool)
+        for d, c in zip(dimensiones, codigos):
+            nulos = np.flatnonzero(self.categorias[d].isna())
+            if nulos.size:
+                validas &= c != nulos[0]
+
+        presentes, grupo_valido = np.unique(grupo[validas], return_inverse=True)
+        grupo = np.full(len(self), -1, dtype=np.intp)
+        grupo[validas] = grupo_valido.ravel()
+
+        posiciones = np.unravel_index(presentes, dims)
+        niveles = [self.categorias[d].take(p) for d, p in zip(dimensiones, posiciones)]
+        if len(dimensiones) == 1:
+            indice = pd.Index(niveles[0], name=dimensiones[0])
+        else:
+            indice = pd.MultiIndex.from_arrays(niveles, names=dimensiones)
+        return grupo, len(presentes), indice
+
+    @staticmethod
+    def _sumar(grupo, total, pesos):
+        validas = grupo >= 0
+        return np.bincount(grupo[validas], weights=pesos[validas], minlength=total)
+
+    def conteos(self, dimensiones):
+        """Número de filas por combinación (equivale a ``groupby(...).size()``)"""
+        grupo, total, indice = self._agrupar(dimensiones)
+        valores = self._sumar(grupo, total, self.filas).astype(np.int64)
+        if indice is None:
+            return int(valores[0])
+        return pd.Series(valores, index=indice)
+
+    def contingencia(self, filas, columnas):
+        """Tabla de frecuencias absolutas ``filas`` x ``columnas``"""
+        filas = [filas] if isinstance(filas, str) else list(filas)
+        columnas = [columnas] if isinstance(columnas, str) else list(columnas)
+        return self.conteos(filas + columnas).unstack(columnas, fill_value=0)
+
+    def estadisticas(self, dimensiones, medida):
+        """
+        N, media, varianza (muestral), desviación estándar y CV (%) de
+        ``medida`` por combinación de ``dimensiones``.
+        """
+        if medida not in self.estadisticos:
+            raise KeyError(f"Medida que no está en el cubo: {medida}")
+        grupo, total, indice = self._agrupar(dimensiones)
+        est = self.estadisticos[medida]
+        filas = self._sumar(grupo, total, self.filas)
+        n, media, m2 = _combinar_momentos(grupo, total, est['n'], est['media'], est['m2'])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            varianza = np.where(n > 1, m2 / (n - 1), np.nan)
+            desviacion = np.sqrt(varianza)
+            cv = desviacion / media * 100
+
+        resultado = pd.DataFrame({
+            'N': n,
+            'Media': media,
+            'Varianza': varianza,
+            'Desv. Estándar': desviacion,
+            'Coef. Variación (%)': cv,
+        }, index=indice)
+        # Igual que groupby: solo grupos con filas (aunque la medida sea nula)
+        return resultado[filas > 0]
+
+    def media(self, dimensiones, medida):
+        """Atajo para ``groupby(dimensiones)[medida].mean()``"""
+        return self.estadisticas(dimensiones, medida)['Media'].rename(medida)
+
+    def cuantiles(self, dimensiones, medida, qs):
+        """
+        Cuantiles ``qs`` (entre 0 y 1) de ``medida`` por combinación de
+        ``dimensiones``, combinando los sketches de las celdas (con los
+        mismos parámetros con que se construyeron).
+        """
+        if medida not in self.sketches:
+            raise KeyError(f"El cubo no tiene sketches de cuantiles para: {medida}")
+        grupo, total, indice = self._agrupar(dimensiones)
+        modelo = next(iter(self.sketches[medida].values()), SketchCuantiles())
+        combinados = [SketchCuantiles(modelo.compresion, modelo.limite_exacto) for _ in range(total)]
+        for celda, sketch in self.sketches[medida].items():
+            if grupo[celda] >= 0:
+                combinados[grupo[celda]].combinar(sketch)
+        return pd.DataFrame([s.cuantiles(qs) for s in combinados], index=indice, columns=list(qs))
@@ -0,0 +1,173 @@
+"""
+Carga de la base de matrículas con caché columnar en disco.
+
+La primera lectura convierte el libro Excel (o CSV) a un archivo Parquet
+dentro de ``data/.cache``. Las lecturas siguientes usan ese archivo mientras
+la fuente no cambie: se compara primero fecha de modificación y tamaño, y si
+no coinciden se recalcula el hash SHA-256 antes de reconstruir la caché.
+Las columnas se guardan con los tipos compactos de ``matriculas.esquema``.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from matriculas.esquema import aplicar_esquema
+from matriculas.instrumentacion import instrumentar
+from matriculas.texto import normalizar_columna
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # sin pyarrow se usa pickle como formato de caché
+    pyarrow = None
+
+RUTA_DATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+RUTA_EXCEL = os.path.join(RUTA_DATOS, 'matriculas_ed_superior_nuble_2021.xlsx')
+DIRECTORIO_CACHE = os.path.join(RUTA_DATOS, '.cache')
+
+# Subir este número cuando cambie el contenido que se guarda en la caché
+VERSION_CACHE = 3
+
+
+def hash_archivo(ruta, tamano_bloque=1 << 20):
+    """Calcula el SHA-256 de un archivo leyéndolo por bloques"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _rutas_cache(ruta, directorio_cache):
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    extension = '.parquet' if pyarrow is not None else '.pkl'
+    return (os.path.join(directorio_cache, nombre + extension),
+            os.path.join(directorio_cache, nombre + '.json'))
+
+
+def _leer_fuente(ruta, compacto=True):
+    """
+    Lee el archivo original (Excel o CSV), agrega las columnas derivadas y,
+    con ``compacto``, aplica el esquema de tipos compactos.
+    """
+    if ruta.lower().endswith('.csv'):
+        df = pd.read_csv(ruta)
+    else:
+        df = pd.read_excel(ruta)
+    if compacto:
+        df, _ = aplicar_esquema(df)
+    return agregar_derivadas(df)
+
+
+def agregar_derivadas(df):
+    """Columnas calculadas que se guardan junto a los datos en la caché"""
+    if 'NOMBRE CARRERA' in df.columns:
+        df['NOMBRE CARRERA NORMALIZADO'] = normalizar_columna(df['NOMBRE CARRERA'])
+    return df
+
+
+def leer_meta(ruta_meta):
+    """Metadatos JSON de ``ruta_meta`` (None si no existe o no se puede leer)"""
+    try:
+        with open(ruta_meta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def escribir_meta(ruta_meta, meta):
+    """Escribe ``meta`` como JSON reemplazando ``ruta_meta`` de forma atómica"""
+    temporal = ruta_meta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(temporal, ruta_meta)
+
+
+def _cache_vigente(ruta, ruta_datos, ruta_meta):
+    """
+    Indica si la caché corresponde a la fuente actual. Si solo cambió la
+    fecha de modificación pero el contenido es el mismo, actualiza los
+    metadatos y la considera vigente.
+    """
+    meta = leer_meta(ruta_meta)
+    if meta is None or meta.get('version') != VERSION_CACHE or not os.path.exists(ruta_datos):
+        return False
+
+    info = os.stat(ruta)
+    if meta.get('mtime_ns') == info.st_mtime_ns and meta.get('tamano') == info.st_size:
+        return True
+
+    if meta.get('tamano') != info.st_size or meta.get('sha256') != hash_archivo(ruta):
+        return False
+
+    meta['mtime_ns'] = info.st_mtime_ns
+    escribir_meta(ruta_meta, meta)
+    return True
+
+
+def guardar_cache(df, ruta_datos):
+    """Escribe ``df`` en Parquet (o pickle sin pyarrow) reemplazando ``ruta_datos``"""
+    temporal = ruta_datos + '.tmp'
+    if pyarrow is not None:
+        df.to_parquet(temporal, index=False)
+    else:
+        df.to_pickle(temporal)
+    os.replace(temporal, ruta_datos)
+
+
+def leer_cache(ruta_datos):
+    """Lee un archivo escrito por ``guardar_cache``"""
+    if ruta_datos.endswith('.parquet'):
+        return pd.read_parquet(ruta_datos, memory_map=True)
+    return pd.read_pickle(ruta_datos)
+
+
+def construir_cache(ruta=RUTA_EXCEL, directorio_cache=DIRECTORIO_CACHE):
+    """
+    Convierte el archivo fuente a la caché columnar y devuelve el DataFrame
+    """
+    os.makedirs(directorio_cache, exist_ok=True)
+    ruta_datos, ruta_meta = _rutas_cache(ruta, directorio_cache)
+
+    info = os.stat(ruta)
+    df = _leer_fuente(ruta, compacto=False)
+    memoria_original = int(df.memory_usage(deep=True).sum())
+    df, no_convertidas = aplicar_esquema(df)
+    guardar_cache(df, ruta_datos)
+    escribir_meta(ruta_meta, {
+        'version': VERSION_CACHE,
+        'fuente': os.path.abspath(ruta),
+        'mtime_ns': info.st_mtime_ns,
+        'tamano': info.st_size,
+        'sha256': hash_archivo(ruta),
+        'memoria_original': memoria_original,
+        'memoria_compacta': int(df.memory_usage(deep=True).sum()),
+        'columnas_sin_convertir': no_convertidas,
+    })
+    return df
+
+
+@instrumentar
+def cargar_matriculas(ruta=RUTA_EXCEL, directorio_cache=DIRECTORIO_CACHE, usar_cache=True, compacto=True):
+    """
+    Carga la base de matrículas usando la caché columnar cuando está vigente.
+
+    Con ``usar_cache=False`` se lee siempre el archivo original sin tocar la
+    caché. La caché guarda los tipos compactos, por lo que ``compacto=False``
+    (tipos que infiere pandas) también lee el archivo original.
+
+    Si ``ruta`` es un directorio con una base particionada (ver
+    ``matriculas.particiones``), se leen todas sus particiones.
+    """
+    if os.path.isdir(ruta):
+        from matriculas.particiones import cargar_particiones
+
+        return cargar_particiones(rutas=None, directorio=ruta)
+    if not usar_cache or not compacto:
+        return _leer_fuente(ruta, compacto)
+
+    ruta_datos, ruta_meta = _rutas_cache(ruta, directorio_cache)
+    if _cache_vigente(ruta, ruta_datos, ruta_meta):
+        return leer_cache(ruta_datos)
+    return construir_cache(ruta, directorio_cache)
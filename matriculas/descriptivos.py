@@ -0,0 +1,132 @@
+"""
+Estadísticas descriptivas por grupo en una sola pasada.
+
+Cada bloque de datos se reduce por código de grupo (``np.bincount``) a
+conteo, media y suma de cuadrados de las desviaciones; los bloques se
+combinan con la fórmula de Chan (Welford en paralelo), que es numéricamente
+estable aunque los valores sean grandes (p. ej. aranceles en pesos).
+"""
+import numpy as np
+import pandas as pd
+
+from matriculas.cuantiles import CuantilesPorGrupo
+
+
+class EstadisticasPorGrupo:
+    """
+    Acumulador combinable de N, media, varianza, mínimo y máximo por grupo.
+    """
+
+    def __init__(self):
+        self.etiquetas = []
+        self._posicion = {}
+        self.n = np.zeros(0, dtype=np.int64)
+        self.media = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.minimo = np.zeros(0)
+        self.maximo = np.zeros(0)
+
+    def _posiciones(self, etiquetas):
+        """Posición global de cada etiqueta, agregando las nuevas"""
+        nuevas = [e for e in etiquetas if e not in self._posicion]
+        if nuevas:
+            for e in nuevas:
+                self._posicion[e] = len(self.etiquetas)
+                self.etiquetas.append(e)
+            extra = len(nuevas)
+            self.n = np.r_[self.n, np.zeros(extra, dtype=np.int64)]
+            self.media = np.r_[self.media, np.zeros(extra)]
+            self.m2 = np.r_[self.m2, np.zeros(extra)]
+            self.minimo = np.r_[self.minimo, np.full(extra, np.inf)]
+            self.maximo = np.r_[self.maximo, np.full(extra, -np.inf)]
+        return np.array([self._posicion[e] for e in etiquetas], dtype=np.intp)
+
+    def _combinar_momentos(self, pos, n, media, m2, minimo, maximo):
+        """Fórmula de Chan para juntar (n, media, M2) de dos particiones"""
+        n_a = self.n[pos]
+        total = n_a + n
+        delta = media - self.media[pos]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            proporcion = np.where(total > 0, n / total, 0.0)
+        self.media[pos] += delta * proporcion
+        self.m2[pos] += m2 + delta * delta * n_a * proporcion
+        self.n[pos] = total
+        self.minimo[pos] = np.minimum(self.minimo[pos], minimo)
+        self.maximo[pos] = np.maximum(self.maximo[pos], maximo)
+
+    def actualizar(self, valores, grupos):
+        """Incorpora un bloque de ``valores`` con la etiqueta de grupo de cada uno"""
+        valores = np.asarray(valores, dtype=np.float64)
+        codigos, etiquetas = pd.factorize(pd.Series(grupos).reset_index(drop=True), use_na_sentinel=True)
+        validos = (codigos >= 0) & ~np.isnan(valores)
+        codigos, valores = codigos[validos], valores[validos]
+        k = len(etiquetas)
+
+        n = np.bincount(codigos, minlength=k)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.bincount(codigos, weights=valores, minlength=k) / n
+        desvio = valores - media[codigos]
+        m2 = np.bincount(codigos, weights=desvio * desvio, minlength=k)
+        minimo = np.full(k, np.inf)
+        maximo = np.full(k, -np.inf)
+        np.minimum.at(minimo, codigos, valores)
+        np.maximum.at(maximo, codigos, valores)
+
+        con_datos = n > 0
+        pos = self._posiciones(list(etiquetas))
+        self._combinar_momentos(pos[con_datos], n[con_datos], media[con_datos], m2[con_datos],
+                                minimo[con_datos], maximo[con_datos])
+        return self
+
+    def combinar(self, otro):
+        """Incorpora los grupos acumulados en ``otro``"""
+        if otro.etiquetas:
+            pos = self._posiciones(otro.etiquetas)
+            self._combinar_momentos(pos, otro.n, otro.media, otro.m2, otro.minimo, otro.maximo)
+        return self
+
+    def resultado(self):
+        """Tabla con una fila por grupo (ordenada por etiqueta)"""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            varianza = np.where(n > 1, self.m2 / (n - 1), np.nan)
+            desviacion = np.sqrt(varianza)
+            cv = desviacion / self.media * 100
+        vacios = n == 0
+        # Con grupos de varias claves (tuplas) el índice queda como MultiIndex
+        indice = pd.Index(self.etiquetas)
+        if not isinstance(indice, pd.MultiIndex):
+            indice.name = 'Grupo'
+        tabla = pd.DataFrame({
+            'N': n,
+            'Media': np.where(vacios, np.nan, self.media),
+            'Desv. Estándar': desviacion,
+            'Varianza': varianza,
+            'Coef. Variación (%)': cv,
+            'Rango': np.where(vacios, np.nan, self.maximo - self.minimo),
+            'Mínimo': np.where(vacios, np.nan, self.minimo),
+            'Máximo': np.where(vacios, np.nan, self.maximo),
+        }, index=indice)
+        return tabla.sort_index()
+
+
+def estadisticas_por_grupo(valores, grupos):
+    """N, media, desviación, varianza, CV, rango, mínimo y máximo por grupo"""
+    return EstadisticasPorGrupo().actualizar(valores, grupos).resultado()
+
+
+def describir_por_grupo(valores, grupos):
+    """
+    La tabla completa de dispersión que arman los notebooks: además de
+    ``estadisticas_por_grupo`` agrega Mediana, Q1, Q3 y RIC (cuantiles
+    exactos para grupos pequeños, ver ``matriculas.cuantiles``).
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    tabla = estadisticas_por_grupo(valores, grupos)
+    cuartiles = CuantilesPorGrupo().actualizar(valores, grupos).cuantiles([0.25, 0.5, 0.75])
+    cuartiles = cuartiles.reindex(tabla.index)
+    tabla.insert(2, 'Mediana', cuartiles[0.5].to_numpy())
+    tabla['Q1'] = cuartiles[0.25].to_numpy()
+    tabla['Q3'] = cuartiles[0.75].to_numpy()
+    tabla['RIC'] = tabla['Q3'] - tabla['Q1']
+    return tabla
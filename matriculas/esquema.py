@@ -0,0 +1,99 @@
+"""
+Esquema de tipos compactos para la base de matrículas (28 columnas).
+
+Las columnas de texto repetitivo se guardan como ``category`` y las
+numéricas con el entero más chico que alcanza. Antes de convertir una
+columna entera se valida, de forma vectorizada, que todos sus valores sean
+enteros y quepan en el tipo; si no, la columna se deja como estaba.
+"""
+import numpy as np
+import pandas as pd
+
+ESQUEMA = {
+    'ID': 'int32',
+    'GENERO': 'category',
+    'EDAD': 'int8',
+    'RANGO EDAD': 'category',
+    'AÑO INGRESO': 'int16',
+    'SEMESTRE INGRESO': 'category',
+    'TIPO DE INSTITUCION': 'category',
+    'NOMBRE DE INSTITUCION': 'category',
+    'ACREDITACION INSTITUCIONAL': 'category',
+    'PERIODO DE ACREDITACION': 'category',
+    'AÑOS DE ACREDITACION': 'float64',  # tiene nulos (instituciones no acreditadas)
+    'NOMBRE CARRERA': 'category',
+    'REQUISITO INGRESO': 'category',
+    'VIA DE INGRESO': 'category',
+    'MODALIDAD': 'category',
+    'JORNADA': 'category',
+    'TIPO PLAN CARRERA': 'category',
+    'NIVEL DE ESTUDIO CARRERA': 'category',
+    'NIVEL CARRERA': 'category',
+    'AREA CONOCIMIENTO': 'category',
+    'DURACION PLAN DE ESTUDIO (SEMESTRES)': 'int8',
+    'DURACION PROCESO TITULACION (SEMESTRES)': 'int8',
+    'DURACION TOTAL CARRERA (SEMESTRES)': 'int8',
+    'VALOR MATRICULA (PESOS)': 'int32',
+    'VALOR ARANCEL (PESOS)': 'int32',
+    'REGION SEDE': 'category',
+    'PROVINCIA SEDE': 'category',
+    'COMUNA SEDE': 'category',
+}
+
+
+def es_entero(serie):
+    """
+    Máscara de los valores que son números enteros (equivale a
+    ``float(x).is_integer()`` fila a fila; los nulos y textos no numéricos
+    dan ``False``).
+    """
+    valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.Series(np.isfinite(valores) & (np.mod(valores, 1) == 0), index=serie.index)
+
+
+def _convertir_entero(serie, tipo):
+    """La columna como ``tipo`` entero, o ``None`` si algún valor no cabe"""
+    if not es_entero(serie).all():
+        return None
+    valores = pd.to_numeric(serie)
+    limites = np.iinfo(tipo)
+    if valores.min() < limites.min or valores.max() > limites.max:
+        return None
+    return valores.astype(tipo)
+
+
+def aplicar_esquema(df, esquema=ESQUEMA):
+    """
+    Convierte las columnas de ``df`` presentes en ``esquema``. Devuelve el
+    DataFrame convertido y la lista de columnas que no se pudieron
+    convertir (quedan con su tipo original).
+    """
+    df = df.copy()
+    rechazadas = []
+    for columna, tipo in esquema.items():
+        if columna not in df.columns or df[columna].dtype == tipo:
+            continue
+        if tipo == 'category':
+            df[columna] = df[columna].astype('category')
+        elif np.dtype(tipo).kind in 'iu':
+            convertida = _convertir_entero(df[columna], tipo)
+            if convertida is None:
+                rechazadas.append(columna)
+            else:
+                df[columna] = convertida
+        else:
+            df[columna] = pd.to_numeric(df[columna], errors='coerce').astype(tipo)
+    return df, rechazadas
+
+
+def reporte_memoria(antes, despues):
+    """Tabla por columna con tipo y bytes antes y después de compactar"""
+    reporte = pd.DataFrame({
+        'tipo antes': antes.dtypes.astype(str),
+        'bytes antes': antes.memory_usage(deep=True, index=False),
+        'tipo después': despues.dtypes.astype(str),
+        'bytes después': despues.memory_usage(deep=True, index=False),
+    })
+    total = pd.DataFrame({'bytes antes': [reporte['bytes antes'].sum()],
+                          'bytes después': [reporte['bytes después'].sum()]}, index=['TOTAL'])
+    return pd.concat([reporte, total])
@@ -0,0 +1,222 @@
+"""
+Motor de consultas sobre la forma normalizada de la base (esquema estrella).
+
+``data/matriculas.csv`` es la tabla de hechos y ``carreras.csv`` /
+``instituciones.csv`` son las dimensiones. Las filas de cada dimensión están
+en el orden en que su identificador aparece por primera vez en la tabla de
+hechos, mientras que los identificadores son códigos de catálogo (ordenados
+alfabéticamente). Por eso el cruce no puede hacerse con ``index + 1``: se
+arma una tabla de posiciones ``id -> fila`` y cada columna se resuelve con
+``take`` sobre arreglos enteros, sin merges por hash.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from matriculas.datos import RUTA_DATOS
+
+# Etiquetas de cada código de catálogo (el código k corresponde a la posición k-1)
+CATALOGOS = {
+    'genero_id': ('Femenino', 'Masculino'),
+    'rango_edad_id': ('15 a 19 ', '20 a 24 ', '25 a 29 ', '30 a 34 ', '35 a 39 ', '40 y mas'),
+    'via_ingreso_id': (
+        'Articulacion de TNS a carrera profesional', 'Cambio Interno', 'Cambio externo',
+        'Continuidad desde plan comun o Bachillerato.', 'Ingreso Directo (regular)',
+        'Ingreso a traves de PACE', 'Ingreso a traves de programas de inclusion',
+        'Ingreso especial para estudiantes extranjeros',
+        'Ingreso por Reconocimiento de Aprendizajes Previos (RAP)',
+        'Ingreso por caracteristicas especiales', 'Otras formas de Ingreso',
+    ),
+    'tipo_institucion_id': (
+        'Centros de Formacion Tecnica', 'Institutos Profesionales',
+        'Universidades CRUCH', 'Universidades Privadas',
+    ),
+    'acreditacion_id': ('ACREDITADA', 'NO ACREDITADA'),
+    'requisito_ingreso_id': (
+        'Educacion Media', 'Licenciatura', 'Magister', 'Tecnico de Nivel Superior', 'Titulo Profesional',
+    ),
+    'modalidad_id': ('No Presencial', 'Presencial', 'Semipresencial'),
+    'jornada_id': ('A Distancia', 'Diurno', 'Otro', 'Semipresencial', 'Vespertino'),
+    'tipo_plan_id': ('Plan Especial', 'Plan Regular', 'Plan Regular de Continuidad'),
+    'nivel_carrera_id': ('Carreras Profesionales', 'Carreras Tecnicas', 'Doctorado', 'Magister', 'Postitulo'),
+    'area_conocimiento_id': (
+        'Administracion y Comercio', 'Agropecuaria', 'Arte y Arquitectura', 'Ciencias Basicas',
+        'Ciencias Sociales', 'Derecho', 'Educacion', 'Humanidades', 'Salud', 'Tecnologia',
+    ),
+}
+
+# Nivel de estudio que corresponde a cada nivel de carrera (mismo orden que el catálogo)
+NIVEL_ESTUDIO = ('Pregrado', 'Pregrado', 'Postgrado', 'Postgrado', 'Postitulo')
+
+# Código de comuna -> (región, provincia, comuna)
+COMUNAS = {
+    147: ('Nuble', 'Diguillin', 'Chillan'),
+}
+
+# Columna de la base plana -> (tabla, columna de origen, tipo de resolución)
+COLUMNAS = {
+    'ID': ('hechos', 'matricula_id', 'valor'),
+    'GENERO': ('hechos', 'genero_id', 'catalogo'),
+    'EDAD': ('hechos', 'edad', 'valor'),
+    'RANGO EDAD': ('hechos', 'rango_edad_id', 'catalogo'),
+    'AÑO INGRESO': ('hechos', 'anio_ingreso', 'valor'),
+    'SEMESTRE INGRESO': ('hechos', 'semestre_ingreso', 'texto'),
+    'TIPO DE INSTITUCION': ('instituciones', 'tipo_institucion_id', 'catalogo'),
+    'NOMBRE DE INSTITUCION': ('instituciones', 'institucion_nombre', 'texto'),
+    'ACREDITACION INSTITUCIONAL': ('instituciones', 'acreditacion_id', 'catalogo'),
+    'PERIODO DE ACREDITACION': ('instituciones', 'periodo_acreditacion', 'texto'),
+    'AÑOS DE ACREDITACION': ('instituciones', 'anios_acreditacion', 'valor'),
+    'NOMBRE CARRERA': ('carreras', 'carrera_nombre', 'texto'),
+    'REQUISITO INGRESO': ('carreras', 'requisito_ingreso_id', 'catalogo'),
+    'VIA DE INGRESO': ('hechos', 'via_ingreso_id', 'catalogo'),
+    'MODALIDAD': ('carreras', 'modalidad_id', 'catalogo'),
+    'JORNADA': ('carreras', 'jornada_id', 'catalogo'),
+    'TIPO PLAN CARRERA': ('carreras', 'tipo_plan_id', 'catalogo'),
+    'NIVEL DE ESTUDIO CARRERA': ('carreras', 'nivel_estudio', 'texto'),
+    'NIVEL CARRERA': ('carreras', 'nivel_carrera_id', 'catalogo'),
+    'AREA CONOCIMIENTO': ('carreras', 'area_conocimiento_id', 'catalogo'),
+    'DURACION PLAN DE ESTUDIO (SEMESTRES)': ('carreras', 'duracion_plan', 'valor'),
+    'DURACION PROCESO TITULACION (SEMESTRES)': ('carreras', 'duracion_titulacion', 'valor'),
+    'DURACION TOTAL CARRERA (SEMESTRES)': ('carreras', 'duracion_total', 'valor'),
+    'VALOR MATRICULA (PESOS)': ('carreras', 'valoracion_matricula', 'valor'),
+    'VALOR ARANCEL (PESOS)': ('carreras', 'valoracion_arancel', 'valor'),
+    'REGION SEDE': ('comunas', 'region', 'texto'),
+    'PROVINCIA SEDE': ('comunas', 'provincia', 'texto'),
+    'COMUNA SEDE': ('comunas', 'comuna', 'texto'),
+}
+
+# Tipos compactos para la tabla de hechos
+TIPOS_HECHOS = {
+    'matricula_id': 'int32',
+    'genero_id': 'int8',
+    'edad': 'int16',
+    'rango_edad_id': 'int8',
+    'anio_ingreso': 'int16',
+    'institucion_id': 'int16',
+    'carrera_id': 'int16',
+    'via_ingreso_id': 'int8',
+    'comuna_id': 'int16',
+}
+
+
+def _tabla_posiciones(ids_en_orden):
+    """
+    Devuelve un arreglo ``pos`` tal que ``pos[id]`` es la fila de la
+    dimensión que corresponde a ese identificador (-1 si no existe).
+    """
+    pos = np.full(int(ids_en_orden.max()) + 1, -1, dtype=np.int32)
+    pos[ids_en_orden] = np.arange(len(ids_en_orden), dtype=np.int32)
+    return pos
+
+
+def _filas_de(pos, ids, dimension):
+    """
+    ``pos.take(ids)`` (ver ``_tabla_posiciones``), con ``ValueError`` si
+    algún identificador no está en la dimensión.
+    """
+    ids = np.asarray(ids)
+    fuera = (ids < 0) | (ids >= len(pos))
+    filas = pos.take(np.where(fuera, 0, ids))
+    faltan = fuera | (filas < 0)
+    if faltan.any():
+        desconocidos = np.unique(ids[faltan])
+        raise ValueError(f"Identificadores de {dimension} sin catálogo: {desconocidos[:10].tolist()}"
+                         + (f" (y {len(desconocidos) - 10} más)" if len(desconocidos) > 10 else ''))
+    return filas
+
+
+def _como_texto(valores):
+    """Factoriza una columna de texto a (códigos, categorías)"""
+    codigos, categorias = pd.factorize(pd.Series(valores), use_na_sentinel=True)
+    return codigos.astype(np.int32), pd.Index(categorias)
+
+
+class EsquemaEstrella:
+    """
+    Tabla de hechos como arreglos enteros más dimensiones indexadas por
+    posición. Usar ``vista(columnas)`` para obtener solo las columnas
+    necesarias con los nombres de la base plana.
+    """
+
+    def __init__(self, hechos, carreras, instituciones):
+        self.hechos = hechos
+        self.carreras = carreras
+        self.instituciones = instituciones
+        self.n = len(hechos['matricula_id'])
+
+        # Fila de cada dimensión para cada matrícula (se calcula una sola vez)
+        pos_carrera = _tabla_posiciones(pd.unique(hechos['carrera_id']))
+        pos_institucion = _tabla_posiciones(pd.unique(hechos['institucion_id']))
+        if len(carreras) != pos_carrera.max() + 1 or len(instituciones) != pos_institucion.max() + 1:
+            raise ValueError('Las dimensiones no coinciden con los identificadores de la tabla de hechos')
+        self._filas = {
+            'hechos': None,
+            'carreras': pos_carrera.take(hechos['carrera_id']),
+            'instituciones': pos_institucion.take(hechos['institucion_id']),
+        }
+        self._comunas = sorted(COMUNAS)
+        pos_comuna = _tabla_posiciones(np.array(self._comunas))
+        self._filas['comunas'] = _filas_de(pos_comuna, hechos['comuna_id'], 'comuna')
+
+    @classmethod
+    def cargar(cls, directorio=RUTA_DATOS):
+        """Lee las tres tablas normalizadas desde ``directorio``"""
+        hechos_df = pd.read_csv(os.path.join(directorio, 'matriculas.csv'))
+        hechos = {col: hechos_df[col].to_numpy(dtype=tipo) for col, tipo in TIPOS_HECHOS.items()}
+        hechos['semestre_ingreso'] = hechos_df['semestre_ingreso'].to_numpy(dtype=object)
+
+        carreras = pd.read_csv(os.path.join(directorio, 'carreras.csv'))
+        carreras['nivel_estudio'] = np.array(NIVEL_ESTUDIO, dtype=object).take(carreras['nivel_carrera_id'] - 1)
+
+        instituciones = pd.read_csv(os.path.join(directorio, 'instituciones.csv'),
+                                    na_values=['NULL'], keep_default_na=False)
+        inicio = instituciones['periodo_acreditacion_inicio']
+        fin = instituciones['periodo_acreditacion_fin']
+        instituciones['periodo_acreditacion'] = (inicio + ' AL ' + fin).where(inicio.notna())
+        instituciones['anios_acreditacion'] = (
+            pd.to_datetime(fin, format='%d/%m/%Y').dt.year - pd.to_datetime(inicio, format='%d/%m/%Y').dt.year
+        ).astype(float)
+        return cls(hechos, carreras, instituciones)
+
+    def _origen(self, tabla, columna):
+        if tabla == 'hechos':
+            return self.hechos[columna]
+        if tabla == 'comunas':
+            campo = ('region', 'provincia', 'comuna').index(columna)
+            return np.array([COMUNAS[c][campo] for c in self._comunas], dtype=object)
+        return getattr(self, tabla)[columna].to_numpy()
+
+    def columna(self, nombre):
+        """Resuelve una columna con nombre de la base plana"""
+        tabla, origen, tipo = COLUMNAS[nombre]
+        valores = self._origen(tabla, origen)
+        filas = self._filas[tabla]
+
+        if tipo == 'catalogo':
+            codigos = valores if filas is None else valores.take(filas)
+            return pd.Categorical.from_codes(np.asarray(codigos, dtype=np.int32) - 1,
+                                             categories=CATALOGOS[origen])
+        if tipo == 'texto':
+            codigos, categorias = _como_texto(valores)
+            if filas is not None:
+                codigos = codigos.take(filas)
+            return pd.Categorical.from_codes(codigos, categories=categorias)
+        return valores if filas is None else valores.take(filas)
+
+    def vista(self, columnas=None):
+        """
+        Devuelve un DataFrame desnormalizado solo con ``columnas`` (por
+        defecto las 28 de la base plana, en el mismo orden).
+        """
+        if columnas is None:
+            columnas = list(COLUMNAS)
+        desconocidas = [c for c in columnas if c not in COLUMNAS]
+        if desconocidas:
+            raise KeyError(f"Columnas desconocidas: {desconocidas}")
+        return pd.DataFrame({c: self.columna(c) for c in columnas})
+
+
+def cargar_vista(columnas=None, directorio=RUTA_DATOS):
+    """Atajo para ``EsquemaEstrella.cargar(directorio).vista(columnas)``"""
+    return EsquemaEstrella.cargar(directorio).vista(columnas)
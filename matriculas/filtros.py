@@ -0,0 +1,336 @@
+"""
+Filtros de filas como máscaras booleanas que se combinan sin copiar la base.
+
+Cada filtro calcula una máscara (arreglo booleano, una posición por fila)
+sobre las columnas que usa; ``&``, ``|`` y ``~`` combinan máscaras y el
+DataFrame se recorta una sola vez al final (``aplicar``), en lugar de crear
+una copia por filtro.
+
+Además de condiciones por fila (``Rango``, ``EnConjunto``, ``NoNulo``) hay
+filtros por grupo, del estilo ``HAVING`` de SQL: ``Grupo`` conserva las
+filas cuyo grupo cumple un mínimo/máximo de tamaño o de un agregado (media,
+mínimo, máximo, suma) de una columna. Las claves se codifican como enteros
+y el agregado sale de ``np.bincount`` sobre esos códigos, sin ``groupby`` ni
+``merge``. En una cadena ``a & b``, los grupos de ``b`` se calculan solo con
+las filas que pasaron ``a`` (lo mismo que filtrar primero y agrupar
+después).
+
+Si falta alguna columna que usa un filtro, el filtro no se aplica (como
+hacían los scripts con ``if columna in df.columns``).
+
+``particiones(claves)`` evalúa un filtro sobre una tabla con los valores de
+las claves de partición (una fila por partición, ver
+``matriculas.particiones``) y marca las particiones que pueden tener filas
+que lo cumplan; las demás no se leen.
+"""
+import numpy as np
+import pandas as pd
+
+from matriculas.cruces import Codificador
+from matriculas.instrumentacion import instrumentar
+
+# Los mismos filtros que aplican los scripts y notebooks
+ANIO_MINIMO = 2010
+EDAD_MINIMA = 0
+EDAD_MAXIMA = 100
+MINIMO_MATRICULAS_CARRERA = 15
+
+AGREGACIONES = ('size', 'mean', 'sum', 'min', 'max')
+
+
+def _numerica(df, columna):
+    serie = df[columna]
+    if not pd.api.types.is_numeric_dtype(serie):
+        serie = pd.to_numeric(serie, errors='coerce')
+    return serie.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _columnas(claves):
+    return (claves,) if isinstance(claves, str) else tuple(claves)
+
+
+class Filtro:
+    """
+    Base de los filtros. ``mascara(df, base)`` devuelve el arreglo booleano
+    de las filas que cumplen el filtro; ``base`` son las filas que ya
+    pasaron los filtros previos de la cadena (solo la usan los filtros por
+    grupo).
+    """
+
+    columnas = ()
+    # Si el resultado de una fila depende de otras filas (filtros por grupo)
+    por_grupo = False
+
+    def disponible(self, df):
+        return all(c in df.columns for c in self.columnas)
+
+    def mascara(self, df, base=None):
+        if not self.disponible(df):
+            return np.ones(len(df), dtype=bool) if base is None else base.copy()
+        propia = self._mascara(df, base)
+        return propia if base is None else propia & base
+
+    def _mascara(self, df, base):
+        raise NotImplementedError
+
+    def particiones(self, claves):
+        """
+        (máscara, exacta) sobre las filas de ``claves`` (una por partición):
+        la máscara descarta solo particiones sin filas que cumplan el filtro
+        y ``exacta`` indica que además todas las filas de las marcadas lo
+        cumplen. Un filtro sobre columnas que no son claves no descarta nada.
+        """
+        if not self.disponible(claves) or self.por_grupo:
+            return np.ones(len(claves), dtype=bool), False
+        return self._mascara(claves, None), True
+
+    @instrumentar
+    def aplicar(self, df):
+        """``df`` recortado a las filas que cumplen el filtro (el mismo objeto si son todas)"""
+        mascara = self.mascara(df)
+        return df if mascara.all() else df[mascara]
+
+    def __and__(self, otro):
+        return Y(self, otro)
+
+    def __or__(self, otro):
+        return O(self, otro)
+
+    def __invert__(self):
+        return No(self)
+
+
+class Y(Filtro):
+    """Todos los filtros, en orden: cada uno ve solo las filas que pasaron los anteriores"""
+
+    def __init__(self, *filtros):
+        self.filtros = [f for filtro in filtros for f in (filtro.filtros if isinstance(filtro, Y) else [filtro])]
+        self.por_grupo = any(f.por_grupo for f in self.filtros)
+
+    def mascara(self, df, base=None):
+        for filtro in self.filtros:
+            base = filtro.mascara(df, base)
+        return np.ones(len(df), dtype=bool) if base is None else base
+
+    def particiones(self, claves):
+        # Un filtro por grupo cuenta las filas que le llegan: los filtros que
+        # vienen después no pueden descartar particiones antes que él
+        mascara, exacta = np.ones(len(claves), dtype=bool), True
+        for filtro in self.filtros:
+            if filtro.por_grupo:
+                return mascara, False
+            propia, propia_exacta = filtro.particiones(claves)
+            mascara &= propia
+            exacta &= propia_exacta
+        return mascara, exacta
+
+    def __repr__(self):
+        return ' & '.join(map(repr, self.filtros))
+
+
+class O(Filtro):
+    """Alguno de los filtros (todos evaluados sobre las mismas filas de base)"""
+
+    def __init__(self, *filtros):
+        self.filtros = list(filtros)
+        self.por_grupo = any(f.por_grupo for f in self.filtros)
+
+    def mascara(self, df, base=None):
+        resultado = np.zeros(len(df), dtype=bool)
+        for filtro in self.filtros:
+            resultado |= filtro.mascara(df, base)
+        return resultado
+
+    def particiones(self, claves):
+        if self.por_grupo:
+            return np.ones(len(claves), dtype=bool), False
+        mascara, exacta = np.zeros(len(claves), dtype=bool), True
+        for filtro in self.filtros:
+            propia, propia_exacta = filtro.particiones(claves)
+            mascara |= propia
+            exacta &= propia_exacta
+        return mascara, exacta
+
+    def __repr__(self):
+        return '(' + ' | '.join(map(repr, self.filtros)) + ')'
+
+
+class No(Filtro):
+    def __init__(self, filtro):
+        self.filtro = filtro
+        self.columnas = filtro.columnas
+        self.por_grupo = filtro.por_grupo
+
+    def _mascara(self, df, base):
+        return ~self.filtro.mascara(df, base)
+
+    def particiones(self, claves):
+        # Solo se puede negar una máscara exacta
+        mascara, exacta = self.filtro.particiones(claves)
+        if not exacta:
+            return np.ones(len(claves), dtype=bool), False
+        return ~mascara, True
+
+    def __repr__(self):
+        return f'~({self.filtro!r})' if isinstance(self.filtro, Y) else f'~{self.filtro!r}'
+
+
+class Rango(Filtro):
+    """
+    ``minimo <= columna <= maximo`` (con ``abierto``, desigualdades
+    estrictas); un límite ``None`` no se revisa. Los nulos no cumplen.
+    """
+
+    def __init__(self, columna, minimo=None, maximo=None, abierto=False):
+        self.columnas = (columna,)
+        self.minimo, self.maximo, self.abierto = minimo, maximo, abierto
+
+    def _mascara(self, df, base):
+        valores = _numerica(df, self.columnas[0])
+        mascara = ~np.isnan(valores)
+        if self.minimo is not None:
+            mascara &= valores > self.minimo if self.abierto else valores >= self.minimo
+        if self.maximo is not None:
+            mascara &= valores < self.maximo if self.abierto else valores <= self.maximo
+        return mascara
+
+    def __repr__(self):
+        return f'Rango({self.columnas[0]!r}, {self.minimo!r}, {self.maximo!r}, abierto={self.abierto})'
+
+
+class EnConjunto(Filtro):
+    """Filas cuyo valor de ``columna`` está en ``valores``"""
+
+    def __init__(self, columna, valores):
+        self.columnas = (columna,)
+        self.valores = list(valores)
+
+    def _mascara(self, df, base):
+        return df[self.columnas[0]].isin(self.valores).to_numpy(dtype=bool)
+
+    def __repr__(self):
+        return f'EnConjunto({self.columnas[0]!r}, {self.valores!r})'
+
+
+class NoNulo(Filtro):
+    """Filas sin nulos en ``columnas``"""
+
+    def __init__(self, columnas):
+        self.columnas = _columnas(columnas)
+
+    def _mascara(self, df, base):
+        return df[list(self.columnas)].notna().all(axis=1).to_numpy(dtype=bool)
+
+    def __repr__(self):
+        return f'NoNulo({list(self.columnas)!r})'
+
+
+class Grupo(Filtro):
+    """
+    Filas cuyo grupo (combinación de ``claves``) cumple ``minimo <= agregado
+    <= maximo``. ``agregacion``: 'size' (filas del grupo, por defecto) o
+    'mean', 'sum', 'min', 'max' de ``columna`` (sin contar nulos). Las filas
+    con alguna clave nula no pertenecen a ningún grupo y no pasan.
+    """
+
+    por_grupo = True
+
+    def __init__(self, claves, minimo=None, maximo=None, columna=None, agregacion='size'):
+        if agregacion not in AGREGACIONES:
+            raise ValueError(f"Agregación no soportada: {agregacion}")
+        if agregacion != 'size' and columna is None:
+            raise ValueError(f"La agregación '{agregacion}' necesita una columna")
+        self.claves = _columnas(claves)
+        self.columna = columna
+        self.columnas = self.claves + ((columna,) if columna is not None else ())
+        self.minimo, self.maximo, self.agregacion = minimo, maximo, agregacion
+
+    def _codigos(self, df):
+        """Código entero del grupo de cada fila (-1 si alguna clave es nula) y número de grupos"""
+        codificador = Codificador(df)
+        codigos, dims = [], []
+        for columna in self.claves:
+            c, u = codificador.clave(columna)
+            codigos.append(c)
+            dims.append(max(len(u), 1))
+        validas = np.ones(len(df), dtype=bool)
+        for c in codigos:
+            validas &= c >= 0
+        combinado = np.full(len(df), -1, dtype=np.int64)
+        total = int(np.prod(dims))
+        if total <= 1 << 22:
+            combinado[validas] = np.ravel_multi_index([c[validas] for c in codigos], dims)
+        else:
+            # Muchas combinaciones posibles: se numeran solo las observadas
+            filas = pd.MultiIndex.from_arrays([c[validas] for c in codigos])
+            combinado[validas], unicos = filas.factorize()
+            total = len(unicos)
+        return combinado, total
+
+    def _agregado(self, df, codigos, total, filas):
+        if self.agregacion == 'size':
+            return np.bincount(codigos[filas], minlength=total).astype(np.float64)
+        valores = _numerica(df, self.columna)
+        filas = filas & ~np.isnan(valores)
+        codigos, valores = codigos[filas], valores[filas]
+        if self.agregacion in ('sum', 'mean'):
+            suma = np.bincount(codigos, weights=valores, minlength=total)
+            if self.agregacion == 'sum':
+                return suma
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return suma / np.bincount(codigos, minlength=total)
+        extremo = np.full(total, np.inf if self.agregacion == 'min' else -np.inf)
+        (np.minimum if self.agregacion == 'min' else np.maximum).at(extremo, codigos, valores)
+        extremo[np.isinf(extremo)] = np.nan
+        return extremo
+
+    def _mascara(self, df, base):
+        codigos, total = self._codigos(df)
+        filas = codigos >= 0
+        if base is not None:
+            filas &= base
+        agregado = self._agregado(df, codigos, total, filas)
+        cumple = ~np.isnan(agregado)
+        if self.minimo is not None:
+            cumple &= agregado >= self.minimo
+        if self.maximo is not None:
+            cumple &= agregado <= self.maximo
+        # Una lectura por fila en la tabla de grupos que cumplen
+        return (codigos >= 0) & cumple[np.maximum(codigos, 0)]
+
+    def __repr__(self):
+        medida = self.agregacion if self.columna is None else f'{self.agregacion}({self.columna})'
+        return f'Grupo({list(self.claves)!r}, {medida}, {self.minimo!r}, {self.maximo!r})'
+
+
+# --- Filtros de uso común ---
+
+def desde_anio(anio_minimo=ANIO_MINIMO):
+    """Años de ingreso desde ``anio_minimo``"""
+    return Rango('AÑO INGRESO', minimo=anio_minimo)
+
+
+def edad_valida(edad=(EDAD_MINIMA, EDAD_MAXIMA)):
+    """Edades estrictamente entre los límites"""
+    return Rango('EDAD', *edad, abierto=True)
+
+
+def arancel_positivo():
+    return Rango('VALOR ARANCEL (PESOS)', minimo=0, abierto=True)
+
+
+def carreras_con_minimo(minimo=MINIMO_MATRICULAS_CARRERA, carrera='NOMBRE CARRERA'):
+    """Carreras con al menos ``minimo`` matrículas en el año de ingreso de la fila"""
+    return Grupo(('AÑO INGRESO', carrera), minimo=minimo)
+
+
+def filtro_base(anio_minimo=ANIO_MINIMO, edad=(EDAD_MINIMA, EDAD_MAXIMA), arancel=True):
+    """Los filtros de los análisis por bloques; cada uno se omite si es ``None``/``False``"""
+    filtros = []
+    if anio_minimo is not None:
+        filtros.append(desde_anio(anio_minimo))
+    if edad is not None:
+        filtros.append(edad_valida(edad))
+    if arancel:
+        filtros.append(arancel_positivo())
+    return Y(*filtros)
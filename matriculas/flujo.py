@@ -0,0 +1,188 @@
+"""
+Lectura por bloques para bases que no caben en memoria.
+
+Los archivos (CSV, Excel o Parquet; uno o varios, p. ej. todas las regiones
+y años) se recorren en bloques de a lo sumo ``tamano_bloque`` filas. Cada
+bloque se filtra igual que en los scripts y se entrega a acumuladores
+combinables (``EstadisticasPorGrupo``, ``CuantilesPorGrupo``, ``Cubo``), de
+modo que la memoria usada depende del tamaño del bloque y del número de
+grupos, no del tamaño de la base.
+"""
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from matriculas.cubo import Cubo
+from matriculas.datos import agregar_derivadas
+from matriculas.filtros import ANIO_MINIMO, EDAD_MAXIMA, EDAD_MINIMA, filtro_base
+
+TAMANO_BLOQUE = 100_000
+
+
+def expandir_rutas(rutas):
+    """Acepta una ruta, un patrón glob o una lista de ambos"""
+    if isinstance(rutas, (str, os.PathLike)):
+        rutas = [rutas]
+    resultado = []
+    for ruta in rutas:
+        ruta = os.fspath(ruta)
+        coincidencias = sorted(glob.glob(ruta)) if glob.has_magic(ruta) else [ruta]
+        if not coincidencias:
+            raise FileNotFoundError(f"No hay archivos que coincidan con {ruta}")
+        resultado.extend(coincidencias)
+    return resultado
+
+
+def _bloques_excel(ruta, tamano_bloque, columnas):
+    """Recorre una hoja Excel fila a fila (openpyxl en modo solo lectura)"""
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = [str(c).strip() if c is not None else '' for c in next(filas, ())]
+        if columnas is None:
+            posiciones = list(range(len(encabezado)))
+        else:
+            posiciones = [i for i, c in enumerate(encabezado) if c in columnas]
+        nombres = [encabezado[i] for i in posiciones]
+
+        bloque = []
+        for fila in filas:
+            bloque.append([fila[i] if i < len(fila) else None for i in posiciones])
+            if len(bloque) == tamano_bloque:
+                yield pd.DataFrame(bloque, columns=nombres)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=nombres)
+    finally:
+        libro.close()
+
+
+def _bloques_parquet(ruta, tamano_bloque, columnas):
+    import pyarrow.parquet as pq
+
+    archivo = pq.ParquetFile(ruta)
+    if columnas is not None:
+        columnas = [c for c in archivo.schema_arrow.names if c in columnas]
+    for lote in archivo.iter_batches(batch_size=tamano_bloque, columns=columnas):
+        yield lote.to_pandas()
+
+
+def _bloques_csv(ruta, tamano_bloque, columnas):
+    usecols = (lambda c: c in columnas) if columnas is not None else None
+    yield from pd.read_csv(ruta, chunksize=tamano_bloque, usecols=usecols)
+
+
+def leer_bloques(rutas, tamano_bloque=TAMANO_BLOQUE, columnas=None):
+    """
+    Genera DataFrames de a lo sumo ``tamano_bloque`` filas con el contenido
+    de ``rutas`` (en orden). ``columnas`` limita las columnas leídas.
+    """
+    if columnas is not None:
+        columnas = set(columnas)
+        if 'NOMBRE CARRERA NORMALIZADO' in columnas:
+            columnas.add('NOMBRE CARRERA')
+    for ruta in expandir_rutas(rutas):
+        extension = os.path.splitext(ruta)[1].lower()
+        if extension == '.csv':
+            bloques = _bloques_csv(ruta, tamano_bloque, columnas)
+        elif extension == '.parquet':
+            bloques = _bloques_parquet(ruta, tamano_bloque, columnas)
+        elif extension in ('.xlsx', '.xlsm'):
+            bloques = _bloques_excel(ruta, tamano_bloque, columnas)
+        else:
+            raise ValueError(f"Formato no soportado: {ruta}")
+        for bloque in bloques:
+            if 'NOMBRE CARRERA' in bloque.columns:
+                bloque = agregar_derivadas(bloque)
+            yield bloque
+
+
+def filtrar_bloque(df, anio_minimo=ANIO_MINIMO, edad=(EDAD_MINIMA, EDAD_MAXIMA), arancel_positivo=True):
+    """
+    Aplica los filtros de los análisis a un bloque: años de ingreso desde
+    ``anio_minimo``, edades estrictamente entre los límites de ``edad`` y
+    arancel mayor que cero. Cada filtro se omite si es ``None``/``False`` o
+    si la columna no está en el bloque.
+    """
+    return filtro_base(anio_minimo, edad, arancel_positivo).aplicar(df)
+
+
+class AcumuladorGrupos:
+    """
+    Alimenta un acumulador con ``actualizar(valores, grupos)``
+    (``EstadisticasPorGrupo``, ``CuantilesPorGrupo``) a partir de bloques.
+    Con varias columnas de grupo, cada grupo es la tupla de sus valores.
+    """
+
+    def __init__(self, medida, grupo, acumulador):
+        self.medida = medida
+        self.grupo = [grupo] if isinstance(grupo, str) else list(grupo)
+        self.acumulador = acumulador
+
+    @property
+    def columnas(self):
+        return [self.medida] + self.grupo
+
+    def actualizar(self, bloque):
+        valores = pd.to_numeric(bloque[self.medida], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        if len(self.grupo) == 1:
+            grupos = bloque[self.grupo[0]]
+        else:
+            # Las filas con alguna clave nula quedan fuera, igual que en groupby
+            grupos = pd.Series(list(zip(*(bloque[c] for c in self.grupo))), dtype=object)
+            grupos[bloque[self.grupo].isna().any(axis=1).to_numpy()] = None
+        self.acumulador.actualizar(valores, grupos)
+        return self
+
+
+class AcumuladorCubo:
+    """Construye un cubo por bloque y lo combina con el acumulado"""
+
+    def __init__(self, dimensiones=None, medidas=None, cuantiles=None):
+        self.dimensiones = dimensiones
+        self.medidas = medidas
+        self.cuantiles = cuantiles
+        self.cubo = None
+
+    @property
+    def columnas(self):
+        if self.dimensiones is None or self.medidas is None:
+            return None
+        return list(self.dimensiones) + list(self.medidas)
+
+    def actualizar(self, bloque):
+        parcial = Cubo.construir(bloque, self.dimensiones, self.medidas, self.cuantiles)
+        self.cubo = parcial if self.cubo is None else self.cubo.combinar(parcial)
+        return self
+
+
+def procesar_flujo(rutas, acumuladores, tamano_bloque=TAMANO_BLOQUE, **filtros):
+    """
+    Lee ``rutas`` por bloques, filtra cada bloque con ``filtrar_bloque``
+    (``filtros`` se pasan tal cual) y lo entrega a cada acumulador.
+    ``acumuladores`` es un diccionario ``nombre -> acumulador``; se devuelve
+    el mismo diccionario junto con el número de filas leídas y aceptadas.
+    """
+    columnas = set()
+    for acumulador in acumuladores.values():
+        if acumulador.columnas is None:
+            columnas = None
+            break
+        columnas.update(acumulador.columnas)
+    if columnas is not None:
+        columnas.update(['AÑO INGRESO', 'EDAD', 'VALOR ARANCEL (PESOS)'])
+
+    leidas = aceptadas = 0
+    for bloque in leer_bloques(rutas, tamano_bloque, columnas):
+        leidas += len(bloque)
+        bloque = filtrar_bloque(bloque, **filtros)
+        if bloque.empty:
+            continue
+        aceptadas += len(bloque)
+        for acumulador in acumuladores.values():
+            acumulador.actualizar(bloque)
+    return acumuladores, {'filas_leidas': leidas, 'filas_aceptadas': aceptadas}
@@ -0,0 +1,72 @@
+"""
+Género resuelto una sola vez como máscara booleana.
+
+El patrón ``'FEMENINO|MUJER|F'`` se evalúa sobre los valores distintos de
+la columna ``GENERO`` (un puñado) y no fila a fila; las participaciones
+femeninas por grupo se calculan luego como sumas y medias agrupadas sobre
+la máscara. ``SoloMujeres()`` es la misma máscara como filtro de
+``matriculas.filtros`` (para combinarla o para ``matriculas.ranking``).
+"""
+import numpy as np
+import pandas as pd
+
+from matriculas.filtros import Filtro
+from matriculas.instrumentacion import instrumentar
+
+PATRON_FEMENINO = 'FEMENINO|MUJER|F'
+
+# Nombre de la columna con la máscara dentro del DataFrame
+COLUMNA_MUJER = 'ES MUJER'
+
+
+@instrumentar
+def es_mujer(serie, patron=PATRON_FEMENINO):
+    """
+    Máscara booleana equivalente a
+    ``serie.str.contains(patron, case=False, na=False)``.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    por_valor = pd.Series(unicos, dtype=object).str.contains(patron, case=False, na=False, regex=True)
+    # El último elemento corresponde a los nulos (código -1)
+    por_valor = np.r_[por_valor.to_numpy(dtype=bool), False]
+    return pd.Series(por_valor[codigos], index=serie.index, name=COLUMNA_MUJER)
+
+
+def agregar_mascara_genero(df, columna='GENERO'):
+    """Agrega (o recalcula) la columna ``COLUMNA_MUJER`` a partir de ``columna``"""
+    df[COLUMNA_MUJER] = es_mujer(df[columna])
+    return df
+
+
+def mascara_mujeres(df):
+    """La máscara de ``df`` (calculándola si todavía no existe)"""
+    if COLUMNA_MUJER in df.columns:
+        return df[COLUMNA_MUJER]
+    return es_mujer(df['GENERO'])
+
+
+class SoloMujeres(Filtro):
+    """Registros de mujeres (ver ``mascara_mujeres``)"""
+
+    columnas = ('GENERO',)
+
+    def _mascara(self, df, base):
+        return mascara_mujeres(df).to_numpy(dtype=bool)
+
+    def __repr__(self):
+        return 'SoloMujeres()'
+
+
+def participacion_femenina(df, columnas):
+    """
+    Total de registros con género informado, número de mujeres y porcentaje
+    de mujeres por cada combinación de ``columnas``.
+    """
+    datos = pd.DataFrame({'GENERO': df['GENERO'], COLUMNA_MUJER: mascara_mujeres(df)})
+    claves = [df[c] for c in ([columnas] if isinstance(columnas, str) else columnas)]
+    tabla = datos.groupby(claves, observed=True).agg(
+        Total=('GENERO', 'count'),
+        Mujeres=(COLUMNA_MUJER, 'sum'),
+    )
+    tabla['Porcentaje_Mujeres'] = tabla['Mujeres'] / tabla['Total'] * 100
+    return tabla
@@ -0,0 +1,440 @@
+"""
+Gráficos descritos como datos y dibujados con plantillas por tipo.
+
+Cada gráfico es un ``Grafico(nombre, tipo, datos, opciones)``: ``tipo``
+elige la plantilla (barras, línea, doble eje, mapa de calor, ...), ``datos``
+son los agregados ya calculados y ``opciones`` los títulos, colores, etc.
+
+Hay dos formas de dibujarlos, con la misma interfaz:
+
+* ``GraficosInteractivos``: dibuja en el proceso actual y llama a
+  ``plt.show()`` (el comportamiento de siempre de los scripts).
+* ``RenderizadorParalelo``: modo sin pantalla para corridas en servidores.
+  Usa el backend Agg, no llama a ``plt.show()`` y reparte los gráficos en un
+  pool de procesos que escribe los archivos PNG/SVG. Cada gráfico se
+  identifica por un hash de su contenido; si el archivo ya existe con el
+  mismo hash no se vuelve a dibujar.
+
+``GraficosDiferidos`` solo anota los pedidos, para dibujarlos más tarde en
+otra sesión (análisis que corren en otros procesos).
+
+``sesion_graficos()`` elige el modo: sin pantalla si se pasa un directorio
+o si está definida la variable de entorno ``MATRICULAS_GRAFICOS``.
+"""
+import atexit
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from matriculas.instrumentacion import instrumentar
+from matriculas.texto import normalizar
+
+Grafico = namedtuple('Grafico', ['nombre', 'tipo', 'datos', 'opciones'], defaults=(None,))
+
+VARIABLE_DIRECTORIO = 'MATRICULAS_GRAFICOS'
+VARIABLE_FORMATOS = 'MATRICULAS_FORMATOS_GRAFICOS'
+FORMATOS = ('png',)
+DPI = 100
+
+# Subir este número cuando cambie el aspecto de alguna plantilla
+VERSION_PLANTILLAS = 1
+
+_MANIFIESTO = '.graficos.json'
+
+# Opciones que se aplican al eje o a la figura y no llegan a la plantilla
+_OPCIONES_EJE = ('titulo', 'xlabel', 'ylabel', 'grilla', 'leyenda', 'ylim', 'rotacion_x')
+_OPCIONES_FIGURA = ('tamano', 'titulo_figura', 'leyenda_figura', 'filas', 'columnas', 'dpi', 'paleta')
+
+
+# --- Plantillas: una función por tipo de gráfico, que dibuja sobre ``ax`` ---
+
+def _linea(ax, serie, color=None, marker='o', label=None, marcas_x=False):
+    x = serie.index
+    ax.plot(x, serie.values, marker=marker, color=color, label=label)
+    if marcas_x:
+        ax.set_xticks(x)
+
+
+def _barras(ax, datos, color=None, apilado=False):
+    """Barras de pandas (acepta Series o DataFrame, índices múltiples)"""
+    datos.plot(kind='bar', color=color, stacked=apilado, ax=ax)
+
+
+def _columnas(ax, series, marcas_x=True):
+    """Varias Series como barras sobre el mismo eje x numérico"""
+    posiciones = []
+    for serie, opciones in series:
+        ax.bar(serie.index, serie.values, **opciones)
+        posiciones.extend(serie.index)
+    if marcas_x:
+        ax.set_xticks(sorted(posiciones))
+
+
+def _barras_horizontales(ax, serie, tamano_etiquetas=8):
+    ax.barh(range(len(serie)), serie.values)
+    ax.set_yticks(range(len(serie)), serie.index, fontsize=tamano_etiquetas)
+
+
+def _barras_simples(ax, serie):
+    ax.bar(serie.index, serie.values)
+
+
+def _torta(ax, serie, autopct='%1.1f%%', startangle=0, pctdistance=0.6, labeldistance=1.1):
+    ax.pie(serie.values, labels=serie.index, autopct=autopct, startangle=startangle,
+           pctdistance=pctdistance, labeldistance=labeldistance)
+
+
+def _dispersion(ax, puntos, alpha=0.5):
+    x, y = puntos
+    ax.scatter(x, y, alpha=alpha)
+
+
+def _doble_eje(ax, series, colores=('tab:blue', 'tab:green'),
+               etiquetas=(None, None), ylabels=(None, None), marcadores=('o', 's')):
+    """Dos series con escalas distintas (p. ej. cantidad y porcentaje)"""
+    izquierda, derecha = series
+    ax.set_ylabel(ylabels[0], color=colores[0])
+    ax.plot(izquierda.index, izquierda.values, marker=marcadores[0], color=colores[0], label=etiquetas[0])
+    ax.tick_params(axis='y', labelcolor=colores[0])
+    ax.grid(True, alpha=0.3)
+
+    ax2 = ax.twinx()
+    ax2.set_ylabel(ylabels[1], color=colores[1])
+    ax2.plot(derecha.index, derecha.values, marker=marcadores[1], color=colores[1], label=etiquetas[1])
+    ax2.tick_params(axis='y', labelcolor=colores[1])
+
+
+def _calor(ax, matriz, mascara=None, **opciones):
+    import seaborn as sns
+
+    sns.heatmap(matriz, mask=mascara, ax=ax, **opciones)
+
+
+PLANTILLAS = {
+    'linea': _linea,
+    'barras': _barras,
+    'columnas': _columnas,
+    'barras_horizontales': _barras_horizontales,
+    'barras_simples': _barras_simples,
+    'torta': _torta,
+    'dispersion': _dispersion,
+    'doble_eje': _doble_eje,
+    'calor': _calor,
+}
+
+
+def _dibujar_en_eje(ax, grafico):
+    opciones = dict(grafico.opciones or {})
+    eje = {k: opciones.pop(k) for k in _OPCIONES_EJE if k in opciones}
+    for k in _OPCIONES_FIGURA:
+        opciones.pop(k, None)
+    try:
+        plantilla = PLANTILLAS[grafico.tipo]
+    except KeyError:
+        raise ValueError(f"Tipo de gráfico desconocido: {grafico.tipo}") from None
+    plantilla(ax, grafico.datos, **opciones)
+
+    if 'titulo' in eje:
+        ax.set_title(eje['titulo'])
+    if 'xlabel' in eje:
+        ax.set_xlabel(eje['xlabel'])
+    if 'ylabel' in eje:
+        ax.set_ylabel(eje['ylabel'])
+    if 'rotacion_x' in eje:
+        rotacion, alineacion = eje['rotacion_x']
+        for etiqueta in ax.get_xticklabels():
+            etiqueta.set_rotation(rotacion)
+            etiqueta.set_horizontalalignment(alineacion)
+    if 'ylim' in eje:
+        ax.set_ylim(*eje['ylim'])
+    if eje.get('grilla'):
+        ax.grid(True, alpha=0.3)
+    if eje.get('leyenda'):
+        ax.legend()
+
+
+@instrumentar
+def crear_figura(grafico):
+    """Dibuja ``grafico`` en una figura nueva (sin mostrarla ni guardarla)"""
+    import matplotlib.pyplot as plt
+
+    opciones = grafico.opciones or {}
+    if 'paleta' in opciones:
+        import seaborn as sns
+
+        sns.set_palette(opciones['paleta'])
+    if grafico.tipo == 'panel':
+        # ``datos`` es una lista de gráficos, uno por subgráfico
+        filas, columnas = opciones.get('filas', 1), opciones.get('columnas', len(grafico.datos))
+        fig = plt.figure(figsize=opciones.get('tamano'))
+        for i, subgrafico in enumerate(grafico.datos, 1):
+            _dibujar_en_eje(fig.add_subplot(filas, columnas, i), subgrafico)
+    else:
+        fig, ax = plt.subplots(figsize=opciones.get('tamano'))
+        _dibujar_en_eje(ax, grafico)
+
+    if 'titulo_figura' in opciones:
+        fig.suptitle(opciones['titulo_figura'])
+    fig.tight_layout()
+    if 'leyenda_figura' in opciones:
+        fig.legend(**opciones['leyenda_figura'])
+    return fig
+
+
+def graficos_por_fila(tabla, nombre, tipo, opciones=None):
+    """
+    Un gráfico por fila de ``tabla`` (sin las celdas en 0), para dibujarlos
+    con ``dibujar_todos``. ``{}`` en el título se reemplaza por la etiqueta
+    de la fila y en el ``nombre``, por la etiqueta normalizada
+    (``centros_de_formacion_tecnica``).
+    """
+    opciones = dict(opciones or {})
+    titulo = opciones.pop('titulo', None)
+    lista = []
+    for etiqueta, fila in tabla.iterrows():
+        fila = fila[fila != 0]
+        fila.name = etiqueta
+        propias = dict(opciones, titulo=titulo.format(etiqueta)) if titulo else dict(opciones)
+        lista.append(Grafico(nombre.format(normalizar(etiqueta).replace(' ', '_')), tipo, fila, propias))
+    return lista
+
+
+# --- Hash de contenido ---
+
+def _actualizar_hash(h, objeto):
+    if isinstance(objeto, (pd.Series, pd.DataFrame)):
+        h.update(type(objeto).__name__.encode())
+        h.update(pd.util.hash_pandas_object(objeto, index=True).to_numpy().tobytes())
+        h.update(repr(list(objeto.index.names)).encode())
+        if isinstance(objeto, pd.DataFrame):
+            h.update(repr(list(objeto.columns)).encode())
+            h.update(repr(list(objeto.dtypes.astype(str))).encode())
+        else:
+            h.update(repr((objeto.name, str(objeto.dtype))).encode())
+    elif isinstance(objeto, np.ndarray):
+        h.update(repr((objeto.dtype.str, objeto.shape)).encode())
+        h.update(np.ascontiguousarray(objeto).tobytes())
+    elif isinstance(objeto, Grafico):
+        _actualizar_hash(h, tuple(objeto))
+    elif isinstance(objeto, (list, tuple)):
+        h.update(b'(')
+        for elemento in objeto:
+            _actualizar_hash(h, elemento)
+        h.update(b')')
+    elif isinstance(objeto, dict):
+        h.update(b'{')
+        for clave in sorted(objeto, key=repr):
+            _actualizar_hash(h, clave)
+            _actualizar_hash(h, objeto[clave])
+        h.update(b'}')
+    else:
+        h.update(repr(objeto).encode())
+
+
+def hash_grafico(grafico, formato, dpi):
+    """Identifica el contenido de un gráfico (datos, opciones y formato)"""
+    h = hashlib.sha256()
+    _actualizar_hash(h, (VERSION_PLANTILLAS, formato, dpi, grafico))
+    return h.hexdigest()
+
+
+# --- Modos de dibujo ---
+
+def _guardar_figura(grafico, ruta, dpi):
+    """Dibuja y escribe un archivo (se ejecuta en los procesos del pool)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = crear_figura(grafico)
+    temporal = ruta + '.tmp'
+    try:
+        fig.savefig(temporal, dpi=dpi, bbox_inches='tight', format=os.path.splitext(ruta)[1][1:])
+        os.replace(temporal, ruta)
+    finally:
+        plt.close(fig)
+    return ruta
+
+
+class GraficosInteractivos:
+    """Dibuja cada gráfico en el proceso actual y lo muestra con ``plt.show()``"""
+
+    def dibujar(self, grafico):
+        import matplotlib.pyplot as plt
+
+        crear_figura(grafico)
+        plt.show()
+
+    def dibujar_todos(self, graficos):
+        """Dibuja todas las figuras y las muestra juntas"""
+        import matplotlib.pyplot as plt
+
+        for grafico in graficos:
+            crear_figura(grafico)
+        plt.show()
+
+    def guardar(self, grafico, ruta, dpi=DPI):
+        import matplotlib.pyplot as plt
+
+        fig = crear_figura(grafico)
+        fig.savefig(ruta, dpi=dpi, bbox_inches='tight')
+        plt.close(fig)
+        return ruta
+
+    def cerrar(self):
+        pass
+
+
+class SinGraficos:
+    """Ignora los gráficos (corridas solo de texto)"""
+
+    def dibujar(self, grafico):
+        pass
+
+    def dibujar_todos(self, graficos):
+        pass
+
+    def guardar(self, grafico, ruta, dpi=DPI):
+        return None
+
+    def cerrar(self):
+        pass
+
+
+class GraficosDiferidos:
+    """
+    Anota los gráficos pedidos sin dibujarlos, para reproducirlos después
+    en otra sesión (``reproducir``); la usan los procesos de
+    ``matriculas.paralelo``, que devuelven las anotaciones al proceso
+    principal. ``guardar`` devuelve la ruta que devolvería la sesión final:
+    dentro de ``directorio`` si esta escribe los archivos ahí.
+    """
+
+    def __init__(self, directorio=None):
+        self.directorio = directorio
+        self.pedidos = []
+
+    def dibujar(self, grafico):
+        self.pedidos.append(('dibujar', (grafico,)))
+
+    def dibujar_todos(self, graficos):
+        self.pedidos.append(('dibujar_todos', (list(graficos),)))
+
+    def guardar(self, grafico, ruta, dpi=DPI):
+        self.pedidos.append(('guardar', (grafico, ruta, dpi)))
+        return os.path.join(self.directorio, os.path.basename(ruta)) if self.directorio else ruta
+
+    def cerrar(self):
+        pass
+
+    def reproducir(self, sesion):
+        """Hace los pedidos anotados, en el mismo orden, en ``sesion``"""
+        for metodo, argumentos in self.pedidos:
+            getattr(sesion, metodo)(*argumentos)
+
+
+class RenderizadorParalelo:
+    """
+    Escribe los gráficos en ``directorio`` usando un pool de ``procesos``.
+    ``dibujar`` y ``guardar`` vuelven de inmediato; ``cerrar`` espera a
+    que terminen todos y actualiza el manifiesto de hashes.
+    """
+
+    def __init__(self, directorio, formatos=FORMATOS, procesos=None, dpi=DPI):
+        self.directorio = directorio
+        self.formatos = tuple(formatos)
+        self.procesos = procesos
+        self.dpi = dpi
+        self.dibujados = []
+        self.omitidos = []
+        self._pool = None
+        self._pendientes = {}
+        os.makedirs(directorio, exist_ok=True)
+        self._ruta_manifiesto = os.path.join(directorio, _MANIFIESTO)
+        try:
+            with open(self._ruta_manifiesto, encoding='utf-8') as f:
+                self._manifiesto = json.load(f)
+        except (OSError, ValueError):
+            self._manifiesto = {}
+
+    def _enviar(self, grafico, ruta, dpi):
+        # Dos gráficos con la misma ruta se pisarían en disco y en el manifiesto
+        if ruta in self._pendientes:
+            raise ValueError(f"Ya hay un gráfico pendiente con la ruta {ruta}")
+        nombre = os.path.basename(ruta)
+        clave = hash_grafico(grafico, os.path.splitext(ruta)[1], dpi)
+        if self._manifiesto.get(nombre) == clave and os.path.exists(ruta):
+            self.omitidos.append(ruta)
+            return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos)
+        self._pendientes[ruta] = (clave, self._pool.submit(_guardar_figura, grafico, ruta, dpi))
+
+    @instrumentar
+    def dibujar(self, grafico):
+        for formato in self.formatos:
+            self._enviar(grafico, os.path.join(self.directorio, f'{grafico.nombre}.{formato}'), self.dpi)
+
+    @instrumentar
+    def dibujar_todos(self, graficos):
+        for grafico in graficos:
+            self.dibujar(grafico)
+
+    @instrumentar
+    def guardar(self, grafico, ruta, dpi=DPI):
+        """Como ``dibujar`` pero con nombre de archivo y resolución propios"""
+        ruta = os.path.join(self.directorio, os.path.basename(ruta))
+        self._enviar(grafico, ruta, dpi)
+        return ruta
+
+    @instrumentar
+    def cerrar(self):
+        errores = []
+        for ruta, (clave, futuro) in self._pendientes.items():
+            nombre = os.path.basename(ruta)
+            try:
+                self.dibujados.append(futuro.result())
+                self._manifiesto[nombre] = clave
+            except Exception as e:  # se informa al final, sin detener el resto
+                errores.append(f"{nombre}: {e}")
+        self._pendientes = {}
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+        temporal = self._ruta_manifiesto + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._manifiesto, f, indent=2, sort_keys=True)
+        os.replace(temporal, self._ruta_manifiesto)
+        if errores:
+            raise RuntimeError("No se pudieron dibujar algunos gráficos:\n" + "\n".join(errores))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def sesion_graficos(directorio=None, formatos=None, procesos=None):
+    """
+    Modo sin pantalla si se indica ``directorio`` (o la variable de entorno
+    ``MATRICULAS_GRAFICOS``), interactivo en caso contrario.
+    """
+    directorio = directorio or os.environ.get(VARIABLE_DIRECTORIO)
+    if not directorio:
+        return GraficosInteractivos()
+
+    import matplotlib
+    matplotlib.use('Agg')
+    if formatos is None:
+        formatos = os.environ.get(VARIABLE_FORMATOS, ','.join(FORMATOS)).split(',')
+    renderizador = RenderizadorParalelo(directorio, formatos, procesos)
+    # Por si el script termina sin llamar a cerrar()
+    atexit.register(lambda: renderizador._pendientes and renderizador.cerrar())
+    return renderizador
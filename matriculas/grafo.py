@@ -0,0 +1,181 @@
+"""
+Grafo de cálculo con caché en disco direccionada por contenido.
+
+Cada nodo es una función de los valores de sus entradas. La clave de un nodo
+es el SHA-256 de su nombre, su código, sus parámetros y la *huella* (hash
+del contenido) de cada entrada; el resultado se guarda en disco bajo esa
+clave junto con su propia huella. Así, un nodo se vuelve a calcular solo si
+cambió algo de lo que depende, y si una entrada se recalcula pero da el
+mismo contenido (p. ej. la partición de un año que no cambió), los nodos
+siguientes se reutilizan sin leer su resultado.
+
+Los nodos con ``persistir=False`` (lecturas, filtros, particiones baratas)
+se calculan siempre que se necesitan y su huella se obtiene del valor.
+"""
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from matriculas.datos import DIRECTORIO_CACHE
+
+DIRECTORIO_GRAFO = os.path.join(DIRECTORIO_CACHE, 'grafo')
+
+# funcion(*valores de entradas, **parametros); codigo: objetos adicionales
+# (funciones o módulos) cuyo código fuente forma parte de la clave
+Nodo = namedtuple('Nodo', ['nombre', 'funcion', 'entradas', 'parametros', 'persistir', 'codigo'],
+                  defaults=((), None, True, ()))
+
+
+def _actualizar_hash(h, valor):
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        tipos = valor.dtypes.astype(str).tolist() if isinstance(valor, pd.DataFrame) else str(valor.dtype)
+        nombres = valor.columns.tolist() if isinstance(valor, pd.DataFrame) else valor.name
+        h.update(repr((type(valor).__name__, valor.shape, tipos, nombres,
+                       valor.index.names, str(valor.index.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+    elif isinstance(valor, np.ndarray):
+        h.update(repr((valor.dtype.str, valor.shape)).encode())
+        h.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        h.update(b'dict')
+        for clave in sorted(valor, key=repr):
+            h.update(repr(clave).encode())
+            _actualizar_hash(h, valor[clave])
+    elif isinstance(valor, (list, tuple)) and not hasattr(valor, '_fields'):
+        h.update(type(valor).__name__.encode())
+        for elemento in valor:
+            _actualizar_hash(h, elemento)
+    else:
+        h.update(pickle.dumps(valor, protocol=4))
+
+
+def huella(valor):
+    """Hash SHA-256 del contenido de un valor (DataFrame, Series, arreglo, dict, ...)"""
+    h = hashlib.sha256()
+    _actualizar_hash(h, valor)
+    return h.hexdigest()
+
+
+def _fuente(objeto):
+    try:
+        return inspect.getsource(objeto)
+    except (OSError, TypeError):
+        return getattr(objeto, '__qualname__', repr(objeto))
+
+
+class GrafoCalculo:
+    """
+    Conjunto de nodos que se evalúan bajo demanda con ``valor(nombre)``.
+
+    Los nodos se agregan con ``agregar`` y sus entradas deben existir de
+    antes, de modo que el grafo siempre es acíclico. ``registro`` indica qué
+    nodos persistidos se calcularon y cuáles se reutilizaron de la caché.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_GRAFO):
+        self.directorio = directorio
+        self.nodos = {}
+        self.registro = {'calculados': [], 'reutilizados': []}
+        self._valores = {}
+        self._huellas = {}
+        self._claves = {}
+
+    def agregar(self, nombre, funcion, entradas=(), parametros=None, persistir=True, codigo=()):
+        if nombre in self.nodos:
+            raise ValueError(f"El nodo {nombre} ya existe")
+        faltantes = [e for e in entradas if e not in self.nodos]
+        if faltantes:
+            raise KeyError(f"Entradas desconocidas para {nombre}: {faltantes}")
+        self.nodos[nombre] = Nodo(nombre, funcion, tuple(entradas), parametros or {}, persistir, tuple(codigo))
+        return self
+
+    # --- Caché en disco ---
+
+    def _rutas(self, clave):
+        carpeta = os.path.join(self.directorio, clave[:2])
+        return os.path.join(carpeta, clave + '.pkl'), os.path.join(carpeta, clave + '.json')
+
+    def _leer_huella(self, clave):
+        try:
+            with open(self._rutas(clave)[1], encoding='utf-8') as f:
+                return json.load(f)['huella']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _leer_valor(self, clave):
+        try:
+            with open(self._rutas(clave)[0], 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _guardar(self, clave, nombre, valor, huella_valor):
+        ruta_valor, ruta_meta = self._rutas(clave)
+        os.makedirs(os.path.dirname(ruta_valor), exist_ok=True)
+        with open(ruta_valor + '.tmp', 'wb') as f:
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(ruta_valor + '.tmp', ruta_valor)
+        # El archivo de huella se escribe al final: si existe, el valor está completo
+        with open(ruta_meta + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'nodo': nombre, 'huella': huella_valor}, f)
+        os.replace(ruta_meta + '.tmp', ruta_meta)
+
+    # --- Evaluación ---
+
+    def clave(self, nombre):
+        """Clave de caché del nodo (depende de las huellas de sus entradas)"""
+        if nombre not in self._claves:
+            nodo = self.nodos[nombre]
+            partes = [
+                nombre,
+                [_fuente(objeto) for objeto in (nodo.funcion,) + nodo.codigo],
+                json.dumps(nodo.parametros, sort_keys=True, default=repr),
+                [self.huella(e) for e in nodo.entradas],
+            ]
+            self._claves[nombre] = hashlib.sha256(json.dumps(partes).encode()).hexdigest()
+        return self._claves[nombre]
+
+    def huella(self, nombre):
+        """Huella del contenido del nodo, sin leer su valor si ya está en caché"""
+        if nombre not in self._huellas:
+            nodo = self.nodos[nombre]
+            guardada = self._leer_huella(self.clave(nombre)) if nodo.persistir else None
+            if guardada is not None:
+                self._huellas[nombre] = guardada
+            else:
+                self._huellas[nombre] = huella(self.valor(nombre))
+        return self._huellas[nombre]
+
+    def valor(self, nombre):
+        """Valor del nodo: desde memoria, desde la caché en disco o calculado"""
+        if nombre in self._valores:
+            return self._valores[nombre]
+        nodo = self.nodos[nombre]
+        if nodo.persistir:
+            clave = self.clave(nombre)
+            huella_guardada = self._leer_huella(clave)
+            if huella_guardada is not None:
+                valor = self._leer_valor(clave)
+                if valor is not None:
+                    self.registro['reutilizados'].append(nombre)
+                    self._valores[nombre] = valor
+                    self._huellas[nombre] = huella_guardada
+                    return valor
+
+        valor = nodo.funcion(*(self.valor(e) for e in nodo.entradas), **nodo.parametros)
+        self._valores[nombre] = valor
+        if nodo.persistir:
+            self._huellas[nombre] = huella(valor)
+            self._guardar(self.clave(nombre), nombre, valor, self._huellas[nombre])
+            self.registro['calculados'].append(nombre)
+        return valor
+
+    def calcular(self, nombres):
+        """Diccionario ``nombre -> valor`` de los nodos pedidos"""
+        return {nombre: self.valor(nombre) for nombre in nombres}
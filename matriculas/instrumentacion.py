@@ -0,0 +1,229 @@
+"""
+Instrumentación liviana de las etapas de los análisis.
+
+``etapa(nombre)`` (administrador de contexto) e ``instrumentar`` (decorador)
+registran por cada etapa el tiempo real, el tiempo de CPU, las filas de
+entrada y salida y la variación de memoria residente (RSS). Las etapas
+anidadas guardan la ruta completa (``carga;normalizar``), de modo que la
+traza se puede ver como gráfico de llamas.
+
+El costo es de unos 10 µs por etapa y las etapas instrumentadas recorren
+la base completa (milisegundos o más), por lo que la instrumentación queda
+activa siempre. Con ``MATRICULAS_INSTRUMENTACION=0`` se desactiva.
+Si ``MATRICULAS_TRAZA`` apunta a un archivo, la traza se escribe al
+terminar el proceso: formato Chrome/Perfetto (``.json``) o pilas plegadas
+para flamegraph.pl/speedscope (``.folded`` o ``.txt``).
+"""
+import atexit
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+ACTIVA = os.environ.get('MATRICULAS_INSTRUMENTACION', '1') != '0'
+VARIABLE_TRAZA = 'MATRICULAS_TRAZA'
+
+# Se guardan a lo sumo estas etapas (las más recientes)
+MAX_ETAPAS = 100_000
+
+_ORIGEN_NS = time.perf_counter_ns()
+_etapas = deque(maxlen=MAX_ETAPAS)
+_ruta_actual = contextvars.ContextVar('ruta_etapa', default=())
+
+# En Linux el RSS actual se lee de /proc/self/statm con un descriptor que
+# queda abierto (pread cuesta ~2 µs; abrir el archivo cada vez, ~13 µs)
+try:
+    _STATM = os.open('/proc/self/statm', os.O_RDONLY)
+    _TAMANO_PAGINA = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _STATM = None
+
+
+def _memoria():
+    """RSS actual en bytes (Linux); en otros sistemas, el máximo del proceso"""
+    if _STATM is not None:
+        return int(os.pread(_STATM, 128, 0).split()[1]) * _TAMANO_PAGINA
+    import resource
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _filas(objeto):
+    if isinstance(objeto, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(objeto)
+    return None
+
+
+class Etapa:
+    """
+    Registro de una etapa (los tiempos en nanosegundos). Se usa como
+    administrador de contexto a través de ``etapa``.
+    """
+
+    __slots__ = ('nombre', 'ruta', 'inicio', 'duracion', 'cpu', 'filas_entrada', 'filas_salida',
+                 'memoria_delta', 'proceso', 'hilo', '_token')
+
+    def __init__(self, nombre, filas_entrada=None):
+        self.nombre = nombre
+        self.ruta = (nombre,)
+        self.filas_entrada = filas_entrada
+        self.filas_salida = None
+        self.inicio = self.duracion = self.cpu = self.memoria_delta = 0
+        self.proceso = self.hilo = self._token = None
+
+    def __enter__(self):
+        if ACTIVA:
+            self.ruta = _ruta_actual.get() + (self.nombre,)
+            self._token = _ruta_actual.set(self.ruta)
+            self.proceso = os.getpid()
+            self.hilo = threading.get_ident()
+            self.memoria_delta = _memoria()
+            self.cpu = time.process_time_ns()
+            self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if ACTIVA:
+            self.duracion = time.perf_counter_ns() - self.inicio
+            self.cpu = time.process_time_ns() - self.cpu
+            self.memoria_delta = _memoria() - self.memoria_delta
+            _ruta_actual.reset(self._token)
+            self._token = None
+            _etapas.append(self)
+        return False
+
+    def como_dict(self):
+        return {
+            'etapa': self.nombre,
+            'ruta': ';'.join(self.ruta),
+            'segundos': self.duracion / 1e9,
+            'cpu_segundos': self.cpu / 1e9,
+            'filas_entrada': self.filas_entrada,
+            'filas_salida': self.filas_salida,
+            'memoria_delta_mb': self.memoria_delta / 1e6,
+        }
+
+
+def etapa(nombre, filas=None):
+    """
+    Mide un bloque ``with`` como una etapa. ``filas`` son las filas de
+    entrada; las de salida se pueden indicar con
+    ``registro.filas_salida = ...``.
+    """
+    return Etapa(nombre, filas)
+
+
+def instrumentar(funcion=None, nombre=None):
+    """
+    Decorador que mide cada llamada como una etapa. Las filas de entrada son
+    las del primer argumento tabular (DataFrame, Series o arreglo) y las de
+    salida las del resultado, si es tabular.
+    """
+    if funcion is None:
+        return functools.partial(instrumentar, nombre=nombre)
+    if nombre is None:
+        modulo = funcion.__module__.removeprefix('matriculas.')
+        nombre = f"{modulo}.{funcion.__qualname__}"
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not ACTIVA:
+            return funcion(*args, **kwargs)
+        filas = next((n for n in map(_filas, args) if n is not None), None)
+        with etapa(nombre, filas) as registro:
+            resultado = funcion(*args, **kwargs)
+            registro.filas_salida = _filas(resultado)
+        return resultado
+
+    return envoltura
+
+
+def etapas():
+    """Las etapas registradas, en orden de término"""
+    return list(_etapas)
+
+
+def limpiar():
+    _etapas.clear()
+
+
+def incorporar(registros):
+    """
+    Agrega etapas medidas en otro proceso (p. ej. los trabajadores de
+    ``matriculas.paralelo``). Los tiempos son comparables porque
+    ``perf_counter`` usa el reloj monótono del sistema.
+    """
+    _etapas.extend(registros)
+
+
+def resumen():
+    """Totales por etapa: llamadas, tiempo real y de CPU, filas y memoria"""
+    tabla = pd.DataFrame([e.como_dict() for e in _etapas],
+                         columns=['etapa', 'ruta', 'segundos', 'cpu_segundos', 'filas_entrada',
+                                  'filas_salida', 'memoria_delta_mb'])
+    grupos = tabla.groupby('etapa', sort=False)
+    return pd.DataFrame({
+        'llamadas': grupos.size(),
+        'segundos': grupos['segundos'].sum(),
+        'cpu_segundos': grupos['cpu_segundos'].sum(),
+        # NaN si la etapa no recibe o no devuelve una tabla
+        'filas_entrada': grupos['filas_entrada'].sum(min_count=1),
+        'filas_salida': grupos['filas_salida'].sum(min_count=1),
+        'memoria_delta_mb': grupos['memoria_delta_mb'].sum(),
+    }).sort_values('segundos', ascending=False)
+
+
+def traza_chrome():
+    """Eventos en el formato de trazas de Chrome (chrome://tracing, Perfetto, speedscope)"""
+    pid = os.getpid()
+    eventos = []
+    for e in _etapas:
+        argumentos = e.como_dict()
+        eventos.append({
+            'name': e.nombre,
+            'cat': 'matriculas',
+            'ph': 'X',
+            'ts': (e.inicio - _ORIGEN_NS) / 1000,
+            'dur': e.duracion / 1000,
+            'pid': e.proceso or pid,
+            'tid': e.hilo,
+            'args': {k: v for k, v in argumentos.items() if k not in ('etapa', 'segundos')},
+        })
+    eventos.sort(key=lambda ev: ev['ts'])
+    return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+
+def pilas_plegadas():
+    """
+    Líneas ``a;b;c microsegundos`` con el tiempo propio de cada ruta (sin
+    sus etapas hijas), el formato de flamegraph.pl.
+    """
+    total = {}
+    for e in _etapas:
+        total[e.ruta] = total.get(e.ruta, 0) + e.duracion
+    propio = dict(total)
+    for ruta, duracion in total.items():
+        if len(ruta) > 1 and ruta[:-1] in propio:
+            propio[ruta[:-1]] -= duracion
+    return [f"{';'.join(ruta)} {max(duracion, 0) // 1000}" for ruta, duracion in propio.items()]
+
+
+def exportar(ruta):
+    """Escribe la traza en ``ruta`` (pilas plegadas si termina en .folded o .txt)"""
+    with open(ruta, 'w', encoding='utf-8') as f:
+        if ruta.endswith(('.folded', '.txt')):
+            f.write('\n'.join(pilas_plegadas()) + '\n')
+        else:
+            json.dump(traza_chrome(), f)
+
+
+if ACTIVA and os.environ.get(VARIABLE_TRAZA):
+    atexit.register(exportar, os.environ[VARIABLE_TRAZA])
@@ -0,0 +1,205 @@
+"""
+Ejecución de análisis independientes en varios procesos.
+
+La base se carga una sola vez en el proceso principal y se copia a un
+bloque de memoria compartida (``multiprocessing.shared_memory``): cada
+columna numérica es un arreglo de numpy dentro del bloque y cada columna
+categórica, sus códigos más las categorías (pocas, viajan en el
+descriptor). Cada proceso del pool arma al iniciar un DataFrame de solo
+lectura sobre esos arreglos, sin copiarlos ni recibir la base serializada;
+las tareas envían solo el nombre del análisis y el número de parte.
+
+Cada tarea es una parte de un análisis (ver ``matriculas.analisis.PARTES``:
+p. ej. cada cruce de ``cruces`` o cada paso de ``genero``), de modo que un
+análisis largo no limita el tiempo total. Cada parte corre con su salida de
+consola capturada y una sesión ``GraficosDiferidos``; el proceso principal
+imprime las salidas y dibuja los gráficos en el orden pedido (el mismo que
+sin procesos), a medida que las partes terminan. Las etapas medidas en los procesos se agregan a la
+instrumentación del proceso principal.
+"""
+import contextlib
+import io
+import os
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from matriculas import instrumentacion
+from matriculas.instrumentacion import instrumentar
+
+# Alineación de cada columna dentro del bloque compartido
+_ALINEACION = 64
+
+# tipo: 'numpy' (valores en el bloque), 'categoria' (códigos en el bloque y
+# ``extra`` = CategoricalDtype) u 'objeto' (la columna completa en ``extra``)
+_Columna = namedtuple('_Columna', ['nombre', 'tipo', 'dtype', 'inicio', 'extra'])
+
+# Lo que necesita un proceso para armar la base: nombre del bloque, filas,
+# columnas e índice (None si es un RangeIndex desde 0)
+Descriptor = namedtuple('Descriptor', ['bloque', 'filas', 'columnas', 'indice'])
+
+# Lo que devuelve cada parte de un análisis: salida de consola, GraficosDiferidos (None
+# si no se piden gráficos), etapas medidas, segundos y el error (texto del traceback) si falló
+Resultado = namedtuple('Resultado', ['nombre', 'parte', 'salida', 'graficos', 'etapas', 'segundos', 'error'])
+
+
+def _arreglo(serie):
+    """Arreglo de numpy de la columna y su tipo de guardado, o None si no se puede compartir"""
+    dtype = serie.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return serie.array.codes, 'categoria'
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        return serie.to_numpy(), 'numpy'
+    return None, 'objeto'
+
+
+def _abrir(nombre):
+    """Se conecta a un bloque existente sin registrarlo para borrarlo"""
+    try:
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    except TypeError:
+        # Python < 3.13: se registra en el resource_tracker, que los procesos
+        # del pool comparten con el principal; ahí ya está registrado y lo
+        # borra el principal con ``cerrar``
+        return shared_memory.SharedMemory(name=nombre)
+
+
+class BaseCompartida:
+    """
+    Copia ``df`` a un bloque de memoria compartida. ``descriptor`` es lo
+    que se envía a los procesos; ``abrir(descriptor)`` arma la base en
+    ellos. ``cerrar()`` (o salir del ``with``) libera el bloque.
+
+    Las columnas que no son numpy ni categóricas (texto, enteros con
+    nulos) no se pueden compartir así y viajan copiadas en el descriptor.
+    """
+
+    def __init__(self, df):
+        columnas, arreglos, tamano = [], [], 0
+        for nombre in df.columns:
+            arreglo, tipo = _arreglo(df[nombre])
+            if arreglo is None:
+                columnas.append(_Columna(nombre, tipo, None, None, df[nombre]))
+                continue
+            tamano = -(-tamano // _ALINEACION) * _ALINEACION
+            extra = df[nombre].dtype if tipo == 'categoria' else None
+            columnas.append(_Columna(nombre, tipo, arreglo.dtype.str, tamano, extra))
+            arreglos.append((tamano, arreglo))
+            tamano += arreglo.nbytes
+
+        self._bloque = shared_memory.SharedMemory(create=True, size=max(tamano, 1))
+        for inicio, arreglo in arreglos:
+            destino = np.ndarray(arreglo.shape, arreglo.dtype, buffer=self._bloque.buf, offset=inicio)
+            destino[:] = arreglo
+            del destino
+        indice = None if df.index.equals(pd.RangeIndex(len(df))) else df.index
+        self.descriptor = Descriptor(self._bloque.name, len(df), columnas, indice)
+
+    @staticmethod
+    def abrir(descriptor):
+        """(bloque, DataFrame de solo lectura sobre el bloque); el bloque debe seguir abierto mientras se use"""
+        bloque = _abrir(descriptor.bloque)
+        datos = {}
+        for columna in descriptor.columnas:
+            if columna.tipo == 'objeto':
+                datos[columna.nombre] = columna.extra
+                continue
+            arreglo = np.ndarray((descriptor.filas,), np.dtype(columna.dtype), buffer=bloque.buf,
+                                 offset=columna.inicio)
+            arreglo.flags.writeable = False
+            if columna.tipo == 'categoria':
+                arreglo = pd.Categorical.from_codes(arreglo, dtype=columna.extra, validate=False)
+            datos[columna.nombre] = arreglo
+        indice = descriptor.indice if descriptor.indice is not None else pd.RangeIndex(descriptor.filas)
+        return bloque, pd.DataFrame(datos, index=indice, copy=False)
+
+    def cerrar(self):
+        if self._bloque is not None:
+            self._bloque.close()
+            self._bloque.unlink()
+            self._bloque = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# Base de cada proceso del pool (se arma una vez, en el inicializador)
+_base = None
+
+
+def iniciar_proceso(descriptor):
+    """Inicializador de los procesos del pool: abre la base compartida ``descriptor``"""
+    global _base
+    _base = BaseCompartida.abrir(descriptor)
+
+
+def base_del_proceso():
+    """DataFrame de la base compartida de este proceso (None fuera de un pool)"""
+    return None if _base is None else _base[1]
+
+
+def _ejecutar(nombre, parte, con_graficos, directorio):
+    from matriculas.analisis import partes
+    from matriculas.graficos import GraficosDiferidos, SinGraficos
+
+    instrumentacion.limpiar()
+    graficos = GraficosDiferidos(directorio) if con_graficos else SinGraficos()
+    salida = io.StringIO()
+    error = None
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(salida):
+        try:
+            with instrumentacion.etapa(f'paralelo.{nombre}', len(_base[1])):
+                partes(nombre)[parte](_base[1], graficos)
+        except Exception:  # se informa en el proceso principal
+            error = traceback.format_exc()
+    return Resultado(nombre, parte, salida.getvalue(), graficos if con_graficos else None, instrumentacion.etapas(),
+                     time.perf_counter() - inicio, error)
+
+
+@instrumentar
+def ejecutar_en_paralelo(nombres, datos, graficos=None, procesos=None):
+    """
+    Corre las partes de los análisis ``nombres`` sobre ``datos`` (DataFrame)
+    en un pool de ``procesos`` (por defecto, uno por núcleo y no más que
+    partes). Imprime las salidas y reproduce los gráficos en ``graficos`` en
+    el orden de ``nombres`` y de sus partes. Si alguna parte falla, las demás
+    terminan igual y al final se lanza ``RuntimeError`` con los errores.
+    Devuelve los ``Resultado`` de cada parte en el mismo orden.
+
+    No admite las versiones incrementales: varios procesos escribirían a la
+    vez los mismos resultados intermedios en disco.
+    """
+    from matriculas.analisis import partes
+    from matriculas.graficos import SinGraficos
+
+    tareas = [(nombre, parte) for nombre in nombres for parte in range(len(partes(nombre)))]
+    graficos = graficos or SinGraficos()
+    # Sin gráficos, los procesos tampoco los anotan
+    con_graficos = not isinstance(graficos, SinGraficos)
+    directorio = getattr(graficos, 'directorio', None)
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+    resultados = []
+    with BaseCompartida(datos) as base, ProcessPoolExecutor(
+            max_workers=max(procesos, 1), initializer=iniciar_proceso, initargs=(base.descriptor,)) as pool:
+        futuros = [pool.submit(_ejecutar, nombre, parte, con_graficos, directorio) for nombre, parte in tareas]
+        for futuro in futuros:
+            resultado = futuro.result()
+            print(resultado.salida, end='')
+            if resultado.graficos is not None:
+                resultado.graficos.reproducir(graficos)
+            instrumentacion.incorporar(resultado.etapas)
+            resultados.append(resultado)
+
+    errores = [f"{r.nombre} (parte {r.parte + 1}):\n{r.error}" for r in resultados if r.error]
+    if errores:
+        raise RuntimeError("Fallaron algunos análisis:\n" + "\n".join(errores))
+    return resultados
@@ -0,0 +1,285 @@
+"""
+Base de matrículas particionada por región de la sede y año de ingreso.
+
+Cada fuente (un archivo por región y año de proceso, como
+``matriculas_ed_superior_nuble_2021.xlsx``) se divide en un archivo
+Parquet por combinación de ``CLAVES``::
+
+    data/.cache/particiones/
+        _particiones.json
+        region_sede=nuble/anio_ingreso=2019/matriculas_ed_superior_nuble_2021.parquet
+        region_sede=nuble/anio_ingreso=2020/...
+
+``_particiones.json`` guarda los valores de las claves, las filas y el
+tamaño de cada archivo, y la fecha, tamaño y hash de cada fuente: al
+agregar o cambiar una fuente solo se reescriben sus archivos.
+``agregar_base`` particiona un DataFrame ya cargado.
+
+``cargar_particiones(filtro)`` recibe un filtro de ``matriculas.filtros``,
+lo evalúa sobre la tabla de particiones (no sobre los datos) y lee solo
+los archivos que pueden tener filas que lo cumplan; después aplica el
+filtro a las filas leídas si hace falta. Las filas quedan ordenadas por
+partición y, dentro de cada una, en el orden de su fuente.
+"""
+import os
+
+import pandas as pd
+
+from matriculas.datos import (DIRECTORIO_CACHE, RUTA_EXCEL, cargar_matriculas, escribir_meta, guardar_cache,
+                              hash_archivo, leer_meta, pyarrow)
+from matriculas.flujo import expandir_rutas
+from matriculas.instrumentacion import etapa, instrumentar
+from matriculas.texto import normalizar
+
+DIRECTORIO_PARTICIONES = os.path.join(DIRECTORIO_CACHE, 'particiones')
+CLAVES = ('REGION SEDE', 'AÑO INGRESO')
+
+# Subir este número cuando cambie la forma de guardar las particiones
+VERSION_PARTICIONES = 1
+
+MANIFIESTO = '_particiones.json'
+_NULO = '__nulo__'
+# Columnas de la tabla de particiones que no son claves
+CAMPOS = ['fuente', 'ruta', 'filas', 'bytes']
+
+
+def _nombre(valor):
+    """Nombre de carpeta de una clave o un valor: ``REGION SEDE`` -> ``region_sede``"""
+    if valor is None:
+        return _NULO
+    return normalizar(str(valor)).replace(' ', '_').replace('/', '_') or _NULO
+
+
+def _valor_json(valor):
+    if pd.isna(valor):
+        return None
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+def _manifiesto_vacio(claves):
+    return {'version': VERSION_PARTICIONES, 'claves': list(claves), 'fuentes': {}, 'partes': []}
+
+
+def _leer_manifiesto(directorio, claves=None):
+    manifiesto = leer_meta(os.path.join(directorio, MANIFIESTO))
+    if manifiesto is None or manifiesto.get('version') != VERSION_PARTICIONES:
+        return None
+    if claves is not None and manifiesto.get('claves') != list(claves):
+        return None
+    return manifiesto
+
+
+def _fuente_vigente(ruta, meta):
+    """Igual que la caché de ``matriculas.datos``: fecha y tamaño, y si no coinciden, el hash"""
+    if meta is None:
+        return False
+    info = os.stat(ruta)
+    if meta.get('mtime_ns') == info.st_mtime_ns and meta.get('tamano') == info.st_size:
+        return True
+    if meta.get('tamano') != info.st_size or meta.get('sha256') != hash_archivo(ruta):
+        return False
+    meta['mtime_ns'] = info.st_mtime_ns
+    return True
+
+
+def _borrar_partes(directorio, partes):
+    for parte in partes:
+        try:
+            os.remove(os.path.join(directorio, parte['ruta']))
+        except FileNotFoundError:
+            pass
+
+
+def _escribir_fuente(df, fuente, directorio, claves):
+    """Escribe un archivo por partición de ``df`` y devuelve sus entradas del manifiesto"""
+    extension = '.parquet' if pyarrow is not None else '.pkl'
+    partes = []
+    for valores, grupo in df.groupby(list(claves), observed=True, sort=True, dropna=False):
+        valores = [_valor_json(v) for v in valores]
+        carpeta = os.path.join(*(f'{_nombre(c)}={_nombre(v)}' for c, v in zip(claves, valores)))
+        ruta = os.path.join(carpeta, fuente + extension)
+        os.makedirs(os.path.join(directorio, carpeta), exist_ok=True)
+        guardar_cache(grupo, os.path.join(directorio, ruta))
+        partes.append({'fuente': fuente, 'valores': valores, 'ruta': ruta, 'filas': len(grupo),
+                       'bytes': os.path.getsize(os.path.join(directorio, ruta))})
+    return partes
+
+
+def _abrir_manifiesto(directorio, claves):
+    """El manifiesto de ``directorio``; si no hay o es de otra versión o claves, uno vacío (y se borra lo anterior)"""
+    os.makedirs(directorio, exist_ok=True)
+    manifiesto = _leer_manifiesto(directorio, claves)
+    if manifiesto is None:
+        anterior = leer_meta(os.path.join(directorio, MANIFIESTO))
+        if anterior:
+            _borrar_partes(directorio, anterior.get('partes', []))
+        manifiesto = _manifiesto_vacio(claves)
+    return manifiesto
+
+
+def _reemplazar_fuente(manifiesto, df, fuente, directorio):
+    claves = tuple(manifiesto['claves'])
+    faltan = [c for c in claves if c not in df.columns]
+    if faltan:
+        raise KeyError(f"La fuente {fuente} no tiene las columnas de partición {faltan}")
+    with etapa('particiones.escribir', len(df)):
+        _borrar_partes(directorio, [p for p in manifiesto['partes'] if p['fuente'] == fuente])
+        manifiesto['partes'] = [p for p in manifiesto['partes'] if p['fuente'] != fuente]
+        manifiesto['partes'].extend(_escribir_fuente(df, fuente, directorio, claves))
+
+
+def _guardar_manifiesto(manifiesto, directorio):
+    manifiesto['partes'].sort(key=lambda p: (['' if v is None else str(v) for v in p['valores']], p['fuente']))
+    escribir_meta(os.path.join(directorio, MANIFIESTO), manifiesto)
+
+
+@instrumentar
+def agregar_base(df, fuente, directorio=DIRECTORIO_PARTICIONES, claves=CLAVES):
+    """
+    Agrega (o reemplaza) las particiones de un DataFrame ya cargado con el
+    nombre ``fuente``, sin registrar un archivo de origen.
+    """
+    manifiesto = _abrir_manifiesto(directorio, tuple(claves))
+    _reemplazar_fuente(manifiesto, df, fuente, directorio)
+    manifiesto['fuentes'][fuente] = None
+    _guardar_manifiesto(manifiesto, directorio)
+    return manifiesto
+
+
+@instrumentar
+def construir_particiones(rutas=RUTA_EXCEL, directorio=DIRECTORIO_PARTICIONES, claves=CLAVES, forzar=False):
+    """
+    Agrega las fuentes ``rutas`` (ruta, patrón glob o lista) a la base
+    particionada. Las fuentes que no cambiaron desde la última vez se
+    omiten (salvo con ``forzar``); las que cambiaron se reescriben completas.
+    Devuelve el manifiesto.
+    """
+    manifiesto = _abrir_manifiesto(directorio, tuple(claves))
+    cambios = not os.path.exists(os.path.join(directorio, MANIFIESTO))
+    for ruta in expandir_rutas(rutas):
+        fuente = os.path.splitext(os.path.basename(ruta))[0]
+        meta = manifiesto['fuentes'].get(fuente)
+        if not forzar and meta is not None and meta.get('fuente') == os.path.abspath(ruta) \
+                and _fuente_vigente(ruta, meta):
+            continue
+        _reemplazar_fuente(manifiesto, cargar_matriculas(ruta), fuente, directorio)
+        info = os.stat(ruta)
+        manifiesto['fuentes'][fuente] = {
+            'fuente': os.path.abspath(ruta),
+            'mtime_ns': info.st_mtime_ns,
+            'tamano': info.st_size,
+            'sha256': hash_archivo(ruta),
+        }
+        cambios = True
+    if cambios:
+        _guardar_manifiesto(manifiesto, directorio)
+    return manifiesto
+
+
+def particiones(directorio=DIRECTORIO_PARTICIONES):
+    """Una fila por archivo: valores de las claves, fuente, ruta, filas y bytes"""
+    manifiesto = _leer_manifiesto(directorio)
+    if manifiesto is None:
+        raise FileNotFoundError(f"No hay una base particionada en {directorio} (ver construir_particiones)")
+    claves = manifiesto['claves']
+    tabla = pd.DataFrame([p['valores'] + [p['fuente'], p['ruta'], p['filas'], p['bytes']]
+                          for p in manifiesto['partes']],
+                         columns=claves + CAMPOS)
+    for clave in claves:
+        tabla[clave] = tabla[clave].infer_objects()
+    return tabla
+
+
+def _leer_parte(ruta, columnas=None):
+    if ruta.endswith('.parquet'):
+        return pd.read_parquet(ruta, columns=columnas, memory_map=True)
+    df = pd.read_pickle(ruta)
+    return df if columnas is None else df[columnas]
+
+
+def _ordenar_categorias(df):
+    """Deja ordenadas las categorías (como las deja el esquema) tras unir fuentes distintas"""
+    for columna in df.columns:
+        if isinstance(df[columna].dtype, pd.CategoricalDtype):
+            categorias = df[columna].cat.categories
+            if not categorias.is_monotonic_increasing:
+                df[columna] = df[columna].cat.reorder_categories(categorias.sort_values())
+    return df
+
+
+def _leer_partes(rutas, columnas=None):
+    """
+    Une las particiones. Con Parquet se leen como tablas de Arrow y se
+    convierten a pandas una sola vez; si las categorías de una columna
+    cambian entre fuentes, quedan la unión ordenada.
+    """
+    if pyarrow is not None and all(r.endswith('.parquet') for r in rutas):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tablas = [pq.read_table(r, columns=columnas, memory_map=True) for r in rutas]
+        if all(t.schema.equals(tablas[0].schema) for t in tablas[1:]):
+            tabla = pa.concat_tables(tablas)
+        else:
+            tabla = pa.concat_tables(tablas, promote_options='permissive')
+        return _ordenar_categorias(tabla.to_pandas())
+
+    partes = [_leer_parte(r, columnas) for r in rutas]
+    if len(partes) == 1:
+        return partes[0]
+    for columna in partes[0].columns:
+        tipos = [p[columna].dtype for p in partes]
+        if isinstance(tipos[0], pd.CategoricalDtype) and any(t != tipos[0] for t in tipos[1:]):
+            categorias = tipos[0].categories
+            for tipo in tipos[1:]:
+                categorias = categorias.union(tipo.categories)
+            for parte in partes:
+                parte[columna] = parte[columna].cat.set_categories(categorias)
+    return pd.concat(partes, ignore_index=True)
+
+
+def _columnas_filtro(filtro):
+    """Todas las columnas que usa un filtro, incluidos los combinados"""
+    propias = list(filtro.columnas)
+    for hijo in getattr(filtro, 'filtros', ()):
+        propias.extend(_columnas_filtro(hijo))
+    if hasattr(filtro, 'filtro'):
+        propias.extend(_columnas_filtro(filtro.filtro))
+    return propias
+
+
+@instrumentar
+def cargar_particiones(filtro=None, columnas=None, rutas=RUTA_EXCEL, directorio=DIRECTORIO_PARTICIONES):
+    """
+    Carga las filas que cumplen ``filtro`` (``matriculas.filtros``) leyendo
+    solo las particiones que pueden tenerlas; ``columnas`` limita las
+    columnas leídas. Antes actualiza la base particionada con ``rutas``
+    (ver ``construir_particiones``); con ``rutas=None`` usa la que haya.
+    """
+    if rutas is not None:
+        construir_particiones(rutas, directorio)
+    todas = particiones(directorio)
+    tabla, exacta = todas, True
+    if filtro is not None:
+        mascara, exacta = filtro.particiones(todas.drop(columns=CAMPOS))
+        tabla = todas[mascara]
+
+    leidas = columnas
+    if columnas is not None and filtro is not None and not exacta:
+        # Las columnas que usa el filtro hacen falta para aplicarlo
+        leidas = list(dict.fromkeys(list(columnas) + _columnas_filtro(filtro)))
+    rutas_partes = [os.path.join(directorio, r) for r in tabla['ruta']]
+    if not rutas_partes:
+        # Ninguna partición: una tabla vacía con las columnas y tipos de la base
+        if todas.empty:
+            return pd.DataFrame(columns=columnas)
+        return _leer_parte(os.path.join(directorio, todas['ruta'].iloc[0]), columnas).iloc[:0]
+
+    with etapa('particiones.leer', len(rutas_partes)) as registro:
+        df = _leer_partes(rutas_partes, leidas)
+        registro.filas_salida = len(df)
+    if filtro is not None and not exacta:
+        df = filtro.aplicar(df).reset_index(drop=True)
+        if columnas is not None:
+            df = df[list(columnas)]
+    return df
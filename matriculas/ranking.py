@@ -0,0 +1,166 @@
+"""
+Los k mayores (o menores) valores sin ordenar la tabla completa, y una
+caché de los agregados por clave para que el informe de consola y los
+gráficos compartan un solo cálculo.
+
+``indices_mayores`` separa con ``np.argpartition`` los candidatos (los k
+primeros y los empatados con el k-ésimo) y ordena solo esos. El orden es
+el de ``nlargest(k)`` y el de ``sort_values(ascending=False, kind='stable')
+.head(k)``: los empates quedan en el orden original y los nulos al final
+(``sort_values`` sin ``kind`` ordena con quicksort y puede intercambiar
+valores empatados).
+
+``Rankings(df)`` calcula conteos, sumas o medias por clave con un
+``np.bincount`` sobre los códigos de la clave (ver ``matriculas.cruces``),
+opcionalmente solo sobre las filas de un filtro (``matriculas.filtros``),
+y guarda cada agregado por (filtro, clave, medida, agregación) en una caché
+LRU de ``capacidad`` entradas. Cada agregado guarda además el orden de sus
+mayores ya calculados: pedir el top 8 después del top 10 no recalcula nada.
+"""
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from matriculas.cruces import Codificador
+from matriculas.instrumentacion import instrumentar
+
+CAPACIDAD = 64
+
+AGREGACIONES = ('size', 'sum', 'mean')
+
+# Clave de la caché: el filtro se identifica por su repr (None: todas las filas)
+Consulta = namedtuple('Consulta', ['filtro', 'clave', 'medida', 'agregacion'])
+
+
+def indices_mayores(valores, k, ascendente=False):
+    """
+    Posiciones de los ``k`` mayores de ``valores`` (con ``ascendente``, los
+    menores), en orden; empates en el orden original y nulos al final.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    nulos = np.isnan(valores)
+    posiciones = np.flatnonzero(~nulos) if nulos.any() else np.arange(len(valores))
+    llave = valores[posiciones] if ascendente else -valores[posiciones]
+    k = max(int(k), 0)
+    if k < len(posiciones):
+        # Umbral: el k-ésimo valor; pasan todos los que lo igualan o superan
+        umbral = llave[np.argpartition(llave, k - 1)[k - 1]] if k else -np.inf
+        candidatas = np.flatnonzero(llave <= umbral)
+        posiciones, llave = posiciones[candidatas], llave[candidatas]
+    orden = posiciones[np.argsort(llave, kind='stable')][:k]
+    faltan = k - len(orden)
+    if faltan > 0 and nulos.any():
+        orden = np.concatenate([orden, np.flatnonzero(nulos)[:faltan]])
+    return orden
+
+
+def mayores(serie, k, ascendente=False):
+    """``serie.sort_values(ascending=ascendente).head(k)`` con selección parcial"""
+    return serie.iloc[indices_mayores(serie.to_numpy(dtype=np.float64, na_value=np.nan), k, ascendente)]
+
+
+def filas_mayores(df, k, columna, ascendente=False):
+    """``df.nlargest(k, columna)`` (``nsmallest`` con ``ascendente``) con selección parcial"""
+    valores = pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return df.iloc[indices_mayores(valores, k, ascendente)]
+
+
+class _Agregado:
+    """Valores por clave y el prefijo ya ordenado de sus mayores y de sus menores"""
+
+    __slots__ = ('serie', 'valores', 'orden')
+
+    def __init__(self, serie):
+        self.serie = serie
+        self.valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        self.orden = {False: np.zeros(0, dtype=np.intp), True: np.zeros(0, dtype=np.intp)}
+
+    def mayores(self, k, ascendente):
+        k = min(k, len(self.valores))
+        if len(self.orden[ascendente]) < k:
+            self.orden[ascendente] = indices_mayores(self.valores, k, ascendente)
+        return self.serie.iloc[self.orden[ascendente][:k]]
+
+
+class Rankings:
+    """
+    Agregados por clave de ``df`` con caché LRU. ``df`` no se debe
+    modificar mientras se use (la caché no detecta cambios).
+    """
+
+    def __init__(self, df, capacidad=CAPACIDAD):
+        self.df = df
+        self.capacidad = capacidad
+        self.aciertos = self.calculos = 0
+        self._codificador = Codificador(df)
+        self._cache = OrderedDict()
+        self._mascaras = {}
+
+    def _mascara(self, filtro):
+        if filtro is None:
+            return None
+        clave = repr(filtro)
+        if clave not in self._mascaras:
+            self._mascaras[clave] = filtro.mascara(self.df)
+        return self._mascaras[clave]
+
+    @instrumentar
+    def _calcular(self, clave, medida, agregacion, filtro):
+        codigos, categorias = self._codificador.clave(clave)
+        validas = codigos >= 0
+        mascara = self._mascara(filtro)
+        if mascara is not None:
+            validas &= mascara
+        if agregacion != 'size':
+            valores = self._codificador.medida(medida)
+            validas &= ~np.isnan(valores)
+        elegidos = codigos[validas]
+        conteos = np.bincount(elegidos, minlength=len(categorias))
+        if agregacion == 'size':
+            resultado, nombre = conteos, 'count'
+        else:
+            suma = np.bincount(elegidos, weights=valores[validas], minlength=len(categorias))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                resultado = suma if agregacion == 'sum' else suma / conteos
+            nombre = medida
+
+        dtype = self.df[clave].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Como value_counts de una categórica: todas las categorías
+            indice = pd.CategoricalIndex(categorias, categories=categorias, ordered=dtype.ordered, name=clave)
+        else:
+            # Como value_counts de otra columna: solo los valores presentes
+            presentes = conteos > 0
+            indice = pd.Index(categorias[presentes], name=clave)
+            resultado = resultado[presentes]
+        return _Agregado(pd.Series(resultado, index=indice, name=nombre))
+
+    def _agregado(self, clave, medida, agregacion, filtro):
+        if agregacion not in AGREGACIONES:
+            raise ValueError(f"Agregación no soportada: {agregacion}")
+        if agregacion != 'size' and medida is None:
+            raise ValueError(f"La agregación '{agregacion}' necesita una medida")
+        consulta = Consulta(None if filtro is None else repr(filtro), clave, medida, agregacion)
+        if consulta in self._cache:
+            self._cache.move_to_end(consulta)
+            self.aciertos += 1
+            return self._cache[consulta]
+        agregado = self._calcular(clave, medida, agregacion, filtro)
+        self.calculos += 1
+        self._cache[consulta] = agregado
+        if len(self._cache) > self.capacidad:
+            self._cache.popitem(last=False)
+        return agregado
+
+    def agregado(self, clave, medida=None, agregacion='size', filtro=None):
+        """Conteo (o suma/media de ``medida``) por valor de ``clave``, en el orden de la clave"""
+        return self._agregado(clave, medida, agregacion, filtro).serie
+
+    def mayores(self, k, clave, medida=None, agregacion='size', filtro=None, ascendente=False):
+        """
+        Los ``k`` valores de ``clave`` con mayor conteo (o suma/media de
+        ``medida``); con ``agregacion='size'`` y sin medida equivale a
+        ``df.loc[filtro, clave].value_counts().head(k)``.
+        """
+        return self._agregado(clave, medida, agregacion, filtro).mayores(k, ascendente)
@@ -0,0 +1,426 @@
+"""
+Servidor HTTP con los análisis como JSON, sobre la base cargada una sola vez.
+
+``python -m matriculas.servidor [--puerto 8000] [--datos RUTA] [--procesos N]``
+
+Rutas (``GET``; los parámetros van en la query string)::
+
+    /                               rutas disponibles
+    /estado                         versión de los datos, filas y caché
+    /genero/anio?desde=2010         participación femenina por año de ingreso
+    /aranceles/percentiles?percentiles=10,25,50,70,75,90
+                                    percentiles del arancel por acreditación
+    /aranceles/dispersion?corte=8   CV del arancel en carreras cortas/largas
+    /contingencia?filas=A&columnas=B,C
+                                    tabla de contingencia con χ² y V de Cramér
+
+La base queda en memoria compartida (``matriculas.paralelo``) y los
+cálculos corren en un pool de procesos que la arma una vez por proceso
+(con ``procesos=0``, en hilos del mismo proceso). Las consultas iguales que
+llegan mientras otra se calcula esperan ese mismo cálculo, y cada respuesta
+queda en una caché LRU hasta que cambia la versión de los datos (fecha de
+modificación y tamaño del archivo, o del manifiesto de una base
+particionada); entonces se recarga la base, se rehace el pool y se vacía la
+caché.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import math
+import multiprocessing
+import os
+import sys
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from matriculas import paralelo
+from matriculas.contingencia import contingencia
+from matriculas.cuantiles import cuantiles_por_grupo
+from matriculas.datos import RUTA_EXCEL, cargar_matriculas
+from matriculas.descriptivos import describir_por_grupo
+from matriculas.filtros import Rango
+from matriculas.genero import participacion_femenina
+from matriculas.instrumentacion import instrumentar
+
+HOST = '127.0.0.1'
+PUERTO = 8000
+
+# Respuestas guardadas por versión de los datos
+CAPACIDAD = 256
+
+PERCENTILES = (10, 25, 50, 70, 75, 90)
+CORTE_DURACION = 8
+
+_ARANCEL = 'VALOR ARANCEL (PESOS)'
+_DURACION = 'DURACION TOTAL CARRERA (SEMESTRES)'
+_ACREDITACION = 'ACREDITACION INSTITUCIONAL'
+
+# Declaración de una ruta: función (df, **parámetros) -> dict, parámetros
+# (nombre -> (conversor del texto, valor por defecto)) y descripción
+Ruta = namedtuple('Ruta', ['funcion', 'parametros', 'descripcion'])
+
+_REQUERIDO = object()
+
+
+class ErrorConsulta(ValueError):
+    """Parámetros inválidos (se responde 400)"""
+
+
+# --- Conversión a JSON ---
+
+def _registros(tabla):
+    """Filas de ``tabla`` (con su índice como columnas) como lista de dicts"""
+    return json.loads(tabla.reset_index().to_json(orient='records', force_ascii=False))
+
+
+def _numero(valor):
+    valor = float(valor)
+    return None if math.isnan(valor) else valor
+
+
+def _columnas_validas(df, columnas):
+    faltan = [c for c in columnas if c not in df.columns]
+    if faltan:
+        raise ErrorConsulta(f"Columnas inexistentes: {', '.join(faltan)}")
+
+
+# --- Cálculos (corren en los procesos del pool) ---
+
+@instrumentar
+def genero_por_anio(df, desde=None):
+    """Total, mujeres y porcentaje de mujeres por año de ingreso"""
+    _columnas_validas(df, ['GENERO', 'AÑO INGRESO'])
+    if desde is not None:
+        df = Rango('AÑO INGRESO', desde).aplicar(df)
+    return {'datos': _registros(participacion_femenina(df, 'AÑO INGRESO'))}
+
+
+@instrumentar
+def percentiles_arancel(df, percentiles=PERCENTILES):
+    """Percentiles del arancel de instituciones acreditadas y no acreditadas"""
+    _columnas_validas(df, [_ARANCEL, _ACREDITACION])
+    tabla = cuantiles_por_grupo(df[_ARANCEL], df[_ACREDITACION], [p / 100 for p in percentiles])
+    tabla.columns = [f'P{p:g}' for p in percentiles]
+    return {'datos': _registros(tabla.rename_axis(_ACREDITACION))}
+
+
+@instrumentar
+def dispersion_arancel(df, corte=CORTE_DURACION):
+    """
+    Estadísticas del arancel (CV incluido) de las matrículas en carreras de
+    hasta ``corte`` semestres y de más, sin aranceles nulos ni en cero.
+    """
+    _columnas_validas(df, [_ARANCEL, _DURACION])
+    aranceles = pd.to_numeric(df[_ARANCEL], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    duracion = pd.to_numeric(df[_DURACION], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    validas = (aranceles > 0) & ~np.isnan(duracion)
+    grupos = np.where(duracion[validas] <= corte, f'Cortas (≤{corte:g} sem)', f'Largas (>{corte:g} sem)')
+    tabla = describir_por_grupo(aranceles[validas], grupos)
+    return {'datos': _registros(tabla.rename_axis('Duración'))}
+
+
+@instrumentar
+def tabla_contingencia(df, filas, columnas):
+    """Frecuencias observadas (absolutas y relativas), χ² y V de Cramér de ``filas`` × ``columnas``"""
+    _columnas_validas(df, filas + columnas)
+    resultado = contingencia(df, list(filas), list(columnas))
+    tablas = [resultado.absoluta, resultado.por_fila, resultado.por_columna]
+    if isinstance(resultado.absoluta, pd.DataFrame):
+        tablas = [t.stack() for t in tablas]
+    celdas = pd.concat(tablas, axis=1, keys=['N', 'por_fila', 'por_columna'])
+    celdas = celdas[celdas['N'] > 0]
+    celdas.index.names = list(filas + columnas)
+    return {
+        'n': int(resultado.n), 'chi2': _numero(resultado.chi2), 'gl': int(resultado.gl),
+        'p': _numero(resultado.p), 'v_cramer': _numero(resultado.v_cramer),
+        'celdas': _registros(celdas),
+    }
+
+
+def _entero(texto):
+    try:
+        return int(texto)
+    except ValueError:
+        raise ErrorConsulta(f"Se esperaba un entero: {texto!r}") from None
+
+
+def _positivo(texto):
+    try:
+        valor = float(texto)
+    except ValueError:
+        raise ErrorConsulta(f"Se esperaba un número: {texto!r}") from None
+    if not valor > 0:
+        raise ErrorConsulta(f"Se esperaba un número positivo: {texto!r}")
+    return valor
+
+
+def _percentiles(texto):
+    try:
+        valores = tuple(float(p) for p in texto.split(','))
+    except ValueError:
+        raise ErrorConsulta(f"Se esperaban números separados por comas: {texto!r}") from None
+    if not all(0 <= p <= 100 for p in valores):
+        raise ErrorConsulta(f"Los percentiles van de 0 a 100: {texto!r}")
+    return valores
+
+
+def _lista(texto):
+    return tuple(c.strip() for c in texto.split(',') if c.strip())
+
+
+RUTAS = {
+    'genero/anio': Ruta(genero_por_anio, {'desde': (_entero, None)},
+                        'Participación femenina por año de ingreso'),
+    'aranceles/percentiles': Ruta(percentiles_arancel, {'percentiles': (_percentiles, PERCENTILES)},
+                                  'Percentiles del arancel por acreditación institucional'),
+    'aranceles/dispersion': Ruta(dispersion_arancel, {'corte': (_positivo, CORTE_DURACION)},
+                                 'Dispersión (CV) del arancel en carreras cortas y largas'),
+    'contingencia': Ruta(tabla_contingencia, {'filas': (_lista, _REQUERIDO), 'columnas': (_lista, _REQUERIDO)},
+                         'Tabla de contingencia con chi-cuadrado y V de Cramér'),
+}
+
+
+def leer_parametros(ruta, query):
+    """Parámetros de ``ruta`` convertidos desde la query string, como tupla ordenada (clave de caché)"""
+    desconocidos = sorted(set(query) - set(ruta.parametros))
+    if desconocidos:
+        raise ErrorConsulta(f"Parámetros desconocidos: {', '.join(desconocidos)}")
+    parametros = []
+    for nombre, (conversor, defecto) in sorted(ruta.parametros.items()):
+        if nombre in query:
+            valor = conversor(query[nombre][-1])
+            if valor == ():
+                raise ErrorConsulta(f"Parámetro vacío: {nombre}")
+        elif defecto is _REQUERIDO:
+            raise ErrorConsulta(f"Falta el parámetro: {nombre}")
+        else:
+            valor = defecto
+        parametros.append((nombre, valor))
+    return tuple(parametros)
+
+
+def _preparado(_):
+    return paralelo.base_del_proceso() is not None
+
+
+def _consultar(nombre, parametros):
+    """En un proceso del pool: la ruta ``nombre`` sobre la base compartida"""
+    return RUTAS[nombre].funcion(paralelo.base_del_proceso(), **dict(parametros))
+
+
+def version_datos(ruta):
+    """Versión de la fuente: fecha de modificación y tamaño (del manifiesto si es una base particionada)"""
+    if os.path.isdir(ruta):
+        from matriculas.particiones import MANIFIESTO
+
+        ruta = os.path.join(ruta, MANIFIESTO)
+    info = os.stat(ruta)
+    return f'{info.st_mtime_ns:x}-{info.st_size:x}'
+
+
+class Servidor:
+    """
+    Sirve ``RUTAS`` sobre la base de ``datos`` (ruta del archivo o de una
+    base particionada; un DataFrame se sirve tal cual, con versión fija).
+    ``procesos``: tamaño del pool (por defecto, uno por núcleo); con 0 los
+    cálculos corren en hilos del mismo proceso.
+    """
+
+    def __init__(self, datos=None, procesos=None, capacidad=CAPACIDAD):
+        self.ruta = None if isinstance(datos, pd.DataFrame) else os.fspath(datos or RUTA_EXCEL)
+        self.df = datos if self.ruta is None else None
+        self.procesos = procesos
+        self.capacidad = capacidad
+        self.version = None
+        self.calculos = self.aciertos = self.agrupadas = 0
+        self._base = self._pool = None
+        self._cache = OrderedDict()
+        self._en_curso = {}
+        self._cargando = asyncio.Lock()
+
+    # --- Datos y pool ---
+
+    def _procesos(self):
+        return 0 if self.procesos == 0 else self.procesos or os.cpu_count() or 1
+
+    def _abrir_pool(self):
+        if self.procesos == 0:
+            return None, None
+        base = paralelo.BaseCompartida(self.df)
+        # El proceso principal ya tiene hilos (event loop y ejecutor): hacer
+        # fork de él puede dejar trabados a los procesos del pool
+        contexto = multiprocessing.get_context('forkserver')
+        contexto.set_forkserver_preload([__name__])
+        pool = ProcessPoolExecutor(max_workers=self._procesos(), mp_context=contexto,
+                                   initializer=paralelo.iniciar_proceso, initargs=(base.descriptor,))
+        # Arranca los procesos (y arma la base en cada uno) antes de la primera consulta
+        list(pool.map(_preparado, range(self._procesos())))
+        return base, pool
+
+    @staticmethod
+    def _retirar(base, pool):
+        """Espera los cálculos pendientes del pool anterior y libera su base"""
+        if pool is not None:
+            pool.shutdown(wait=True)
+        if base is not None:
+            base.cerrar()
+
+    def _version_actual(self):
+        return 'memoria' if self.ruta is None else version_datos(self.ruta)
+
+    async def _actualizar(self):
+        """Carga la base (o la recarga si cambió la versión de los datos)"""
+        if self._version_actual() == self.version:
+            return
+        async with self._cargando:
+            version = self._version_actual()
+            if version == self.version:
+                return
+            loop = asyncio.get_running_loop()
+            if self.ruta is not None:
+                self.df = await loop.run_in_executor(None, cargar_matriculas, self.ruta)
+            anterior = (self._base, self._pool)
+            self._base, self._pool = await loop.run_in_executor(None, self._abrir_pool)
+            self.version = version
+            self._cache.clear()
+            if anterior != (None, None):
+                loop.run_in_executor(None, self._retirar, *anterior)
+
+    async def cerrar(self):
+        await asyncio.get_running_loop().run_in_executor(None, self._retirar, self._base, self._pool)
+        self._base = self._pool = self.version = None
+
+    # --- Consultas ---
+
+    async def _calcular(self, nombre, parametros):
+        loop = asyncio.get_running_loop()
+        self.calculos += 1
+        if self._pool is None:
+            funcion = functools.partial(RUTAS[nombre].funcion, self.df, **dict(parametros))
+            resultado = await loop.run_in_executor(None, funcion)
+        else:
+            resultado = await loop.run_in_executor(self._pool, _consultar, nombre, parametros)
+        return json.dumps(resultado, ensure_ascii=False).encode()
+
+    def _terminar(self, clave, tarea):
+        del self._en_curso[clave]
+        if tarea.cancelled() or tarea.exception() is not None or clave[0] != self.version:
+            return
+        self._cache[clave] = tarea.result()
+        if len(self._cache) > self.capacidad:
+            self._cache.popitem(last=False)
+
+    async def consultar(self, nombre, parametros=()):
+        """JSON (bytes) de la ruta ``nombre`` con ``parametros`` (ver ``leer_parametros``)"""
+        await self._actualizar()
+        clave = (self.version, nombre, parametros)
+        if clave in self._cache:
+            self._cache.move_to_end(clave)
+            self.aciertos += 1
+            return self._cache[clave]
+        tarea = self._en_curso.get(clave)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._calcular(nombre, parametros))
+            self._en_curso[clave] = tarea
+            tarea.add_done_callback(functools.partial(self._terminar, clave))
+        else:
+            self.agrupadas += 1
+        # shield: si un cliente se desconecta, el cálculo sigue para los demás
+        return await asyncio.shield(tarea)
+
+    def estado(self):
+        return {
+            'version': self.version, 'filas': None if self.df is None else len(self.df),
+            'procesos': self._procesos(),
+            'cache': len(self._cache), 'calculos': self.calculos, 'aciertos': self.aciertos,
+            'agrupadas': self.agrupadas,
+        }
+
+    # --- HTTP ---
+
+    async def _responder(self, reader):
+        """(estado HTTP, objeto o bytes JSON) de la petición en ``reader``"""
+        try:
+            metodo, destino, _ = (await reader.readline()).decode('latin-1').split()
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': 'Petición mal formada'}
+        while (await reader.readline()).strip():
+            pass  # las cabeceras no se usan
+        if metodo != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f'Método no permitido: {metodo}'}
+        url = urlsplit(destino)
+        nombre = url.path.strip('/')
+        if nombre == '':
+            return HTTPStatus.OK, {n: {'descripcion': r.descripcion, 'parametros': sorted(r.parametros)}
+                                   for n, r in RUTAS.items()}
+        if nombre == 'estado':
+            await self._actualizar()
+            return HTTPStatus.OK, self.estado()
+        if nombre not in RUTAS:
+            return HTTPStatus.NOT_FOUND, {'error': f'Ruta desconocida: /{nombre}'}
+        try:
+            parametros = leer_parametros(RUTAS[nombre], parse_qs(url.query))
+            return HTTPStatus.OK, await self.consultar(nombre, parametros)
+        except ErrorConsulta as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+
+    async def _atender(self, reader, writer):
+        try:
+            try:
+                estado, cuerpo = await self._responder(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                return
+            except Exception as e:  # el servidor sigue atendiendo
+                estado, cuerpo = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f'{type(e).__name__}: {e}'}
+            if not isinstance(cuerpo, bytes):
+                cuerpo = json.dumps(cuerpo, ensure_ascii=False).encode()
+            writer.write(f'HTTP/1.1 {estado.value} {estado.phrase}\r\n'
+                         f'Content-Type: application/json; charset=utf-8\r\n'
+                         f'Content-Length: {len(cuerpo)}\r\n'
+                         f'Connection: close\r\n\r\n'.encode('latin-1') + cuerpo)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def iniciar(self, host=HOST, puerto=PUERTO):
+        """Carga la base, arma el pool y empieza a escuchar; devuelve el ``asyncio.Server``"""
+        await self._actualizar()
+        return await asyncio.start_server(self._atender, host, puerto)
+
+    async def servir(self, host=HOST, puerto=PUERTO):
+        servidor = await self.iniciar(host, puerto)
+        direccion = servidor.sockets[0].getsockname()
+        print(f"Sirviendo {len(self.df):,d} filas en http://{direccion[0]}:{direccion[1]}/", file=sys.stderr)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await self.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m matriculas.servidor',
+                                     description='Sirve los análisis de matrículas como JSON por HTTP.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--puerto', type=int, default=PUERTO)
+    parser.add_argument('--datos', help='archivo de matrículas o directorio de una base particionada')
+    parser.add_argument('--procesos', type=int, default=None,
+                        help='procesos para los cálculos (por defecto uno por núcleo; 0: en hilos)')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(Servidor(args.datos, args.procesos).servir(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Normalización de texto (minúsculas y sin tildes) calculada una vez por valor
+distinto y propagada a todas las filas mediante códigos.
+"""
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from matriculas.instrumentacion import instrumentar
+
+
+@lru_cache(maxsize=4096)
+def _normalizar_cadena(texto):
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', texto.lower())
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+def normalizar(texto):
+    """Normaliza un texto: minúsculas y sin tildes ("" para nulos)"""
+    if pd.isnull(texto):
+        return ""
+    return _normalizar_cadena(str(texto))
+
+
+@instrumentar
+def normalizar_columna(serie):
+    """
+    Normaliza una columna completa. Cada valor distinto se procesa una sola
+    vez y el resultado se devuelve como columna categórica con el mismo
+    índice que ``serie``.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        unicos = serie.cat.categories
+    else:
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+
+    normalizados = [normalizar(u) for u in unicos]
+    nulos = codigos < 0
+    if nulos.any():
+        # Los nulos se normalizan a "", que queda en la última posición
+        normalizados.append("")
+        codigos = np.where(nulos, len(unicos), codigos)
+
+    # Dos nombres distintos pueden quedar iguales al normalizarlos
+    codigos_norm, categorias = pd.factorize(np.array(normalizados, dtype=object))
+    return pd.Series(
+        pd.Categorical.from_codes(codigos_norm.take(codigos), categories=categorias),
+        index=serie.index,
+        name=serie.name,
+    )